@@ -0,0 +1,686 @@
+"""
+October 17, 2026
+Benchmarks
+"""
+import Environment
+import HeadingSampler
+import Obstacle
+import ObstacleSet
+import Robot
+import ScenarioGenerator
+import SpatialGraph
+import Integrator
+import Utility as util
+
+import numpy as np
+import collections
+import contextlib
+import csv
+import json
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+
+class ErrorLines:                               # stdout stand-in that keeps nothing but a count of every ERROR line
+    __slots__ = '_line', '_counts'
+
+    def __init__(self):
+        self._line   = ''
+        self._counts = collections.Counter()
+
+    def write(self, text):
+        lines = (self._line + text).split('\n')
+        self._line = lines[-1]
+        for line in lines[0:-1]:
+            if 'ERROR' in line:
+                self._counts[line.strip()] += 1
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def counts(self):
+        return self._counts
+
+
+@contextlib.contextmanager
+def quiet(stdout=True):                         # integrator warnings off, with stdout the planner chatter as well
+    errors = ErrorLines()
+    with warnings.catch_warnings(), contextlib.redirect_stdout(errors if stdout else sys.stdout):
+        warnings.simplefilter('ignore')
+        yield
+    for (line, n) in errors.counts().items():  # ERROR lines still show, once each on stderr
+        print(line + ('' if n == 1 else ' (' + str(n) + ' times)'), file=sys.stderr)
+
+
+def compiled(env):                             # the planner benchmarks steer with the numba dynamics
+    env.get_robot().set_dynamics('numba')
+    return env
+
+
+def best_time(function, repeat=5):
+    times = []
+    for i_1 in range(0, repeat):
+        t_0 = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - t_0)
+    return min(times)
+
+
+# ______________________________________________Collision Scaling_______________________________________________________
+def collision_scaling(counts=(5, 50, 500, 5000), n_points=10000, n_segments=1000, ε=0.35, seed=0):
+    rng = np.random.default_rng(seed)
+
+    print('\nCollision query cost vs obstacle count (best of 5, ms)')
+    print(f'{"obstacles":>10} {"points brute":>14} {"points grid":>14} {"segments brute":>16} {"segments grid":>16}')
+    rows = []
+    for n_O in counts:
+        L    = 10*np.sqrt(n_O/5)                    # keep the obstacle density of main.py
+        X, Y = (0, L), (0, L)
+        obstacle_list = ScenarioGenerator.ScenarioGenerator(X, Y, size=(1.0, 2.0), seed=seed).random_obstacles(n_O)
+
+        brute = ObstacleSet.ObstacleSet(obstacle_list, X, Y, broadphase=False)
+        grid  = ObstacleSet.ObstacleSet(obstacle_list, X, Y, broadphase=True, margin=ε)
+
+        P = rng.uniform(0, L, (n_points, 2))
+        A = rng.uniform(0, L, (n_segments, 2))
+        B = A + rng.normal(0, 0.1, (n_segments, 2))
+
+        row = [n_O,
+               1000*best_time(lambda: brute.collision_batch(P, ε)),
+               1000*best_time(lambda: grid.collision_batch(P, ε)),
+               1000*best_time(lambda: brute.collision_segments(A, B, ε)),
+               1000*best_time(lambda: grid.collision_segments(A, B, ε))]
+        rows.append(row)
+        print(f'{row[0]:>10} {row[1]:>14.2f} {row[2]:>14.2f} {row[3]:>16.2f} {row[4]:>16.2f}')
+    return rows
+# ______________________________________________Collision Scaling_______________________________________________________
+
+
+def extension_problems(n, rng, X=(0, 10), Y=(0, 10)):
+    problems = []
+    for i_1 in range(0, n):
+        r_near = rng.uniform([X[0], Y[0]], [X[1], Y[1]])
+        r_rand = r_near + rng.normal(0, 2.0, 2)
+
+        x_near      = np.concatenate((util.xy2polar(r_near[0], r_near[1]), [rng.uniform(-np.pi, np.pi), 0, 0]))
+        r_ref_polar = np.array(util.xy2polar(r_rand[0], r_rand[1]))
+        q_ref       = np.concatenate((r_ref_polar, [util.heading_direction(x_near[0:2], r_ref_polar)]))
+        t_head      = np.sort(rng.uniform(0.0, 2.0, 2))
+        problems.append((x_near, q_ref, t_head[0], t_head[1]))
+    return problems
+
+
+def run_extension(robot, problem):
+    return robot.integrate(Robot.Rollout(*problem))
+
+
+# _____________________________________________Dynamics per Extension___________________________________________________
+def dynamics_backends(n=20, seed=0, backends=('python', 'numba')):
+    rng      = np.random.default_rng(seed)
+    problems = extension_problems(n, rng)
+    robot    = Robot.Robot(problems[0][0], q_ref=problems[0][1], t_1=0.0, t_2=2.0, step_number=100)
+
+    print('\nIntegration time per RRT extension (odeint, hmax = 0.001)')
+    print(f'{"backend":>10} {"mean [ms]":>12} {"median [ms]":>12} {"successful":>12}')
+    rows = []
+    with quiet(stdout=False):
+        robot.set_dynamics('numba')
+        run_extension(robot, problems[0])           # compile outside of the timing
+
+        for backend in backends:
+            robot.set_dynamics(backend)
+            times   = []
+            success = 0
+            for problem in problems:
+                t_0 = time.perf_counter()
+                (sol, info) = run_extension(robot, problem)
+                times.append(time.perf_counter() - t_0)
+                success = success + (info['message'] == 'Integration successful.')
+
+            row = [backend, 1000*np.mean(times), 1000*np.median(times), success]
+            rows.append(row)
+            print(f'{row[0]:>10} {row[1]:>12.2f} {row[2]:>12.2f} {row[3]:>9}/{n}')
+    return rows
+# _____________________________________________Dynamics per Extension___________________________________________________
+
+
+# ____________________________________________Batched Rollouts__________________________________________________________
+def batch_rollouts(sizes=(1, 8, 32, 128), dt=0.001, seed=0):
+    rng   = np.random.default_rng(seed)
+    robot = None
+
+    print('\nIntegration time per rollout, serial vs batched (RK4, dt = ' + str(dt) + ')')
+    print(f'{"batch":>8} {"serial [ms]":>13} {"batched [ms]":>13} {"speed-up":>10} {"successful":>12}')
+    rows = []
+    with quiet(stdout=False):
+        for B in sizes:
+            problems = extension_problems(B, rng)
+            X_0      = np.array([problem[0] for problem in problems])
+            Q_ref    = np.array([problem[1] for problem in problems])
+            t_head   = np.array([problem[2:4] for problem in problems])
+            if robot is None:
+                robot = Robot.Robot(X_0[0], q_ref=Q_ref[0], t_1=0.0, t_2=2.0, step_number=100)
+                robot.set_dynamics('numba')
+                robot.set_integrator(Integrator.RK4(dt=dt))
+                robot.set_batch_integrator(Integrator.RK4(dt=dt))
+                run_extension(robot, problems[0])   # compile outside of the timing
+                robot.get_trajectories(X_0, Q_ref, t_head[:, 0], t_head[:, 1])
+
+            t_serial = best_time(lambda: [run_extension(robot, problem) for problem in problems], repeat=3)
+            t_batch  = best_time(lambda: robot.get_trajectories(X_0, Q_ref, t_head[:, 0], t_head[:, 1]), repeat=3)
+            (xTilda, success, info) = robot.get_trajectories(X_0, Q_ref, t_head[:, 0], t_head[:, 1])
+
+            row = [B, 1000*t_serial/B, 1000*t_batch/B, t_serial/t_batch, int(np.sum(success))]
+            rows.append(row)
+            print(f'{row[0]:>8} {row[1]:>13.2f} {row[2]:>13.2f} {row[3]:>10.1f} {row[4]:>9}/{B}')
+    return rows
+# ____________________________________________Batched Rollouts__________________________________________________________
+
+
+# ___________________________________________Parallel Extension_________________________________________________________
+def main_scenario(seed=None):
+    obstacle_list = [Obstacle.Obstacle([(0.0, 1.0), (1.5, 2.0), (0.5, 2.0), (0.3, 1.3)], convex=True),
+                     Obstacle.Obstacle([(4.0, 6.0), (0.6, 8.2), (1.7, 5.5)], convex=True),
+                     Obstacle.Obstacle([(2.0, 3.0), (3.0, 3.5), (4.0, 3.0), (3.0, 5.5)], convex=True),
+                     Obstacle.Obstacle([(6.0, 2.0), (9.0, 4.5), (8.0, 0.0), (7.0, 0.2)], convex=True),
+                     Obstacle.Obstacle([(6.0, 5.0), (7.0, 6.5), (4.0, 9.0), (5.5, 10.0)], convex=True)]
+    x_0 = np.concatenate((util.xy2polar(4.5, 4.5), [np.radians(80.0), 0, 0]))
+    return compiled(Environment.Environment([0, 10], [0, 10], obstacle_list, x_0, (8, 8), headless=True, seed=seed))
+
+
+def parallel_extension(K=400, batch_size=32, workers=None, seed=0):
+    if workers is None:
+        workers = sorted({1, 2, 4, 8, 16, 32, os.cpu_count()})
+        workers = [w for w in workers if w <= os.cpu_count()]
+
+    print('\nbuild_RRT_parallel throughput on the main.py scene (' + str(K) + ' samples)')
+    print(f'{"workers":>8} {"time [s]":>10} {"steered":>9} {"nodes":>7} {"steered/s":>11}')
+    rows = []
+    for n_workers in workers:
+        env = main_scenario(seed)
+        t_0 = time.perf_counter()
+        with quiet():
+            results = env.build_RRT_parallel(K, batch_size=batch_size, workers=n_workers)
+        t = time.perf_counter() - t_0
+
+        steered = len(results) - results.count('bad sample')
+        nodes   = len(env.get_tree().states())
+        row = [n_workers, t, steered, nodes, steered/t]
+        rows.append(row)
+        print(f'{row[0]:>8} {row[1]:>10.2f} {row[2]:>9} {row[3]:>7} {row[4]:>11.1f}')
+    return rows
+# ___________________________________________Parallel Extension_________________________________________________________
+
+
+# _____________________________________________Graph Scaling____________________________________________________________
+def build_graph(graph, n_vertices, pairs):
+    for i_1 in range(0, n_vertices):
+        graph.insert_vertex(0.0, 0.0)
+    vertices = graph.vertices()
+    for (i_1, i_2) in pairs:
+        graph.insert_edge(vertices[i_1], vertices[i_2])
+    return graph
+
+
+def graph_scaling(sizes=(10**5, 10**6), n_queries=1000, seed=0):
+    rng = np.random.default_rng(seed)
+
+    print('\nSpatialGraph.Graph vs CompactGraph, undirected, 4 edges per vertex')
+    print(f'{"edges":>9} {"graph":>13} {"build [s]":>10} {"memory [MB]":>12} '
+          f'{"incident [us]":>14} {"get_edge [us]":>14}')
+    rows = []
+    for E in sizes:
+        V     = E//4
+        pairs = rng.integers(0, V, (E, 2))
+        probe = pairs[rng.integers(0, E, n_queries)]
+
+        for name, graph_class in (('Graph', SpatialGraph.Graph), ('CompactGraph', SpatialGraph.CompactGraph)):
+            tracemalloc.start()
+            t_0   = time.perf_counter()
+            graph = build_graph(graph_class(directed=False), V, pairs)
+            t_build = time.perf_counter() - t_0
+            memory  = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            vertices = graph.vertices()
+            graph.degree(vertices[0])                   # CompactGraph builds its index here
+            t_incident = best_time(lambda: [graph.incident_edges(vertices[i_1]) for (i_1, i_2) in probe], repeat=3)
+            t_get_edge = best_time(lambda: [graph.get_edge(vertices[i_1], vertices[i_2]) for (i_1, i_2) in probe],
+                                   repeat=3)
+
+            row = [E, name, t_build, memory/2**20, 1e6*t_incident/n_queries, 1e6*t_get_edge/n_queries]
+            rows.append(row)
+            print(f'{row[0]:>9} {row[1]:>13} {row[2]:>10.2f} {row[3]:>12.1f} {row[4]:>14.2f} {row[5]:>14.2f}')
+            del graph, vertices
+    return rows
+# _____________________________________________Graph Scaling____________________________________________________________
+
+
+# ____________________________________________Goal Detection____________________________________________________________
+def goal_detection(K=1000, seeds=range(0, 10)):
+    print('\nbuild_RRT iterations to goal on the main.py scene, ' + str(K) + ' at most')
+    print(f'{"mode":>12} {"found":>7} {"mean":>8} {"median":>8} {"per seed"}')
+    rows = []
+    for mode in ('endpoint', 'trajectory'):
+        iterations = []
+        for seed in seeds:
+            env = main_scenario(seed)
+            env.set_goal_detection(mode)
+            with quiet():
+                results = env.build_RRT(K)
+            iterations.append(len(results) if env.goal_found() else np.nan)
+
+        iterations = np.array(iterations)
+        found = np.isfinite(iterations)
+        row   = [mode, int(np.sum(found)), np.mean(iterations[found]), np.median(iterations[found]), iterations]
+        rows.append(row)
+        print(f'{row[0]:>12} {row[1]:>4}/{len(seeds)} {row[2]:>8.1f} {row[3]:>8.1f} ', row[4])
+    return rows
+# ____________________________________________Goal Detection____________________________________________________________
+
+
+# ____________________________________________Bidirectional_____________________________________________________________
+def bidirectional(K=1000, seeds=range(0, 10)):
+    print('\nbuild_RRT vs build_RRT_connect on the main.py scene, ' + str(K) + ' iterations at most')
+    print(f'{"planner":>18} {"found":>7} {"iterations":>11} {"median":>8} {"time s":>8} {"median":>8}')
+    planners = {'build_RRT':         lambda env: env.build_RRT(K),
+                'build_RRT_connect': lambda env: env.build_RRT_connect(K)}
+    rows = []
+    for name, planner in planners.items():
+        iterations = []
+        times      = []
+        for seed in seeds:
+            env = main_scenario(seed)
+            t_0 = time.perf_counter()
+            with quiet():
+                results = planner(env)
+            found = env.goal_found()
+            times.append(time.perf_counter() - t_0 if found else np.nan)
+            iterations.append(len(results) if found else np.nan)
+
+        iterations = np.array(iterations)
+        times      = np.array(times)
+        found = np.isfinite(iterations)
+        row   = [name, int(np.sum(found)), np.mean(iterations[found]), np.median(iterations[found]),
+                 np.mean(times[found]), np.median(times[found])]
+        rows.append(row)
+        print(f'{row[0]:>18} {row[1]:>4}/{len(seeds)} {row[2]:>11.1f} {row[3]:>8.1f} {row[4]:>8.2f} {row[5]:>8.2f}')
+    return rows
+# ____________________________________________Bidirectional_____________________________________________________________
+
+
+
+# ____________________________________________Heading Sampler___________________________________________________________
+def heading_sampler(K=1000, seeds=range(0, 40)):
+    print('\nbuild_RRT integration attempts per extension on the main.py scene, ' + str(len(seeds)) + ' seeds')
+    print(f'{"sampler":>9} {"found":>7} {"iterations":>11} {"time s":>8} {"extensions":>11} {"attempts":>9} '
+          f'{"first try":>10}')
+    rows = []
+    for learned in (False, True):
+        iterations = []
+        times      = []
+        retries    = []
+        for seed in seeds:
+            env = main_scenario(seed)
+            if learned:
+                env.set_heading_sampler(HeadingSampler.HeadingSampler.for_workspace([env.x_min(), env.x_max()],
+                                                                                   [env.y_min(), env.y_max()]))
+            t_0 = time.perf_counter()
+            with quiet():
+                results = env.build_RRT(K)
+            times.append(time.perf_counter() - t_0)
+            iterations.append(len(results) if env.goal_found() else np.nan)
+            retries.append(env.retry_record())
+
+        retries = np.concatenate(retries)
+        row = ['learned' if learned else 'uniform', int(np.sum(np.isfinite(iterations))), np.nanmean(iterations),
+               np.mean(times), len(retries), np.mean(retries[:, 0]), np.mean(retries[:, 0] == 1)]
+        rows.append(row)
+        print(f'{row[0]:>9} {row[1]:>4}/{len(seeds)} {row[2]:>11.1f} {row[3]:>8.2f} {row[4]:>11} {row[5]:>9.2f} '
+              f'{row[6]:>10.2f}')
+    return rows
+# ____________________________________________Heading Sampler___________________________________________________________
+
+
+
+# __________________________________________Speculative Retries_________________________________________________________
+def speculative_retries(n=100, seed=0, workers=None):
+    workers = os.cpu_count() if workers is None else workers
+    rng      = np.random.default_rng(seed)
+    problems = extension_problems(n, rng)
+
+    print('\ndraw_robot_trajectory latency per extension, ' + str(n) + ' extensions, ' + str(workers) + ' workers (ms)')
+    print(f'{"retries":>12} {"p50":>8} {"p95":>8} {"max":>8} {"attempts":>9} {"failed":>7}')
+    rows = []
+    for speculative in (False, True):
+        env = main_scenario()
+        if speculative:
+            env.set_speculative_retries(True, workers=workers)
+
+        latency = []
+        try:
+            with quiet():
+                for i_1, (x_near, q_ref, t_head_min, t_head_max) in enumerate(problems):
+                    env.set_seed(i_1)
+                    t_0 = time.perf_counter()
+                    env.draw_robot_trajectory(x_near, q_ref)
+                    latency.append(time.perf_counter() - t_0)
+        finally:
+            env.set_speculative_retries(False)
+
+        latency = 1000*np.array(latency)
+        retries = env.retry_record()
+        row = ['speculative' if speculative else 'sequential', np.percentile(latency, 50),
+               np.percentile(latency, 95), np.max(latency), np.mean(retries[:, 0]), int(np.sum(retries[:, 1] == 0))]
+        rows.append(row)
+        print(f'{row[0]:>12} {row[1]:>8.1f} {row[2]:>8.1f} {row[3]:>8.1f} {row[4]:>9.2f} {row[5]:>7}')
+    return rows
+# __________________________________________Speculative Retries_________________________________________________________
+
+
+
+# ___________________________________________Threaded Rollouts__________________________________________________________
+def threaded_rollouts(n=64, workers=(1, 2, 4, 8), dt=0.001, seed=0):
+    rng      = np.random.default_rng(seed)
+    rollouts = [Robot.Rollout(*problem) for problem in extension_problems(n, rng)]
+    robot    = Robot.Robot(rollouts[0].x_0(), q_ref=rollouts[0].q_ref(), t_1=0.0, t_2=2.0, step_number=100)
+    robot.set_dynamics('numba')
+
+    print('\nRobot.integrate_many, ' + str(n) + ' rollouts, ' + str(os.cpu_count()) + ' cores (best of 5)')
+    print(f'{"integrator":>14} {"threads":>8} {"time [ms]":>10} {"rollouts/s":>11} {"= serial":>9}')
+    rows = []
+    with quiet(stdout=False):
+        for integrator in (Integrator.LSODA(), Integrator.RK4(dt=dt), Integrator.RK4(dt=dt, compiled=True)):
+            robot.set_integrator(integrator)
+            serial = [robot.integrate(rollout) for rollout in rollouts]     # also compiles rk4_compiled
+            for n_threads in ((1,) if not integrator.reentrant() else workers):
+                t = best_time(lambda: robot.integrate_many(rollouts, workers=n_threads), repeat=5)
+                threaded = robot.integrate_many(rollouts, workers=n_threads)
+                same = all([np.array_equal(sol, sol_serial, equal_nan=True)     # failed odeint rows are garbage
+                            for ((sol, _), (sol_serial, info)) in zip(threaded, serial)
+                            if info['message'] == Integrator.SUCCESS])
+                row = [integrator.name(), n_threads, 1000*t, n/t, same]
+                rows.append(row)
+                print(f'{row[0]:>14} {row[1]:>8} {row[2]:>10.1f} {row[3]:>11.1f} {str(row[4]):>9}')
+    return rows
+# ___________________________________________Threaded Rollouts__________________________________________________________
+
+
+
+# ____________________________________________Reproducibility___________________________________________________________
+def run_fingerprint(env, build):             # O/P: (results, tree states) of one planner run
+    with quiet():
+        results = build(env)
+    return results, env.get_tree().states().copy()
+
+
+def reproducibility(K=300, seeds=range(0, 5)):
+    print('\nSame seed, same run: build_RRT, build_RRT_parallel(1 and 2 workers), build_RRT_connect')
+    print(f'{"seed":>6} {"build_RRT":>10} {"parallel":>9} {"connect":>8} {"seed 1":>7}')
+    rows = []
+    for seed in seeds:
+        (results_a, states_a) = run_fingerprint(main_scenario(seed), lambda env: env.build_RRT(K))
+        (results_b, states_b) = run_fingerprint(main_scenario(seed), lambda env: env.build_RRT(K))
+        serial = (results_a == results_b) and np.array_equal(states_a, states_b)
+
+        (results_1, states_1) = run_fingerprint(main_scenario(seed),
+                                                lambda env: env.build_RRT_parallel(K, batch_size=8, workers=1))
+        (results_2, states_2) = run_fingerprint(main_scenario(seed),
+                                                lambda env: env.build_RRT_parallel(K, batch_size=8, workers=2))
+        parallel = (results_1 == results_2) and np.array_equal(states_1, states_2)
+
+        (results_c, states_c) = run_fingerprint(main_scenario(seed), lambda env: env.build_RRT_connect(K))
+        (results_d, states_d) = run_fingerprint(main_scenario(seed), lambda env: env.build_RRT_connect(K))
+        connect = (results_c == results_d) and np.array_equal(states_c, states_d)
+
+        (results_e, states_e) = run_fingerprint(main_scenario(seed + 1), lambda env: env.build_RRT(K))
+        differs = not np.array_equal(states_a[0:len(states_e)], states_e[0:len(states_a)])
+
+        row = [seed, serial, parallel, connect, differs]
+        rows.append(row)
+        print(f'{row[0]:>6} {str(row[1]):>10} {str(row[2]):>9} {str(row[3]):>8} {str(row[4]):>7}')
+    return rows
+# ____________________________________________Reproducibility___________________________________________________________
+
+
+
+# ______________________________________________Benchmark Suite_________________________________________________________
+def scenario(X, Y, obstacle_list, start, goal, seed):    # headless Environment, heading from start towards goal
+    θ_0 = np.arctan2(goal[1] - start[1], goal[0] - start[0])
+    x_0 = np.concatenate((util.xy2polar(start[0], start[1]), [θ_0, 0, 0]))
+    return compiled(Environment.Environment(X, Y, obstacle_list, x_0, goal, headless=True, seed=seed))
+
+
+def open_field(seed):
+    return scenario([0, 10], [0, 10], [], (1.0, 1.0), (8.0, 8.0), seed)
+
+
+def narrow_passage(seed):                       # a wall across the map with a 1.6 wide gap, 0.9 once inflated
+    wall = [Obstacle.Obstacle([(4.6, 0.0), (5.4, 0.0), (5.4, 4.2), (4.6, 4.2)], convex=True),
+            Obstacle.Obstacle([(4.6, 5.8), (5.4, 5.8), (5.4, 10.0), (4.6, 10.0)], convex=True)]
+    return scenario([0, 10], [0, 10], wall, (2.0, 2.0), (8.0, 8.0), seed)
+
+
+def cluttered(seed, n=20):
+    generator = ScenarioGenerator.ScenarioGenerator((0, 10), (0, 10), size=(0.5, 1.5), seed=seed)
+    return generator.environment(n=n, start=(1.0, 1.0), goal=(8.0, 8.0), seed=seed)
+
+
+def large_map(seed, n=90):                      # 9 times the area of main.py at a lower obstacle density
+    generator = ScenarioGenerator.ScenarioGenerator((0, 30), (0, 30), size=(1.0, 2.0), seed=seed)
+    return generator.environment(n=n, start=(3.0, 3.0), goal=(27.0, 27.0), seed=seed)
+
+
+SCENARIOS = {'main':           main_scenario,
+             'open_field':     open_field,
+             'narrow_passage': narrow_passage,
+             'cluttered':      cluttered,
+             'large_map':      large_map}
+
+
+def per_call(function, n, repeat=5):            # O/P: best of repeat, seconds per call of n calls
+    return best_time(lambda: [function(i_1) for i_1 in range(0, n)], repeat=repeat)/n
+
+
+def micro_benchmarks(n=1000, n_rollouts=20, seed=0):    # O/P: {name: microseconds per call}
+    rng = np.random.default_rng(seed)
+    env = main_scenario(seed)
+
+    Q_a = np.column_stack([rng.uniform(0, 14, n), rng.uniform(0, np.pi/2, n), rng.uniform(-np.pi, np.pi, n)])
+    Q_b = np.column_stack([rng.uniform(0, 14, n), rng.uniform(0, np.pi/2, n), rng.uniform(-np.pi, np.pi, n)])
+    P   = rng.uniform(0, 10, (n, 2))
+    w   = np.array([1.0, 1.0, 2.0])
+
+    problems = extension_problems(n_rollouts, rng)
+    robot    = Robot.Robot(problems[0][0], q_ref=problems[0][1], t_1=0.0, t_2=2.0, step_number=100)
+    robot.set_dynamics('numba')
+    rollout  = Robot.Rollout(*problems[0])
+    X        = np.column_stack([Q_a, rng.normal(0, 0.5, (n, 2))])
+    p        = robot.controller_params().kernel_parameters(rollout)
+
+    benchmarks = {'util.metric':             lambda i_1: util.metric(Q_a[i_1], Q_b[i_1], w),
+                  'Environment.collision':   lambda i_1: env.collision(P[i_1]),
+                  'Robot.f_function':        lambda i_1: robot.f_function(X[i_1], 0.5, rollout),
+                  'Robot.f_kernel':          lambda i_1: Robot.f_kernel(X[i_1], 0.5, p),
+                  'Robot.get_trajectory':    lambda i_1: run_extension(robot, problems[i_1])}
+    sizes      = {'Robot.get_trajectory': n_rollouts}
+
+    results = {}
+    with quiet():
+        for (name, function) in benchmarks.items():
+            function(0)                         # compile outside of the timing
+            results[name] = 1e6*per_call(function, sizes.get(name, n))
+    return results
+
+
+def run_scenario(name, seed, K):             # O/P: (environment, results, seconds) of a headless build_RRT run
+    env = compiled(SCENARIOS[name](seed))
+    env.set_profiling(True)
+    t_0 = time.perf_counter()
+    with quiet():
+        results = env.build_RRT(K)
+    return env, results, time.perf_counter() - t_0
+
+
+def macro_benchmark(name, seed, K, memory=True):     # O/P: one build_RRT run of a scenario, as a flat dict
+    (env, results, t) = run_scenario(name, seed, K)
+
+    peak = None
+    if memory:                                  # tracemalloc slows build_RRT ~6x, so the seeded run is repeated
+        tracemalloc.start()
+        (env_traced, results_traced, _) = run_scenario(name, seed, K)
+        peak = tracemalloc.get_traced_memory()[1]/2**20
+        tracemalloc.stop()
+        if results_traced != results:
+            print('\nERROR: the traced run of ' + name + ' differs from the timed run.\n')
+
+    report  = env.get_report().as_dict()
+    nodes   = len(env.get_tree().states())
+    latency = report['latency']
+    return {'scenario':           name,
+            'seed':               seed,
+            'obstacles':          env.obstacle_set().num_obstacles(),
+            'found':              env.goal_found(),
+            'iterations':         len(results),
+            'iterations_to_goal': len(results) if env.goal_found() else None,
+            'nodes':              nodes,
+            'seconds':            t,
+            'nodes_per_s':        nodes/t,
+            'extensions':         latency['extensions'],
+            'p50_ms':             latency['p50_ms'],
+            'p95_ms':             latency['p95_ms'],
+            'retries':            report['counters']['retries'],
+            'peak_memory_mb':     peak}
+
+
+def median(values):                             # O/P: median of the values that are not None, None if there are none
+    values = [value for value in values if value is not None]
+    return float(np.median(values)) if len(values) > 0 else None
+
+
+def summarize(runs):                            # O/P: per scenario medians over the seeds, the largest peak memory
+    summary = {}
+    for name in dict.fromkeys([run['scenario'] for run in runs]):
+        group = [run for run in runs if run['scenario'] == name]
+        peaks = [run['peak_memory_mb'] for run in group if run['peak_memory_mb'] is not None]
+        summary[name] = {'runs':               len(group),
+                         'found':              sum([run['found'] for run in group]),
+                         'iterations_to_goal': median([run['iterations_to_goal'] for run in group]),
+                         'nodes_per_s':        median([run['nodes_per_s'] for run in group]),
+                         'p50_ms':             median([run['p50_ms'] for run in group]),
+                         'p95_ms':             median([run['p95_ms'] for run in group]),
+                         'peak_memory_mb':     max(peaks) if len(peaks) > 0 else None}
+    return summary
+
+
+def cell(value, width, digits=2):               # right aligned number, '-' for None
+    return f'{"-":>{width}}' if value is None else f'{value:>{width}.{digits}f}'
+
+
+def benchmark_suite(K=1000, seeds=range(0, 5), scenarios=None, memory=True, path=None):
+    """
+    Micro benchmarks of the planner's inner calls and headless build_RRT runs on seeded scenarios. Timings come from
+    an untraced run, peak memory from a traced rerun of the same seed. With a path the results are written to
+    path.json and path.csv, compare_suites diffs two of them, e.g. of two commits.
+    """
+    scenarios = list(SCENARIOS) if scenarios is None else scenarios
+
+    micro = micro_benchmarks()
+    print('\nMicro benchmarks (best of 5, us per call)')
+    for (name, us) in micro.items():
+        print(f'{name:>24} {us:>10.2f}')
+
+    runs    = [macro_benchmark(name, seed, K, memory) for name in scenarios for seed in seeds]
+    summary = summarize(runs)
+    print('\nbuild_RRT on the benchmark scenarios, ' + str(len(seeds)) + ' seeds, ' + str(K) + ' iterations at most')
+    print(f'{"scenario":>16} {"found":>7} {"iterations":>11} {"nodes/s":>8} {"p50 ms":>7} {"p95 ms":>7} '
+          f'{"peak MB":>8}')
+    for (name, row) in summary.items():
+        print(f'{name:>16} {row["found"]:>4}/{row["runs"]:<2} {cell(row["iterations_to_goal"], 11, 1)} '
+              f'{cell(row["nodes_per_s"], 8, 1)} {cell(row["p50_ms"], 7)} {cell(row["p95_ms"], 7)} '
+              f'{cell(row["peak_memory_mb"], 8)}')
+
+    suite = {'K': K, 'seeds': list(seeds), 'micro_us': micro, 'summary': summary, 'runs': runs}
+    if path is not None:
+        with open(path + '.json', 'w') as file:
+            json.dump(suite, file, indent=2, sort_keys=True)
+        with open(path + '.csv', 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(list(runs[0].keys()))
+            writer.writerows([list(run.values()) for run in runs])
+    return suite
+
+
+def compare_suites(path_a, path_b):             # relative change of every summary metric, b against a
+    with open(path_a + '.json') as file:
+        a = json.load(file)
+    with open(path_b + '.json') as file:
+        b = json.load(file)
+
+    print('\n' + path_b + ' against ' + path_a)
+    rows = [('micro_us', name, a['micro_us'][name], b['micro_us'][name]) for name in a['micro_us']
+            if name in b['micro_us']]
+    for name in a['summary']:
+        if name in b['summary']:
+            rows.extend([(name, metric, a['summary'][name][metric], b['summary'][name][metric])
+                         for metric in a['summary'][name]])
+    for (group, metric, value_a, value_b) in rows:
+        change = f'{value_b/value_a - 1:>+8.1%}' if (value_a not in (None, 0)) and (value_b is not None) else ''
+        print(f'{group:>16} {metric:>22} {str(value_a):>12.10} {str(value_b):>12.10} {change}')
+    return rows
+# ______________________________________________Benchmark Suite_________________________________________________________
+
+
+
+# _____________________________________________Scenario Scaling_________________________________________________________
+def scenario_scaling(counts=(5, 50, 500, 5000), K=200, n_points=1000, seed=0):
+    print('\nGenerated scenarios at the obstacle density of main.py, build_RRT ' + str(K) + ' iterations')
+    print(f'{"obstacles":>10} {"side":>6} {"setup [s]":>10} {"collision [us]":>15} {"batch [us/pt]":>14} '
+          f'{"iterations":>11} {"nodes":>6} {"nodes/s":>8} {"nearest [ms]":>13} {"collision traj [ms]":>20}')
+    rows = []
+    for n_O in counts:
+        L         = 10*np.sqrt(n_O/5)
+        t_0       = time.perf_counter()
+        generator = ScenarioGenerator.ScenarioGenerator((0, L), (0, L), size=(1.0, 2.0), seed=seed)
+        env       = compiled(generator.environment(n=n_O, seed=seed))
+        t_setup   = time.perf_counter() - t_0
+
+        P = generator.rng().uniform(0, L, (n_points, 2))
+        t_single = per_call(lambda i_1: env.collision(P[i_1]), n_points)
+        t_batch  = best_time(lambda: env.collision_batch(P))/n_points
+
+        env.set_profiling(True)
+        t_0 = time.perf_counter()
+        with quiet():
+            results = env.build_RRT(K)            # stops early on reaching the goal
+        t = time.perf_counter() - t_0
+
+        report = env.get_report().as_dict()['phases']
+        nodes  = len(env.get_tree().states())
+        row = [n_O, L, t_setup, 1e6*t_single, 1e6*t_batch, len(results), nodes, nodes/t,
+               report['nearest_neighbor']['mean_ms'], report['collision_trajectory']['mean_ms']]
+        rows.append(row)
+        print(f'{row[0]:>10} {row[1]:>6.0f} {row[2]:>10.2f} {row[3]:>15.1f} {row[4]:>14.2f} '
+              f'{row[5]:>11} {row[6]:>6} {row[7]:>8.1f} {row[8]:>13.3f} {row[9]:>20.3f}')
+    return rows
+# _____________________________________________Scenario Scaling_________________________________________________________
+
+
+if __name__ == '__main__':
+    collision_scaling()
+    dynamics_backends()
+    batch_rollouts()
+    parallel_extension()
+    graph_scaling()
+    goal_detection()
+    bidirectional()
+    heading_sampler()
+    speculative_retries()
+    threaded_rollouts()
+    reproducibility()
+    benchmark_suite(path='benchmark')
+    scenario_scaling()
@@ -5,18 +5,36 @@ Binary Tree Class
 import SpatialGraph
 import Utility as util
 import numpy as np
+import heapq
+import math
 
 
 # ------------------------------------------------Vertex----------------------------------------------------------------
 class KdTvertex():
-    __slots__ = '_parent', '_left', '_right', '_id'
+    __slots__ = '_parent', '_left', '_right', '_id', '_point', '_axis', '_item'
 
-    def __init__(self, id_num, parent=None, left_node=None, right_node=None):
+    def __init__(self, id_num, parent=None, left_node=None, right_node=None, point=None, axis=0, item=None):
         self._id     = id_num
         self._parent = parent
         self._left   = left_node
         self._right  = right_node
 
+        self._point = point     # (x, y, θ) with θ in [-π, π)
+        self._axis  = axis      # splitting coordinate
+        self._item  = item      # external id, e.g. RRT tree vertex id
+
+    def id(self):
+        return self._id
+
+    def point(self):
+        return self._point
+
+    def axis(self):
+        return self._axis
+
+    def item(self):
+        return self._item
+
     def get_parent(self):
         return self._parent
 
@@ -43,31 +61,34 @@ class KdTvertex():
 # ------------------------------------------------Vertex----------------------------------------------------------------
 
 
-class KdTree(SpatialGraph.Graph):
+# ------------------------------------------------KdTree----------------------------------------------------------------
+class KdTree(SpatialGraph.CompactGraph):
     __slots__ = '_root',\
-                '_metric_weight'
+                '_metric_weight', '_nodeOf', '_stale'
 
-    def __init__(self):
+    def __init__(self, metric_weight=None):
         super().__init__(directed=False)
-        self._root = self.insert_vertex(padre=None, side=None)
+        self._root   = None
+        self._nodeOf = {}                    # item -> id of the node that holds its current point
+        self._stale  = set()                 # ids of nodes left behind by move, searched through but never returned
 
-        self._metric_weight = np.array([1.0, 1.0, 2.0])
+        if metric_weight is None:
+            self._metric_weight = np.array([1.0, 1.0, 2.0])
+        else:
+            self._metric_weight = np.array(metric_weight, dtype=float)
 
     def get_root(self):
         return self._root
 
-    def insert_vertex(self, padre, side):
+    def metric_weight(self):
+        return self._metric_weight
+
+    def insert_vertex(self, padre, side, point=None, axis=0, item=None):
         next_id = len(super().vertices())
 
-        v = KdTvertex(next_id, parent=padre)
+        v = KdTvertex(next_id, parent=padre, point=point, axis=axis, item=item)
         super().vertices().append(v)
 
-        super().I_minus_list().append({})
-        if super().is_directed():
-            super().I_plus_list().append({})
-        else:
-            super().set_I_plus_list(super().I_minus_list())
-
         if padre != None:
             padre.insert_kid(v, side)
             super().insert_edge(padre, v)
@@ -76,3 +97,116 @@ class KdTree(SpatialGraph.Graph):
 
     def is_leaf(self, v):
         return (v.right_child() is None) & (v.left_child() is None)
+
+    def key(self, q):                        # q = [ρ φ θ] in radians -> (x, y, θ)
+        (x, y) = util.polar2xy(q)
+        return float(x), float(y), float(util.wrap_angle(q[2]))
+
+    def insert(self, q, item):
+        p = self.key(q)
+
+        if self._root is None:
+            self._root = self.insert_vertex(padre=None, side=None, point=p, axis=0, item=item)
+            self._nodeOf[item] = self._root.id()
+            return self._root
+
+        v = self._root
+        while True:
+            a = v.axis()
+            if p[a] < v.point()[a]:
+                (side, kid) = ('left', v.left_child())
+            else:
+                (side, kid) = ('right', v.right_child())
+
+            if kid is None:
+                kid = self.insert_vertex(padre=v, side=side, point=p, axis=(a + 1) % 3, item=item)
+                self._nodeOf[item] = kid.id()
+                return kid
+            v = kid
+
+    def move(self, q, item):                 # item is found at q from now on, its old node stays as a stale split
+        if item in self._nodeOf:
+            self._stale.add(self._nodeOf[item])
+        return self.insert(q, item)
+
+    # ________________________________________________Queries___________________________________________________________
+    def nearest(self, q, k=1):
+        heap = []                            # max-heap of the k best: (-metric², -counter, item)
+        self._search(self.key(q), k, np.inf, heap)
+
+        heap.sort(reverse=True)
+        items     = [h[2] for h in heap]
+        distances = [math.sqrt(-h[0]) for h in heap]
+        return items, distances
+
+    def radius(self, q, r):
+        heap = []
+        self._search(self.key(q), None, r*r, heap)
+
+        heap.sort(reverse=True)
+        items     = [h[2] for h in heap]
+        distances = [math.sqrt(-h[0]) for h in heap]
+        return items, distances
+
+    def _search(self, p, k, r_squared, heap):
+        if self._root is None:
+            return
+
+        (w_x, w_y, w_θ) = self._metric_weight
+        (p_x, p_y, p_θ) = p
+        counter = 0
+
+        stack = [(0.0, self._root, (-np.inf, -np.inf, -np.pi), (np.inf, np.inf, np.pi))]
+        while stack:
+            (bound, v, lo, hi) = stack.pop()
+
+            worst = r_squared if (k is None) or (len(heap) < k) else min(-heap[0][0], r_squared)
+            if bound > worst:
+                continue
+
+            (v_x, v_y, v_θ) = v.point()
+            Δθ = self.angle_distance(p_θ, v_θ)/2
+            d  = w_x*(p_x - v_x)**2 + w_y*(p_y - v_y)**2 + w_θ*Δθ*Δθ
+            if (d <= worst) and (v.id() not in self._stale):
+                counter = counter + 1
+                if k is None:
+                    heap.append((-d, -counter, v.item()))
+                elif len(heap) < k:
+                    heapq.heappush(heap, (-d, -counter, v.item()))
+                else:
+                    heapq.heapreplace(heap, (-d, -counter, v.item()))
+
+            a = v.axis()
+            s = v.point()[a]
+            lo_right = lo[0:a] + (s,) + lo[a+1:]
+            hi_left  = hi[0:a] + (s,) + hi[a+1:]
+            if p[a] < s:
+                near = (v.left_child(), lo, hi_left)
+                far  = (v.right_child(), lo_right, hi)
+            else:
+                near = (v.right_child(), lo_right, hi)
+                far  = (v.left_child(), lo, hi_left)
+
+            if far[0] is not None:
+                stack.append((self.box_distance(p, far[1], far[2]), far[0], far[1], far[2]))
+            if near[0] is not None:
+                stack.append((bound, near[0], near[1], near[2]))
+
+    def box_distance(self, p, lo, hi):       # lower bound on metric² from p to any point of the box
+        w = self._metric_weight
+
+        d = 0.0
+        for a in (0, 1):
+            δ = max(lo[a] - p[a], 0.0, p[a] - hi[a])
+            d = d + w[a]*δ*δ
+
+        if not (lo[2] <= p[2] <= hi[2]):
+            δ = min(self.angle_distance(p[2], lo[2]), self.angle_distance(p[2], hi[2]))/2
+            d = d + w[2]*δ*δ
+        return d
+
+    def angle_distance(self, θ_a, θ_b):     # |θ_a - θ_b| on the circle, in [0, π]
+        Δθ = abs(θ_a - θ_b) % (2*math.pi)
+        return min(Δθ, 2*math.pi - Δθ)
+    # ________________________________________________Queries___________________________________________________________
+# ------------------------------------------------KdTree----------------------------------------------------------------
@@ -4,31 +4,49 @@ Environment Class
 """
 import Robot
 import Tree
+import BinaryTree
+import ObstacleSet
+import Parallel
+import PlanningReport
 import Utility as util
 
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib import collections as pltC
 from matplotlib import patches
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+import os
+import time
 import Camera
 
 
 class Environment:
     __slots__ = '_xMin', '_xMax', '_yMin', '_yMax',\
-                '_obstacleList',\
+                '_obstacleList', '_obstacleSet',\
                 '_goal', '_start', \
-                '_axes', '_figure', \
-                '_robot', '_RRTtree', \
+                '_axes', '_figure', '_headless', \
+                '_collisionRecord', '_trajectoryRecord', '_pathRecord', \
+                '_robot', '_rollout', '_RRTtree', \
                 '_cov_matrix', \
-                '_kd_Tree', \
+                '_kd_Tree', '_nn_method', \
                 '_xTilda', '_camera', \
                 '_dt_head_min_pph', '_dt_head_max_pph', '_μ_tHeadControl_pph', '_Σ_tHeadControl_pph', \
-                '_Δ_trajectory', '_odeIterGuassMax', '_odeIterMax', \
+                '_Δ_trajectory', '_collision_mode', '_odeIterGuassMax', '_odeIterMax', \
+                '_earlyTermination', '_keepPartial', '_goalEvents', '_goal_detection', \
+                '_headingSampler', '_retryRecord', '_retryPool', '_retryGeneration', '_report', \
                 '_headSD_Guass', \
                 '_ε', '_metric_weight', \
-                '_ε_collision', '_ε_goal', '_goal_indices'
+                '_ε_collision', '_ε_goal', '_goal_indices', \
+                '_goalVertices', '_bestCost', '_bestPath', '_ε_rewire', '_k_rewire', \
+                '_goalTree', '_goal_kd_Tree', '_connection', \
+                '_seedSequence', '_rng'
+
+    def __init__(self, X, Y, obstacle_list, initial_state, goal, headless=False, trajectory_store=None, seed=None):
+        self._seedSequence = None
+        self._rng          = None
+        self.set_seed(seed)                     # seed None: fresh entropy, see get_seed
 
-    def __init__(self, X, Y, obstacle_list, initial_state, goal):
         self._xMin = X[0]
         self._xMax = X[1]
 
@@ -40,20 +58,25 @@ class Environment:
         self._robot = Robot.Robot(initial_state,
                                   q_ref=initial_state[0:3],
                                   t_1=0.0, t_2=2.0, step_number=100)
+        self._rollout = self._robot.current_rollout()  # the extension being steered, the shared robot is never written
 
-        self._RRTtree = Tree.Tree(initial_state)
+        self._RRTtree = Tree.Tree(initial_state, trajectory_store=trajectory_store)
 
         self._goal  = goal
         self._start = util.polar2xy(initial_state[0:2])
 
         self._cov_matrix = np.diag([20.5, 20.5])
 
-        self._figure, self._axes = plt.subplots()
-        self._figure.set_figheight(10.0)
-        self._figure.set_figwidth(10.0)
-        self._axes.grid(True)
+        self._headless = headless
+        self._figure   = None
+        self._axes     = None
+        self._camera   = None
+        if not headless:
+            self.create_figure()
 
-        self._camera = Camera.Camera(self._figure)
+        self._collisionRecord  = []     # headless: (points, collision) of every collision check
+        self._trajectoryRecord = []     # headless: xy of every successful extension
+        self._pathRecord       = []     # headless: xy of every edge on the goal path
 
         self._dt_head_min_pph    = 25  # pph
         self._dt_head_max_pph    = 50  # pph
@@ -62,24 +85,99 @@ class Environment:
 
         self._xTilda = []
         self._Δ_trajectory = 5
+        self._collision_mode = 'discrete'
+        self._earlyTermination = False  # stop rollouts on leaving the workspace, collision or goal
+        self._keepPartial      = False  # keep the collision free prefix of a rollout stopped by a collision
+        self._goalEvents       = True   # the goal disc stops rollouts and ends edges, off while the goal tree grows
         self._odeIterGuassMax = 4       # actual number of normal control calls is one less than this number
         self._odeIterMax      = 6
+        self._headingSampler  = None    # None: first attempt always uniform, see set_heading_sampler
+        self._retryRecord     = []      # (integration attempts, success) of every draw_robot_trajectory call
+        self._retryPool       = None    # speculative retries: every heading time control at once, first success wins
+        self._retryGeneration = None
+        self._report          = None    # PlanningReport of build_RRT and extend_tree, None: not profiled
 
         self._headSD_Guass = 0.1
 
         self._ε = 1.0
         self._metric_weight = np.array([1.0, 1.0, 2.0])
 
+        self._kd_Tree = BinaryTree.KdTree(self._metric_weight)
+        self._kd_Tree.insert(initial_state[0:3], self._RRTtree.get_root().id())
+        self._nn_method = 'kdtree'
+
         self._ε_collision = 0.35
+        self._obstacleSet = ObstacleSet.ObstacleSet(obstacle_list, X, Y, margin=self._ε_collision)
         self._ε_goal      = 1.0
         self._goal_indices = []
+        self._goal_detection = 'trajectory'     # goal test on every sample of an extension, or only on its end
+        self._goalVertices   = []               # every tree vertex that reached the goal
+        self._bestCost       = np.inf           # cheapest goal path so far, kept apart from the tree that rewires
+        self._bestPath       = None
+
+        self._ε_rewire = self._ε                # a rollout reaches a vertex if it ends this close, the vertex moves there
+        self._k_rewire = 5
+
+        self._goalTree     = None               # bidirectional: tree grown forwards from goal region states
+        self._goal_kd_Tree = None
+        self._connection   = None               # (start tree vertex, goal tree vertex) joined by build_RRT_connect
+
+    def create_figure(self):
+        if self._figure is not None:
+            return
+
+        self._figure, self._axes = plt.subplots()
+        self._figure.set_figheight(10.0)
+        self._figure.set_figwidth(10.0)
+        self._axes.grid(True)
+
+        self._camera = Camera.Camera(self._figure)
+
+    def is_headless(self):
+        return self._headless
 
     def get_camera(self):
         return self._camera
 
+    def get_tree(self):
+        return self._RRTtree
+
+    def get_kd_tree(self):
+        return self._kd_Tree
+
+    def get_goal_tree(self):
+        return self._goalTree
+
+    def close(self):                            # releases the trajectory stores of the trees and the retry pool
+        self.set_speculative_retries(False)
+        for tree in (self._RRTtree, self._goalTree):
+            if tree is not None:
+                tree.close()
+
+    def set_nearest_neighbor_method(self, method='kdtree'):
+        if method not in ('kdtree', 'linear'):
+            print('\nERROR: no such nearest neighbor method.\n')
+            return
+        self._nn_method = method
+
     def get_robot(self):
         return self._robot
 
+    def set_seed(self, seed):                   # restarts the random stream, an int or a SeedSequence
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self._seedSequence = seed
+        self._rng          = np.random.default_rng(seed)
+
+    def get_seed(self):                         # O/P: the entropy the stream was seeded with
+        return self._seedSequence.entropy
+
+    def rng(self):
+        return self._rng
+
+    def spawn_seeds(self, n):                   # O/P: n independent child SeedSequences, e.g. one per worker task
+        return self._seedSequence.spawn(n)
+
     def x_max(self):
         return self._xMax
 
@@ -107,7 +205,11 @@ class Environment:
     def obstacles(self):
         return self._obstacleList
 
+    def obstacle_set(self):
+        return self._obstacleSet
+
     def print_environment(self):
+        self.create_figure()
 
         O_points = []
         limit = 1
@@ -188,32 +290,75 @@ class Environment:
         return self._figure
 
     def collision(self, point, plot=False):
-        ε = self._ε_collision
-
-        point = np.array(point)
-        col_vect = (point < np.array([self._xMin, self._yMin])) \
-                   | (np.isclose(point, [self._xMin, self._yMin], atol=ε, rtol=0.0))\
-                   | (point > np.array([self._xMax, self._yMax]))\
-                   | (np.isclose(point, [self._xMax, self._yMax], atol=ε, rtol=0.0))
-        collision = (col_vect[0] | col_vect[1])
-        if collision:
-            if plot:
-                self.paint_collision_point(point[0], point[1], collision)
-            return True
-
-        for obstacle in self._obstacleList:
-            col_vect = np.matmul(obstacle.boundary()['N'], point) + obstacle.boundary()['b']
-            col_vect = (col_vect < 0) | (np.isclose(col_vect, np.zeros(len(col_vect)), atol=ε, rtol=0.0))
-            collision = (np.sum(col_vect.astype(int)) == len(col_vect))
-            if collision:
-                if plot:
-                    self.paint_collision_point(point[0], point[1], collision)
-                return True
+        point     = np.array(point, dtype=float)
+        collision = self._obstacleSet.collision_batch(point, self._ε_collision)[0]
         if plot:
             self.paint_collision_point(point[0], point[1], collision)
-        return False
+        return collision
+
+    def collision_batch(self, points, plot=False):
+        points    = np.atleast_2d(np.asarray(points, dtype=float))
+        collision = self._obstacleSet.collision_batch(points, self._ε_collision)
+        if plot:
+            self.paint_collision_points(points, collision)
+        return collision
+
+    def set_collision_mode(self, mode='discrete'):
+        if mode not in ('discrete', 'continuous'):
+            print('\nERROR: no such collision mode.\n')
+            return
+        self._collision_mode = mode
+
+    def get_collision_mode(self):
+        return self._collision_mode
+
+    def set_early_termination(self, enable=True, keep_partial=False):
+        self._earlyTermination = enable
+        self._keepPartial      = keep_partial
+
+    def set_heading_sampler(self, sampler=None):   # e.g. HeadingSampler.for_workspace, None switches it off
+        self._headingSampler = sampler
+
+    def get_heading_sampler(self):
+        return self._headingSampler
+
+    def retry_record(self):                     # O/P: (n, 2) integration attempts and success per extension
+        return np.array(self._retryRecord, dtype=np.int64).reshape(-1, 2)
+
+    def set_profiling(self, enable=True):     # a fresh PlanningReport, or none
+        self._report = PlanningReport.PlanningReport() if enable else None
+
+    def get_report(self):
+        return self._report
+
+    def profile(self, phase, t_0):              # charges the time since t_0 to a phase of the report
+        if self._report is not None:
+            self._report.add_phase(phase, time.perf_counter() - t_0)
+
+    def get_early_termination(self):
+        return self._earlyTermination, self._keepPartial
+
+    def set_goal_events(self, enable=True):
+        self._goalEvents = enable
+
+    def get_goal_events(self):
+        return self._goalEvents
+
+    def termination_event(self, xTilda):        # O/P: rows outside the workspace, in an inflated obstacle or in the goal
+        (x_c, y_c) = util.polar2xy_large(xTilda[:, 0:2])
+        points     = np.column_stack([x_c, y_c])
+
+        collision = self._obstacleSet.collision_batch(points, self._ε_collision)
+        if not self._goalEvents:
+            return collision
+        goal = np.hypot(self._goal[0] - x_c, self._goal[1] - y_c) < self._ε_goal
+        return collision | goal
 
     def paint_collision_point(self, x, y, collision):
+        if self._headless:
+            self._collisionRecord.append((np.array([[x, y]]), np.array([collision])))
+            return
+
         color = []
         if collision:
             color.append((1.0, 0.0, 0.0, 0.5))
@@ -223,10 +368,22 @@ class Environment:
         self._axes.scatter(x, y,
                            s=5.00, color=color, marker='o')
 
+    def paint_collision_points(self, points, collision):
+        if self._headless:
+            self._collisionRecord.append((np.array(points), np.array(collision)))
+            return
+
+        color = np.where(np.asarray(collision)[:, None],
+                         np.array([1.0, 0.0, 0.0, 0.5]),
+                         np.array([0.4, 0.75, 0.1, 0.5]))
+
+        self._axes.scatter(points[:, 0], points[:, 1],
+                           s=5.00, color=color, marker='o')
+
     def sample(self, n, distribution):
         if distribution == 'U':
-            x_rand = np.random.uniform(self._xMin, self._xMax, n)
-            y_rand = np.random.uniform(self._yMin, self._yMax, n)
+            x_rand = self._rng.uniform(self._xMin, self._xMax, n)
+            y_rand = self._rng.uniform(self._yMin, self._yMax, n)
         elif distribution == 'N':
             """
             q_0 = self._robot.get_x_0()[0:3]
@@ -237,7 +394,7 @@ class Environment:
             Σ = self._cov_matrix
             μ = np.array([r_0[0], r_0[1]])
 
-            sample = np.random.multivariate_normal(μ, Σ, n)
+            sample = self._rng.multivariate_normal(μ, Σ, n)
             x_rand = sample[:, 0]
             y_rand = sample[:, 1]
         else:
@@ -245,65 +402,159 @@ class Environment:
         return x_rand, y_rand
 
     # ________________________________________________Integration_______________________________________________________
-    def draw_robot_trajectory(self, plot=False, draw_successful_trajectory=False):
-        (t_head_min, t_head_max) = self.set_random_time_control('U')
-        print('\nInitial Control: Uniform heading time control: (', t_head_min, ',', t_head_max, ')')
-        (self._xTilda, info) = self._robot.get_trajectory(degrees=False, plot=plot)
+    def draw_robot_trajectory(self, x_0, q_ref, plot=False, draw_successful_trajectory=False):
+        if self._retryPool is not None:
+            return self.draw_robot_trajectory_speculative(x_0, q_ref, draw_successful_trajectory)
+
+        event = self.termination_event if self._earlyTermination else None
+
+        (t_head_min, t_head_max, control) = self.initial_time_control(x_0, q_ref)
+        print('\nInitial Control: ' + control + ' heading time control: (', t_head_min, ',', t_head_max, ')')
+        self._rollout = Robot.Rollout(x_0, q_ref, t_head_min, t_head_max)
+        (self._xTilda, info) = self._robot.get_trajectory(degrees=False, plot=plot, event=event, rollout=self._rollout)
+        self.record_integration(info)
 
-        odeIterGuassMax = self._odeIterGuassMax
-        odeIterMax      = self._odeIterMax
-        ode_iter = 1
+        odeIterMax = self._odeIterMax
+        ode_iter   = 1
         while info['message'] != 'Integration successful.':
-            if ode_iter < odeIterGuassMax:
-                (t_head_min, t_head_max) = self.set_random_time_control('N')
-                print('\nChanging Control: Normal heading time control: (', t_head_min, ',', t_head_max, ')')
-            else:
-                if (ode_iter + 1) == odeIterMax:
-                    (t_head_min, t_head_max) = self._robot.get_time_duration()
-                    self._robot.set_t_head_max(t_head_max)
-                    self._robot.set_t_head_min(t_head_min)
-                    print('\nChanging Control: Full heading time control: (', t_head_min, ',', t_head_max, ')')
-                else:
-                    (t_head_min, t_head_max) = self.set_random_time_control('U')
-                    print('\nChanging Control: Uniform heading time control: (', t_head_min, ',', t_head_max, ')')
+            (t_head_min, t_head_max, control) = self.retry_time_control(ode_iter)
+            print('\nChanging Control: ' + control + ' heading time control: (', t_head_min, ',', t_head_max, ')')
 
             ode_iter = ode_iter + 1
             print('ERROR: integration failed, trying again. Iteration:', ode_iter, ' \n')
-            (self._xTilda, info) = self._robot.get_trajectory(degrees=False, plot=plot)
+            self._rollout = Robot.Rollout(x_0, q_ref, t_head_min, t_head_max)
+            (self._xTilda, info) = self._robot.get_trajectory(degrees=False, plot=plot, event=event,
+                                                              rollout=self._rollout)
+            self.record_integration(info)
 
             if ode_iter >= odeIterMax:
                 if info['message'] != 'Integration successful.':
                     print('\nERROR: integration failed, max iterations reached. Total Iteration:', ode_iter, ' \n')
+                    self.record_extension(ode_iter, False)
                     return info['message']
                 else:
                     break
         print('\nIntegration successful after ', ode_iter, ' iterations. \n')
+        self.record_extension(ode_iter, True)
 
         if draw_successful_trajectory:
             r_cTilda = self._xTilda[:, 0:2]
             (x_c, y_c) = util.polar2xy_large(r_cTilda)
-
-            self._axes.plot(x_c, y_c, color='black', linestyle='--', linewidth=0.5)
+            self.paint_trajectory(np.column_stack([x_c, y_c]))
         return info['message']
+
+    def initial_time_control(self, x_0, q_ref):     # O/P: (t_head_min, t_head_max, name) of the first attempt
+        window = self.learned_time_control(x_0, q_ref)
+        if window is not None:
+            return window[0], window[1], 'Learned'
+        (t_head_min, t_head_max) = self.set_random_time_control('U')
+        return t_head_min, t_head_max, 'Uniform'
+
+    def retry_time_control(self, ode_iter):     # O/P: (t_head_min, t_head_max, name) after ode_iter failed attempts
+        if ode_iter < self._odeIterGuassMax:
+            (t_head_min, t_head_max) = self.set_random_time_control('N')
+            return t_head_min, t_head_max, 'Normal'
+        if (ode_iter + 1) == self._odeIterMax:
+            (t_head_min, t_head_max) = self._robot.get_time_duration()
+            return t_head_min, t_head_max, 'Full'
+        (t_head_min, t_head_max) = self.set_random_time_control('U')
+        return t_head_min, t_head_max, 'Uniform'
+
+    def set_speculative_retries(self, enable=True, workers=None):   # configure the robot before enabling
+        if self._retryPool is not None:
+            self._retryGeneration.value += 1
+            self._retryPool.shutdown(wait=True, cancel_futures=True)
+            self._retryPool       = None
+            self._retryGeneration = None
+        if not enable:
+            return
+
+        workers = self._odeIterMax if workers is None else workers
+        self._retryGeneration = multiprocessing.Value('q', 0)
+        self._retryPool = ProcessPoolExecutor(max_workers=workers, initializer=Parallel.init_worker,
+                                              initargs=(self.steering_copy(), self._retryGeneration))
+
+    def get_speculative_retries(self):
+        return self._retryPool is not None
+
+    def draw_robot_trajectory_speculative(self, x_0, q_ref, draw_successful_trajectory=False):
+        x_0   = np.array(x_0, dtype=float)
+        q_ref = np.array(q_ref, dtype=float)
+
+        windows = [self.initial_time_control(x_0, q_ref)[0:2]]  # every window of the sequential schedule at once
+        for ode_iter in range(1, self._odeIterMax):
+            windows.append(self.retry_time_control(ode_iter)[0:2])
+
+        with self._retryGeneration.get_lock():
+            self._retryGeneration.value += 1
+            generation = self._retryGeneration.value
+        task    = (generation, self._goalEvents, x_0, q_ref)
+        futures = {self._retryPool.submit(Parallel.integrate_window, task + window): i
+                   for (i, window) in enumerate(windows)}
+
+        message = 'Integration failed.'
+        i_first = -1
+        for future in as_completed(futures):
+            (xTilda, message, cancelled) = future.result()
+            if cancelled:
+                continue
+
+            self._rollout = Robot.Rollout(x_0, q_ref, *windows[futures[future]])
+            self.record_integration({'message': message})
+            if message == 'Integration successful.':
+                i_first = futures[future]
+                self._xTilda = xTilda
+                break
+
+        with self._retryGeneration.get_lock():         # in-flight rollouts stop at their next event check
+            self._retryGeneration.value += 1
+        for future in futures:
+            future.cancel()
+
+        if i_first < 0:
+            print('\nERROR: speculative integration failed for every heading time control. \n')
+            self.record_extension(len(windows), False)
+            return message
+
+        self._rollout = Robot.Rollout(x_0, q_ref, *windows[i_first])
+        print('\nIntegration successful with heading time control ', i_first + 1, ' of ', len(windows), '. \n')
+        self.record_extension(i_first + 1, True)
+
+        if draw_successful_trajectory:
+            (x_c, y_c) = util.polar2xy_large(self._xTilda[:, 0:2])
+            self.paint_trajectory(np.column_stack([x_c, y_c]))
+        return message
     # ________________________________________________Integration_______________________________________________________
 
+    def paint_trajectory(self, r_c):
+        if self._headless:
+            self._trajectoryRecord.append(r_c)
+            return
+
+        self._axes.plot(r_c[:, 0], r_c[:, 1], color='black', linestyle='--', linewidth=0.5)
+
     def draw_good_trajectory(self):
+        self.create_figure()
         r_cTilda = self._xTilda[:, 0:2]
         (x_c, y_c) = util.polar2xy_large(r_cTilda)
 
         self._axes.plot(x_c, y_c)
 
-    def play_robot_trajectory(self):
-        xTilda = self._xTilda
+    def play_robot_trajectory(self, segments=None):     # segments are played in order, e.g. views of the store
+        self.create_figure()
+        if segments is None:
+            segments = [self._xTilda]
 
-        for i in range(0, len(xTilda[:, 1]), 1):
-            self.animate(i)
+        for xTilda in segments:
+            for i in range(0, len(xTilda[:, 1]), 1):
+                self.animate(i, xTilda)
 
         anime = self._camera.animate()
         return anime
 
-    def animate(self, i):
-        q_cTilda   = self._xTilda[:, 0:3]
+    def animate(self, i, xTilda=None):
+        xTilda     = self._xTilda if xTilda is None else xTilda
+        q_cTilda   = xTilda[:, 0:3]
         (x_c, y_c) = util.polar2xy_large(q_cTilda)
 
         r_c = np.array([x_c[i], y_c[i]])
@@ -357,9 +608,75 @@ class Environment:
         art_list = [art_1, art_2, art_3, art_4]
         self._camera.snap(art_list)
 
+    def steering_copy(self):                    # headless copy without the trees, for the worker processes
+        env = Environment.__new__(Environment)
+        for name in Environment.__slots__:
+            setattr(env, name, getattr(self, name))
+
+        env._headless = True
+        env._figure   = None
+        env._axes     = None
+        env._camera   = None
+        env._RRTtree  = None
+        env._kd_Tree  = None
+        env._goalTree        = None
+        env._goal_kd_Tree    = None
+        env._connection      = None
+        env._goal_indices    = []
+        env._bestPath        = None
+        env._retryRecord     = []
+        env._headingSampler  = None             # it would learn from whichever tasks the worker happens to get
+        env._report          = None
+        env._retryPool       = None
+        env._retryGeneration = None
+        env.clear_records()
+        return env
+
+    def get_xTilda(self):
+        return self._xTilda
+
+    def clear_records(self):
+        self._collisionRecord  = []
+        self._trajectoryRecord = []
+        self._pathRecord       = []
+
     def refresh_figure(self):
         self._figure.show()
 
+    def collision_record(self):
+        if len(self._collisionRecord) == 0:
+            return np.zeros((0, 2)), np.zeros(0, dtype=bool)
+        points    = np.concatenate([record[0] for record in self._collisionRecord])
+        collision = np.concatenate([record[1] for record in self._collisionRecord])
+        return points, collision
+
+    def trajectory_record(self):
+        return self._trajectoryRecord
+
+    def path_record(self):
+        return self._pathRecord
+
+    def render(self):                           # draws what a headless run recorded
+        self.print_environment()
+
+        (points, collision) = self.collision_record()
+        if len(points) > 0:
+            color = np.where(collision[:, None],
+                             np.array([1.0, 0.0, 0.0, 0.5]),
+                             np.array([0.4, 0.75, 0.1, 0.5]))
+            self._axes.scatter(points[:, 0], points[:, 1], s=5.00, color=color, marker='o')
+
+        if len(self._trajectoryRecord) > 0:
+            trajectories = pltC.LineCollection(self._trajectoryRecord,
+                                               colors='black', linestyles='--', linewidths=0.5)
+            self._axes.add_collection(trajectories)
+
+        if len(self._pathRecord) > 0:
+            path = pltC.LineCollection(self._pathRecord,
+                                       colors=[(0.0, 0, 1.0, 0.25)], linestyles='-', linewidths=4.0)
+            self._axes.add_collection(path)
+        return self._figure, self._axes
+
     def set_random_time_control(self, distribution='U'):
         (t_1, t_2) = self._robot.get_time_duration()
         dura = t_2 - t_1
@@ -368,8 +685,8 @@ class Environment:
 
         while True:
             if distribution == 'U':
-                t_head_min = np.random.uniform(t_1, t_2)
-                t_head_max = np.random.uniform(t_1, t_2)
+                t_head_min = self._rng.uniform(t_1, t_2)
+                t_head_max = self._rng.uniform(t_1, t_2)
             elif distribution == 'N':
                 μ_tHeadControl_pph = self._μ_tHeadControl_pph
                 Σ_tHeadControl_pph = self._Σ_tHeadControl_pph
@@ -377,7 +694,7 @@ class Environment:
                 (μ_tMin, Σ_tMin)  = (np.array(μ_tHeadControl_pph)*dura,
                                      np.diag(Σ_tHeadControl_pph)*dura)
 
-                t_head = np.random.multivariate_normal(μ_tMin, Σ_tMin, 1)
+                t_head = self._rng.multivariate_normal(μ_tMin, Σ_tMin, 1)
                 t_head_min = t_head[0][0]
                 t_head_max = t_head[0][1]
             else:
@@ -387,37 +704,82 @@ class Environment:
             if (dt > dt_min) & (dt < dt_max) & (t_head_max >= 0) & (t_head_min >= 0):
                 break
 
-        self._robot.set_t_head_max(t_head_max)
-        self._robot.set_t_head_min(t_head_min)
         return t_head_min, t_head_max
 
+    def time_control(self):                     # O/P: (t_head_min, t_head_max) of the last steered rollout
+        return self._rollout.t_head_min(), self._rollout.t_head_max()
+
+    def learned_time_control(self, x_0, q_ref):  # O/P: window drawn from the heading sampler, None if it has none
+        if self._headingSampler is None:
+            return None
+
+        (t_1, t_2) = self._robot.get_time_duration()
+        dura   = t_2 - t_1
+        window = self._headingSampler.draw(x_0, q_ref, self._dt_head_min_pph/100, self._dt_head_max_pph/100,
+                                           self._rng)
+        if window is None:
+            return None
+
+        t_head_min = t_1 + window[0]*dura
+        t_head_max = t_1 + window[1]*dura
+        return t_head_min, t_head_max
+
+    def record_integration(self, info):
+        if self._report is not None:
+            self._report.add_integration(info)
+        self.record_time_control(info)
+
+    def record_extension(self, attempts, success):
+        self._retryRecord.append((attempts, success))
+        if self._report is not None:
+            self._report.add_extension(attempts, success)
+
+    def record_time_control(self, info):        # tells the heading sampler how the current window integrated
+        if self._headingSampler is None:
+            return
+
+        (t_1, t_2) = self._robot.get_time_duration()
+        dura   = t_2 - t_1
+        window = ((self._rollout.t_head_min() - t_1)/dura, (self._rollout.t_head_max() - t_1)/dura)
+        self._headingSampler.record(self._rollout.x_0(), self._rollout.q_ref(), window,
+                                    info['message'] == 'Integration successful.')
+
     def collision_trajectory(self, plot=False):
-        r_cTilda   = self._xTilda[:, 0:2]
+        if self._collision_mode == 'continuous':
+            return self.collision_trajectory_continuous(plot)
+
+        r_cTilda   = self._xTilda[::self._Δ_trajectory, 0:2]
         (x_c, y_c) = util.polar2xy_large(r_cTilda)
+        points     = np.column_stack([x_c, y_c])
+
+        collision = self._obstacleSet.collision_batch(points, self._ε_collision)
+        i_hit     = np.flatnonzero(collision)
+        if plot:                                    # points are painted up to the first collision
+            end = i_hit[0] + 1 if len(i_hit) > 0 else len(points)
+            self.paint_collision_points(points[0:end], collision[0:end])
 
-        Δ_trajectory = self._Δ_trajectory
+        return len(i_hit) > 0
 
-        x_c_approx = []
-        y_c_approx = []
-        for i in range(0, len(x_c), Δ_trajectory):
-            x_c_approx.append(x_c[i])
-            y_c_approx.append(y_c[i])
+    def collision_trajectory_continuous(self, plot=False):
+        (x_c, y_c) = util.polar2xy_large(self._xTilda[:, 0:2])
+        points     = np.column_stack([x_c, y_c])
+        if len(points) == 1:
+            points = np.vstack([points, points])
 
-        for i in range(0, len(x_c_approx)):
-            r_cTilda_approx_i = np.array([x_c_approx[i],
-                                          y_c_approx[i]])
-            collision_i = self.collision(r_cTilda_approx_i, plot)
-            if collision_i:
-                return True
+        collision = self._obstacleSet.collision_segments(points[0:-1], points[1:], self._ε_collision)
+        i_hit     = np.flatnonzero(collision)
+        if plot:                                    # segment start points are painted up to the first collision
+            end = i_hit[0] + 1 if len(i_hit) > 0 else len(collision)
+            self.paint_collision_points(points[0:end], collision[0:end])
 
-        return False
+        return len(i_hit) > 0
 
     def sample_angle(self, n, distribution='U'):
         if distribution == 'U':
-            θ_rand = np.random.uniform(-np.pi, np.pi, n)
+            θ_rand = self._rng.uniform(-np.pi, np.pi, n)
         elif distribution == 'N':
-            μ, σ = self._robot.get_x_0()[2], self._headSD_Guass  # mean and standard deviation
-            θ_rand = np.random.normal(μ, σ, n)
+            μ, σ = self._rollout.x_0()[2], self._headSD_Guass   # mean and standard deviation
+            θ_rand = self._rng.normal(μ, σ, n)
         else:
             print('\nERROR: no such distribution.\n')
 
@@ -440,28 +802,104 @@ class Environment:
     def new_state(self, q_rand, x_near):
         r_ref_polar = q_rand[0:2]
         q_ref       = np.concatenate((r_ref_polar, [util.heading_direction(x_near[0:2], r_ref_polar)]), axis=0)
-        self._robot.set_x_0(x_near)
-        self._robot.set_q_ref(q_ref)
 
-        msg     = self.draw_robot_trajectory(plot=False, draw_successful_trajectory=True)
+        t_0     = time.perf_counter()
+        msg     = self.draw_robot_trajectory(x_near, q_ref, plot=False, draw_successful_trajectory=True)
         success = (msg == 'Integration successful.')
+        self.profile('draw_robot_trajectory', t_0)
+
+        t_0 = time.perf_counter()
+        if success and self._goalEvents and (self._goal_detection == 'trajectory'):    # the edge ends in the goal
+            i_goal = self.check_goal_trajectory(self._xTilda)
+            if i_goal > 0:
+                self._xTilda = self._xTilda[0:i_goal + 1]
+        if success and self._earlyTermination:
+            r_end = util.polar2xy(self._xTilda[-1, 0:2])
+            if self.collision(r_end, plot=True):        # stopped by a collision, not by the goal
+                if (not self._keepPartial) | (len(self._xTilda) < 3):
+                    self.profile('collision_trajectory', t_0)
+                    return False
+                self._xTilda = self._xTilda[0:-1]
         if success:
-            return not self.collision_trajectory(plot=True)
+            success = not self.collision_trajectory(plot=True)
+            self.profile('collision_trajectory', t_0)
 
         return success
 
+    def new_states(self, q_rand_batch, x_near_batch, distribution='U', workers=None):
+        """
+        Steers B samples at once: one batch of the batch integrator, or with workers one Robot.Rollout per sample on a
+        thread pool of the robot integrator, see Robot.integrate_many.
+        """
+        q_rand_batch = np.atleast_2d(np.asarray(q_rand_batch, dtype=float))
+        x_near_batch = np.atleast_2d(np.asarray(x_near_batch, dtype=float))
+        B = len(x_near_batch)
+
+        q_ref_batch = np.column_stack([q_rand_batch[:, 0:2],
+                                       util.heading_direction_many(x_near_batch[:, 0:2], q_rand_batch[:, 0:2])])
+
+        t_head = np.empty((B, 2))
+        for i_1 in range(0, B):
+            t_head[i_1] = self.set_random_time_control(distribution)
+
+        if workers is None:
+            (xTilda, success, info) = self._robot.get_trajectories(x_near_batch, q_ref_batch,
+                                                                   t_head[:, 0], t_head[:, 1])
+        else:
+            rollouts = [Robot.Rollout(x_near_batch[i_1], q_ref_batch[i_1], t_head[i_1, 0], t_head[i_1, 1])
+                        for i_1 in range(0, B)]
+            results  = self._robot.integrate_many(rollouts, workers=workers)
+            xTilda   = np.stack([sol for (sol, info) in results])
+            success  = np.array([info['message'] == 'Integration successful.' for (sol, info) in results]) & \
+                       np.all(np.isfinite(xTilda), axis=(1, 2))
+
+        good = success.copy()
+        if np.any(success):
+            good[success] = ~self.collision_trajectories(xTilda[success])
+        return xTilda, q_ref_batch, t_head, good
+
+    def collision_trajectories(self, xTilda):     # O/P: one collision flag per (N, 5) rollout of xTilda
+        (B, N) = xTilda.shape[0:2]
+        if self._collision_mode == 'continuous':
+            (x_c, y_c) = util.polar2xy_large(xTilda[:, :, 0:2].reshape(-1, 2))
+            points     = np.column_stack([x_c, y_c]).reshape(B, N, 2)
+            if N == 1:
+                points = np.concatenate([points, points], axis=1)
+
+            A = points[:, 0:-1].reshape(-1, 2)
+            C = points[:, 1:].reshape(-1, 2)
+            collision = self._obstacleSet.collision_segments(A, C, self._ε_collision)
+        else:
+            (x_c, y_c) = util.polar2xy_large(xTilda[:, ::self._Δ_trajectory, 0:2].reshape(-1, 2))
+            collision  = self._obstacleSet.collision_batch(np.column_stack([x_c, y_c]), self._ε_collision)
+        return np.any(collision.reshape(B, -1), axis=1)
+
+    def set_goal_detection(self, mode='trajectory'):
+        if mode not in ('trajectory', 'endpoint'):
+            print('\nERROR: no such goal detection mode.\n')
+            return
+        self._goal_detection = mode
+
+    def get_goal_detection(self):
+        return self._goal_detection
+
+    def check_goal_trajectory(self, xTilda):    # O/P: index of the first sample in the goal disc, -1 if none
+        (x_c, y_c) = util.polar2xy_large(xTilda[:, 0:2])
+        i_goal     = np.flatnonzero(np.hypot(self._goal[0] - x_c, self._goal[1] - y_c) < self._ε_goal)
+        return i_goal[0] if len(i_goal) > 0 else -1
+
     def check_goal(self, q):
         ε = self._ε_goal
 
-        r_goal = np.array(self._goal)
         (x, y) = util.polar2xy(q)
-        r_new  = np.array([x, y])
-        Δr     = r_goal - r_new
 
-        distance = np.linalg.norm(Δr)
+        distance = np.hypot(self._goal[0] - x, self._goal[1] - y)
         goal = (distance < ε)
         return goal
 
+    def goal_found(self):
+        return len(self._goal_indices) > 0
+
     def get_goal_node_indices(self, v_goal):
         indices = []
 
@@ -475,44 +913,76 @@ class Environment:
 
         self._goal_indices = indices
 
-    def get_goal_trajectory(self):
+    def goal_trajectory_segments(self):
+        """
+        Edge trajectories from the root to the goal, views of the store. After build_RRT_connect the goal tree edges
+        follow the start tree ones, and the two do not meet exactly: the last start tree edge ends within ε of the goal
+        tree vertex under util.metric, so the path jumps there.
+        """
         if len(self._goal_indices) == 0:
             print('\nERROR: no goal yet.\n')
 
-        self._xTilda = np.array([0, 0, 0, 0, 0])
-
-        self._goal_indices.reverse()
-        for i in range(0, len(self._goal_indices)-1):
-            v_i          = self._RRTtree.get_vertex(self._goal_indices[i])
-            v_iPlus1     = self._RRTtree.get_vertex(self._goal_indices[i+1])
-            e_i_2_iPlus1 = self._RRTtree.get_edge(v_i, v_iPlus1)
+        path     = self._goal_indices[::-1]
+        segments = []
+        for i in range(0, len(path)-1):
+            v_i      = self._RRTtree.get_vertex(path[i])
+            v_iPlus1 = self._RRTtree.get_vertex(path[i+1])
+
+            xTilda = self._RRTtree.get_trajectory(v_iPlus1.id())
+            if xTilda is None:                      # edge inserted without its trajectory
+                xTilda = self.integrate_edge(v_i, v_iPlus1)
+            segments.append(xTilda)
+
+        if (self._connection is not None) and (self._connection[0] == self._goal_indices[0]):
+            v = self._goalTree.get_vertex(self._connection[1])
+            while v.get_parent() is not None:       # goal tree edges are driven backwards, towards its roots
+                segments.append(util.reverse_trajectory(self._goalTree.get_trajectory(v.id())))
+                v = v.get_parent()
+        return segments
+
+    def get_goal_trajectory(self):             # joins the segments, not continuous where the two trees of connect meet
+        segments = self.goal_trajectory_segments()
+        for xTilda in segments:
+            r_cTilda   = xTilda[:, 0:2]
+            (x_c, y_c) = util.polar2xy_large(r_cTilda)
+            if self._headless:
+                self._pathRecord.append(np.column_stack([x_c, y_c]))
+            else:
+                self._axes.plot(x_c, y_c, color=(0.0, 0, 1.0, 0.25), linestyle='-', linewidth=4.0)
 
-            x_i                      = v_i.element()
-            q_iPlus                  = v_iPlus1.get_reference_config()
-            (t_head_min, t_head_max) = e_i_2_iPlus1.element()
+        N = sum([len(xTilda) for xTilda in segments])
+        self._xTilda = np.empty((N + 1, 5))
+        i_1 = 1
+        for xTilda in segments:
+            self._xTilda[i_1:i_1 + len(xTilda)] = xTilda
+            i_1 = i_1 + len(xTilda)
 
-            self._robot.set_x_0(x_i)
-            self._robot.set_q_ref(q_iPlus)
-            self._robot.set_t_head_min(t_head_min)
-            self._robot.set_t_head_max(t_head_max)
+        self._xTilda[0, :] = self._xTilda[1, :] if N > 0 else 0
 
-            (xTilda, info) = self._robot.get_trajectory(degrees=False, plot=False)
-            r_cTilda             = xTilda[:, 0:2]
-            (x_c, y_c)           = util.polar2xy_large(r_cTilda)
-            self._axes.plot(x_c, y_c, color=(0.0, 0, 1.0, 0.25), linestyle='-', linewidth=4.0)
+    def integrate_edge(self, v_i, v_iPlus1):
+        e_i_2_iPlus1 = self._RRTtree.get_edge(v_i, v_iPlus1)
 
-            self._xTilda = np.vstack((self._xTilda, xTilda))
+        x_i                      = v_i.element()
+        q_iPlus                  = v_iPlus1.get_reference_config()
+        (t_head_min, t_head_max) = e_i_2_iPlus1.element()
 
-        self._xTilda[0, :] = self._xTilda[1, :]
+        (xTilda, info) = self._robot.integrate(Robot.Rollout(x_i, q_iPlus, t_head_min, t_head_max))
+        return xTilda
 
     # _______________________________________________RRT___________________________________________________________
     def build_RRT(self, K):
         results = []
         for k in range(0, K):
+            if self._report is not None:
+                self._report.add_iteration()
+
+            t_0              = time.perf_counter()
             q_rand           = self.random_config(1, distribution='N')
             r_ref_polar      = q_rand[0:2]
             (x_rand, y_rand) = util.polar2xy(r_ref_polar)
-            if self.collision([x_rand, y_rand], plot=True):
+            bad_sample       = self.collision_batch([x_rand, y_rand], plot=True)[0]
+            self.profile('sampling', t_0)
+            if bad_sample:
                 results.append('bad sample')
                 continue
 
@@ -523,54 +993,393 @@ class Environment:
                 break
         return results
 
+    def build_RRT_parallel(self, K, batch_size=None, workers=None):
+        workers    = os.cpu_count() if workers is None else workers
+        batch_size = 2*workers if batch_size is None else batch_size
+
+        results = []
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=Parallel.init_worker, initargs=(self.steering_copy(),)) as pool:
+            k = 0
+            while (k < K) & (len(self._goal_indices) == 0):
+                batch = []
+                while (k < K) & (len(batch) < batch_size):
+                    k = k + 1
+                    q_rand           = self.random_config(1, distribution='N')
+                    r_ref_polar      = q_rand[0:2]
+                    (x_rand, y_rand) = util.polar2xy(r_ref_polar)
+                    if self.collision_batch([x_rand, y_rand], plot=True)[0]:
+                        results.append('bad sample')
+                        continue
+
+                    v_near = self.nearest_neighbor(q_rand)      # against the tree as of the batch start
+                    seed   = self.spawn_seeds(1)[0]      # the worker steers with its own stream
+                    batch.append((v_near, q_rand, seed))
+
+                tasks = [(v_near.element(), q_rand, seed) for (v_near, q_rand, seed) in batch]
+
+                for (v_near, q_rand, seed), steered in zip(batch, pool.map(Parallel.steer, tasks)):
+                    if len(self._goal_indices) > 0:
+                        break
+
+                    (good, xTilda, t_head_control, (points, collision), trajectories) = steered
+                    if len(points) > 0:
+                        self.paint_collision_points(points, collision)
+                    for r_c in trajectories:
+                        self.paint_trajectory(r_c)
+
+                    if good:
+                        self._xTilda = xTilda
+                        results.append(self.insert_extension(v_near, q_rand, xTilda, t_head_control))
+                    else:
+                        results.append('trapped')
+        return results
+
     def extend_tree(self, q_rand):              # only ρ and φ are random
-        v_near = self.nearest_neighbor(q_rand)
-        x_near = v_near.element()
+        t_extend = time.perf_counter()
+        t_0      = t_extend
+        v_near   = self.nearest_neighbor(q_rand)
+        x_near   = v_near.element()
+        self.profile('nearest_neighbor', t_0)
+
+        extended = 'trapped'
+        if self.new_state(q_rand, x_near):
+            t_0            = time.perf_counter()
+            t_head_control = self.time_control()
+            extended       = self.insert_extension(v_near, q_rand, self._xTilda, t_head_control)
+            self.profile('insert', t_0)
+
+        if self._report is not None:
+            self._report.add_latency(time.perf_counter() - t_extend)
+        return extended
+
+    def insert_extension(self, v_near, q_rand, xTilda, t_head_control):
+        if self._goal_detection == 'trajectory':     # the edge ends where it first enters the goal
+            i_goal = self.check_goal_trajectory(xTilda)
+            if i_goal > 0:
+                xTilda = xTilda[0:i_goal + 1]
+                self._xTilda = xTilda
 
-        good_state = self.new_state(q_rand, x_near)
-        if good_state:
-            end   = len(self._xTilda[:, 1]) - 1
-            x_new = self._xTilda[end, :]
-            q_new = x_new[0:3]
+        x_near = v_near.element()
+        end    = len(xTilda[:, 1]) - 1
+        x_new  = xTilda[end, :]
+        q_new  = x_new[0:3]
 
-            t_head_control = (self._robot.get_t_head_min(), self._robot.get_t_head_max())
+        v_new = self._RRTtree.insert_vertex(x=x_new, padre=v_near, trajectory=xTilda)
+        self._kd_Tree.insert(q_new, v_new.id())
 
-            v_new = self._RRTtree.insert_vertex(x=x_new, padre=v_near)
+        r_ref_polar = q_rand[0:2]
+        q_ref = np.concatenate((r_ref_polar, [util.heading_direction(x_near[0:2], r_ref_polar)]), axis=0)
+        v_new.set_reference_config(q_ref=q_ref)
+
+        e_new = self._RRTtree.get_edge(v_near, v_new)
+        e_new.set_element(t_head_control)
+
+        metric = util.metric(q_new, q_rand, self._metric_weight)
+        ε = self._ε
+        if metric < ε:
+            if self.check_goal(q_new):
+                print('\nGoal found!!!!!!! \n')
+                self._goalVertices.append(v_new.id())
+                self.get_goal_node_indices(v_new)
+            return 'reached'
+        else:
+            if self.check_goal(q_new):
+                print('\nGoal found!!!!!!! \n')
+                self._goalVertices.append(v_new.id())
+                self.get_goal_node_indices(v_new)
+            return 'advanced'
+    # _______________________________________________RRT___________________________________________________________
 
-            r_ref_polar = q_rand[0:2]
-            q_ref = np.concatenate((r_ref_polar, [util.heading_direction(x_near[0:2], r_ref_polar)]), axis=0)
-            v_new.set_reference_config(q_ref=q_ref)
+    # ___________________________________________Bidirectional RRT______________________________________________________
+    """
+    The goal tree grows forwards in time from states in the goal disc, like the start tree. The unicycle path
+    of a goal tree edge, driven in reverse time with θ + π and -ω, is again a forward drive, so a goal tree
+    vertex x_g is reached when a start tree rollout ends close to [ρ_g φ_g θ_g + π].
+    """
+    def build_RRT_connect(self, K, n_goal_states=8, distribution='U'):
+        self.init_goal_tree(n_goal_states)
+        self._connection = None
 
-            e_new = self._RRTtree.get_edge(v_near, v_new)
-            e_new.set_element(t_head_control)
+        results = []
+        for k in range(0, K):
+            q_rand           = self.random_config(1, distribution=distribution)
+            r_ref_polar      = q_rand[0:2]
+            (x_rand, y_rand) = util.polar2xy(r_ref_polar)
+            if self.collision_batch([x_rand, y_rand], plot=True)[0]:
+                results.append('bad sample')
+                continue
 
-            metric = util.metric(q_new, q_rand, self._metric_weight)
-            ε = self._ε
-            if metric < ε:
-                if self.check_goal(q_new):
-                    print('\nGoal found!!!!!!! \n')
-                    self.get_goal_node_indices(v_new)
-                return 'reached'
+            if k % 2 == 0:                          # the trees take turns, the new vertex tries to connect
+                extended = self.extend_tree(q_rand)
+                if (extended != 'trapped') and (not self.goal_found()):
+                    v_s = self._RRTtree.get_vertex(self._RRTtree.num_vertices() - 1)
+                    if self.connect(v_s, self.nearest_goal_vertex(util.flip_heading(v_s.element()))):
+                        extended = 'connected'
             else:
-                if self.check_goal(q_new):
-                    print('\nGoal found!!!!!!! \n')
-                    self.get_goal_node_indices(v_new)
-                return 'advanced'
-        return 'trapped'
-    # _______________________________________________RRT___________________________________________________________
+                v_g      = self.extend_goal_tree(q_rand)
+                extended = 'trapped' if v_g is None else 'advanced'
+                if (v_g is not None) and self.connect(self.nearest_neighbor(util.flip_heading(v_g.element())), v_g):
+                    extended = 'connected'
+
+            results.append(extended)
+            if self.goal_found():
+                break
+        return results
+
+    def init_goal_tree(self, n_goal_states=8):  # roots: collision free states at rest in the goal disc
+        roots = []
+        for i_1 in range(0, 100*n_goal_states):
+            if len(roots) == n_goal_states:
+                break
+            r = self._ε_goal*np.sqrt(self._rng.uniform(0, 1))
+            α = self._rng.uniform(-np.pi, np.pi)
+            x = self._goal[0] + r*np.cos(α)
+            y = self._goal[1] + r*np.sin(α)
+            if self.collision_batch([x, y])[0]:
+                continue
+            (ρ, φ) = util.xy2polar(x, y)
+            roots.append(np.array([ρ, φ, self._rng.uniform(-np.pi, np.pi), 0.0, 0.0]))
+
+        if len(roots) == 0:
+            print('\nERROR: the goal disc is inside an obstacle.\n')
+            return
+
+        if self._goalTree is not None:
+            self._goalTree.close()
+        self._goalTree     = Tree.Tree(roots[0])
+        self._goal_kd_Tree = BinaryTree.KdTree(self._metric_weight)
+        self._goal_kd_Tree.insert(roots[0][0:3], 0)
+        for x_root in roots[1:]:
+            v = self._goalTree.insert_vertex(x_root, padre=None)
+            self._goal_kd_Tree.insert(x_root[0:3], v.id())
+
+    def nearest_goal_vertex(self, q):
+        (indices, _) = self._goal_kd_Tree.nearest(q, k=1)
+        return self._goalTree.get_vertex(indices[0])
+
+    def extend_goal_tree(self, q_rand):         # O/P: the new goal tree vertex, None if trapped
+        v_near = self.nearest_goal_vertex(q_rand)
+        x_near = v_near.element()
+        self.set_goal_events(False)             # its rollouts start in the goal disc
+        steered = self.new_state(q_rand, x_near)
+        self.set_goal_events(True)
+        if not steered:
+            return None
+
+        x_new = self._xTilda[-1, :]
+        v_new = self._goalTree.insert_vertex(x=x_new, padre=v_near, trajectory=self._xTilda)
+        self._goal_kd_Tree.insert(x_new[0:3], v_new.id())
+
+        q_ref = np.concatenate((q_rand[0:2], [util.heading_direction(x_near[0:2], q_rand[0:2])]), axis=0)
+        v_new.set_reference_config(q_ref=q_ref)
+        self._goalTree.get_edge(v_near, v_new).set_element(self.time_control())
+        return v_new
+
+    def connect(self, v_s, v_g):                # O/P: True if a rollout from v_s reaches goal tree vertex v_g
+        q_g = util.flip_heading(v_g.element())
+        if not self.new_state(q_g, v_s.element()):
+            return False
+
+        metric  = util.metric_many(q_g, self._xTilda[:, 0:3], self._metric_weight)
+        i_close = int(np.argmin(metric))
+        if (metric[i_close] < self._ε) and (i_close > 0):   # the edge ends where it comes closest to v_g
+            self._xTilda = self._xTilda[0:i_close + 1]
+
+        t_head_control = self.time_control()
+        self.insert_extension(v_s, q_g, self._xTilda, t_head_control)
+        if self.goal_found():                   # the rollout crossed the goal disc on its way
+            return True
+
+        v_new = self._RRTtree.get_vertex(self._RRTtree.num_vertices() - 1)
+        if util.metric(v_new.element()[0:3], q_g, self._metric_weight) >= self._ε:
+            return False
+
+        print('\nTrees connected!!!!!!! \n')
+        self._connection = (v_new.id(), v_g.id())
+        self.get_goal_node_indices(v_new)
+        return True
+    # ___________________________________________Bidirectional RRT______________________________________________________
+
+    # ____________________________________________Anytime RRT*_________________________________________________________
+    def plan(self, deadline_s, on_improvement=None, first_solution=False):
+        """
+        O/P: best goal trajectory found before the deadline, or None. Planning runs to the deadline and reports every
+        cheaper path to on_improvement(cost, path) on the way; first_solution returns the first path as soon as it is found.
+        """
+        t_end = time.perf_counter() + deadline_s
+        self.keep_best()
+        while time.perf_counter() < t_end:
+            q_rand           = self.random_config(1, distribution='N')
+            r_ref_polar      = q_rand[0:2]
+            (x_rand, y_rand) = util.polar2xy(r_ref_polar)
+            if self.collision_batch([x_rand, y_rand], plot=True)[0]:
+                continue
+
+            v_near = self.nearest_neighbor(q_rand)
+            if not self.new_state(q_rand, v_near.element()):
+                continue
+
+            t_head_control = self.time_control()
+            self.insert_extension(v_near, q_rand, self._xTilda, t_head_control)
+            v_new = self._RRTtree.get_vertex(self._RRTtree.num_vertices() - 1)
+
+            self.choose_parent(v_new, t_end)
+            self.rewire(v_new, t_end)
+
+            if self.keep_best():                     # first feasible path, or a shorter one
+                if on_improvement is not None:
+                    on_improvement(self._bestCost, self._bestPath)
+                if first_solution:
+                    break
+
+        if self.best_goal_vertex() >= 0:             # get_goal_trajectory follows the best path
+            self.get_goal_node_indices(self._RRTtree.get_vertex(self.best_goal_vertex()))
+        return self.best_path()
+
+    def steer_to_vertex(self, x_from, v_to):    # O/P: (reached, xTilda) of a rollout from x_from towards v_to
+        q_to = v_to.element()[0:3]
+        if not self.new_state(q_to, x_from):
+            return False, None
+        reached = util.metric(self._xTilda[-1, 0:3], q_to, self._metric_weight) < self._ε_rewire
+        return reached, self._xTilda
+
+    def resteer_subtree(self, v, x_v):          # O/P: {id: new edge} below v driven again from x_v, None if one fails
+        tree   = self._RRTtree
+        states = {v.id(): x_v}
+        edges  = {}
+        for i in tree.subtree(v)[1:]:           # parents come before their children
+            u = tree.get_vertex(i)
+            (t_head_min, t_head_max) = tree.get_edge(u.get_parent(), u).element()
+            rollout = Robot.Rollout(states[tree.parents()[i]], u.get_reference_config(), t_head_min, t_head_max)
+
+            (xTilda, info) = self._robot.integrate(rollout)
+            if info['message'] != 'Integration successful.':
+                return None
+            xTilda_old = tree.get_trajectory(i)
+            if xTilda_old is not None:          # as long as the edge it replaces, cut short or not
+                xTilda = xTilda[0:len(xTilda_old)]
+            if self.collision_trajectories(xTilda[np.newaxis])[0]:
+                return None
+
+            edges[i]  = xTilda
+            states[i] = xTilda[-1]
+        return edges
+
+    def rewire_edge(self, v, padre, xTilda):     # O/P: True if v moved to the end of xTilda, below padre
+        edges = self.resteer_subtree(v, xTilda[-1])
+        if edges is None:                       # the subtree cannot follow v to its new state
+            return False
+
+        tree  = self._RRTtree
+        ends  = {v.id(): xTilda}
+        ends.update(edges)
+        costs = {v.id(): tree.get_cost(padre.id()) + util.path_length(xTilda)}
+        for (i, xTilda_i) in edges.items():     # parents come before their children
+            costs[i] = costs[tree.parents()[i]] + util.path_length(xTilda_i)
+        for i in self._goalVertices:            # a goal below v must stay in the goal disc and not get dearer
+            if (i in costs) and ((costs[i] > tree.get_cost(i)) or not self.check_goal(ends[i][-1])):
+                return False
+
+        t_head_control = self.time_control()
+        q_ref = np.concatenate((v.element()[0:2], [util.heading_direction(padre.element()[0:2], v.element()[0:2])]))
+
+        e = tree.set_parent(v, padre, trajectory=xTilda, x=xTilda[-1])
+        e.set_element(t_head_control)
+        v.set_reference_config(q_ref=q_ref)
+        self._kd_Tree.move(xTilda[-1, 0:3], v.id())
+
+        for (i, xTilda_i) in edges.items():
+            tree.set_state(i, xTilda_i[-1], xTilda_i)
+            self._kd_Tree.move(xTilda_i[-1, 0:3], i)
+        return True
+
+    def choose_parent(self, v_new, t_end):       # cheapest vertex among the k nearest that reaches v_new
+        tree = self._RRTtree
+        (near, _) = self.k_nearest_neighbors(v_new.element()[0:3], self._k_rewire + 1)
+        for u in near:
+            if time.perf_counter() >= t_end:
+                return
+            if (u.id() == v_new.id()) | (u.id() == tree.parents()[v_new.id()]):
+                continue
+            if tree.get_cost(u.id()) + np.linalg.norm(tree.positions()[v_new.id()] - tree.positions()[u.id()]) \
+                    >= tree.get_cost(v_new.id()):  # cannot be cheaper
+                continue
+
+            (reached, xTilda) = self.steer_to_vertex(u.element(), v_new)
+            if reached and (tree.get_cost(u.id()) + util.path_length(xTilda) < tree.get_cost(v_new.id())):
+                self.rewire_edge(v_new, u, xTilda)
+
+    def rewire(self, v_new, t_end):              # k nearest vertices that get cheaper through v_new
+        tree = self._RRTtree
+        (near, _) = self.k_nearest_neighbors(v_new.element()[0:3], self._k_rewire + 1)
+        for u in near:
+            if time.perf_counter() >= t_end:
+                return
+            if (u.id() == v_new.id()) | (u.id() == tree.parents()[v_new.id()]) | (u.id() == 0):
+                continue
+            if tree.get_cost(v_new.id()) + np.linalg.norm(tree.positions()[u.id()] - tree.positions()[v_new.id()]) \
+                    >= tree.get_cost(u.id()):
+                continue
+
+            (reached, xTilda) = self.steer_to_vertex(v_new.element(), u)
+            if reached and (tree.get_cost(v_new.id()) + util.path_length(xTilda) < tree.get_cost(u.id())):
+                self.rewire_edge(u, v_new, xTilda)
+
+    def best_goal_vertex(self):                  # O/P: id of the cheapest goal vertex, -1 if none
+        if len(self._goalVertices) == 0:
+            return -1
+        costs = self._RRTtree.costs()[self._goalVertices]
+        return self._goalVertices[int(np.argmin(costs))]
+
+    def keep_best(self):                         # O/P: True if the tree now holds a strictly cheaper goal path
+        i_best = self.best_goal_vertex()
+        if (i_best < 0) or (self._RRTtree.get_cost(i_best) >= self._bestCost):
+            return False
+        self._bestCost = self._RRTtree.get_cost(i_best)
+        self._bestPath = self.goal_path(i_best)
+        return True
+
+    def best_cost(self):                         # O/P: cost of best_path, never rises
+        self.keep_best()
+        return self._bestCost
+
+    def best_path(self):                         # O/P: cheapest goal trajectory so far, None before the first one
+        self.keep_best()
+        return self._bestPath
+
+    def goal_path(self, i_goal):                 # O/P: trajectory from the root to goal vertex i_goal, a copy
+        indices = []
+        v = self._RRTtree.get_vertex(i_goal)
+        while v is not None:
+            indices.append(v.id())
+            v = v.get_parent()
+
+        goal_indices = self._goal_indices
+        self._goal_indices = indices
+        segments = self.goal_trajectory_segments()
+        self._goal_indices = goal_indices
+        return np.concatenate(segments) if len(segments) > 0 else None
+    # ____________________________________________Anytime RRT*_________________________________________________________
 
     def nearest_neighbor(self, q_rand, exact=False):
-        distances = []
-        for v in self._RRTtree.vertices():
-            x = v.element()
-            q = x[0:3]
-
-            metric_i = util.metric(q, q_rand, self._metric_weight)
-            distances.append(metric_i)
-        min_index = np.argmin(distances)
-        v_nearest = self._RRTtree.get_vertex(min_index)
+        if self._nn_method == 'kdtree':
+            (indices, _) = self._kd_Tree.nearest(q_rand, k=1)
+            return self._RRTtree.get_vertex(indices[0])
+
+        (indices, _) = self._RRTtree.nearest_neighbors(q_rand, self._metric_weight)
+        v_nearest = self._RRTtree.get_vertex(indices[0])
         return v_nearest
 
+    def nearest_neighbors(self, q_batch):
+        (indices, distances) = self._RRTtree.nearest_neighbors(q_batch, self._metric_weight)
+        return [self._RRTtree.get_vertex(i) for i in indices], distances
 
+    def k_nearest_neighbors(self, q, k):
+        (indices, distances) = self._kd_Tree.nearest(q, k=k)
+        return [self._RRTtree.get_vertex(i) for i in indices], distances
 
+    def near_vertices(self, q, r):
+        (indices, distances) = self._kd_Tree.radius(q, r)
+        return [self._RRTtree.get_vertex(i) for i in indices], distances
 
@@ -0,0 +1,68 @@
+"""
+October 17, 2026
+Heading Sampler Class
+"""
+import Utility as util
+import numpy as np
+
+
+class HeadingSampler:                           # empirical distribution of heading windows that integrated
+    __slots__ = '_n_distance', '_n_heading', '_distanceMax', '_capacity', '_minSuccesses', '_σ', \
+                '_windows', '_count', '_attempts', '_successes'
+
+    def __init__(self, distance_max, n_distance=6, n_heading=8, capacity=64, min_successes=4, σ=0.02):
+        self._n_distance   = n_distance         # bins of the start to reference distance, the last one is open
+        self._n_heading    = n_heading          # bins of the heading change θ_ref - θ_0 over [-π, π)
+        self._distanceMax  = distance_max       # longest extension expected, see for_workspace
+        self._capacity     = capacity           # successful windows kept per bin, oldest overwritten first
+        self._minSuccesses = min_successes      # below this the bin is not trusted
+        self._σ            = σ                  # jitter of a drawn window, fraction of the time duration
+
+        n_bins = n_distance*n_heading
+        self._windows   = np.empty((n_bins, capacity, 2))  # (t_head_min, t_head_max) as fractions of the duration
+        self._count     = np.zeros(n_bins, dtype=np.int64)
+        self._attempts  = np.zeros(n_bins, dtype=np.int64)
+        self._successes = np.zeros(n_bins, dtype=np.int64)
+
+    @classmethod
+    def for_workspace(cls, X, Y, **kwargs):      # distance bins spread over the diagonal of the workspace X × Y
+        return cls(np.hypot(X[1] - X[0], Y[1] - Y[0]), **kwargs)
+
+    def bin(self, x_0, q_ref):                  # relative geometry of the extension: distance and heading change
+        distance = np.linalg.norm(util.polar2xy(q_ref[0:2]) - util.polar2xy(x_0[0:2]))
+        Δθ       = util.wrap_angle(q_ref[2] - x_0[2])
+
+        i_distance = min(int(distance/self._distanceMax*(self._n_distance - 1)), self._n_distance - 1)
+        i_heading  = min(int((Δθ + np.pi)/(2*np.pi)*self._n_heading), self._n_heading - 1)
+        return i_distance*self._n_heading + i_heading
+
+    def record(self, x_0, q_ref, window, success):     # window: (t_head_min, t_head_max) as fractions
+        i_bin = self.bin(x_0, q_ref)
+        self._attempts[i_bin] += 1
+        if not success:
+            return
+
+        self._windows[i_bin, self._successes[i_bin] % self._capacity] = window
+        self._successes[i_bin] += 1
+        self._count[i_bin] = min(self._count[i_bin] + 1, self._capacity)
+
+    def draw(self, x_0, q_ref, dt_min, dt_max, rng):    # O/P: a jittered successful window, None if the bin is too new
+        i_bin = self.bin(x_0, q_ref)
+        if self._count[i_bin] < self._minSuccesses:
+            return None
+
+        window = self._windows[i_bin, rng.integers(0, self._count[i_bin])]
+        for i_1 in range(0, 10):
+            (t_head_min, t_head_max) = window + rng.normal(0.0, self._σ, 2)
+            dt = t_head_max - t_head_min
+            if (dt > dt_min) & (dt < dt_max) & (t_head_min >= 0) & (t_head_max <= 1):
+                return t_head_min, t_head_max
+        return window[0], window[1]             # integrated once as it is
+
+    def success_rates(self):                    # O/P: (n_distance, n_heading) integration success rate, nan if unseen
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rates = self._successes/self._attempts
+        return rates.reshape(self._n_distance, self._n_heading)
+
+    def attempts(self):
+        return self._attempts.reshape(self._n_distance, self._n_heading)
@@ -0,0 +1,316 @@
+"""
+October 17, 2026
+Integrator Classes
+"""
+import numpy as np
+import numba
+from scipy import integrate
+
+
+SUCCESS = 'Integration successful.'
+
+
+LSODA_MESSAGES = {-1: 'Excess work done on this call (perhaps wrong Dfun type).',     # as odeint reports them
+                  -2: 'Excess accuracy requested (tolerances too small).',
+                  -3: 'Illegal input detected (internal error).',
+                  -4: 'Repeated error test failures (internal error).',
+                  -5: 'Repeated convergence failures (perhaps bad Jacobian or tolerances).',
+                  -6: 'Error weight became zero during problem.'}
+
+
+def integrate_chunks(integrate_once, x_0, t, event, chunk):     # restarts integrate_once every chunk output steps
+    # exact for fixed step RK4 only: the restart state is the one the uninterrupted loop would carry on from
+    sol = np.full((len(t), len(x_0)), np.nan)
+    sol[0] = x_0
+
+    info = {'message': SUCCESS, 'n_steps': 0, 'n_rhs': 0, 'i_event': None}
+    i = 0
+    while i < len(t) - 1:
+        j = min(i + chunk, len(t) - 1)
+        (sol_chunk, info_chunk) = integrate_once(sol[i], t[i:j + 1])
+        info['n_steps'] = info['n_steps'] + info_chunk['n_steps']
+        info['n_rhs']   = info['n_rhs'] + info_chunk['n_rhs']
+        sol[i + 1:j + 1] = sol_chunk[1:]
+
+        if info_chunk['message'] != SUCCESS:
+            info['message'] = info_chunk['message']
+            break
+
+        hit = np.flatnonzero(event(sol_chunk[1:]))
+        if len(hit) > 0:
+            info['i_event'] = i + 1 + hit[0]
+            return sol[0:info['i_event'] + 1], info
+        i = j
+    return sol, info
+
+
+# -------------------------------------------------LSODA----------------------------------------------------------------
+class LSODA:
+    __slots__ = '_hmax', '_rtol', '_atol'
+
+    def __init__(self, hmax=0.001, rtol=1.0e-8, atol=1.0e-8):
+        self._hmax = hmax
+        self._rtol = rtol
+        self._atol = atol
+
+    def name(self):
+        return 'LSODA'
+
+    def reentrant(self):                        # odeint keeps the LSODA state in Fortran common blocks
+        return False
+
+    def integrate(self, f, x_0, t, args=(), event=None, f_out=None):    # f(x, t, *args), event(sol) flags rows of sol
+        if event is not None:                   # f_out(x, t, *args, xDot) is only used by RK4
+            return self.integrate_event(f, x_0, t, args, event)
+
+        (sol, info) = integrate.odeint(f, x_0, t, args=args,
+                                       hmax=self._hmax, rtol=self._rtol, atol=self._atol,
+                                       full_output=True)
+
+        if info['message'] != SUCCESS:          # odeint leaves the rows after the failure uninitialised
+            n = valid_rows(info['nst'])
+            for key in ('hu', 'tcur', 'tolsf', 'tsw', 'nst', 'nfe', 'nje', 'nqu', 'mused'):
+                info[key] = info[key][0:n]
+
+        info['n_steps'] = int(info['nst'][-1])
+        info['n_rhs']   = int(info['nfe'][-1])
+        info['i_event'] = None
+        return sol, info
+
+    def integrate_event(self, f, x_0, t, args, event):  # same steps as odeint, event checked after every output sample
+        solver = integrate.ode(lambda τ, x: f(x, τ, *args))
+        solver.set_integrator('lsoda', rtol=self._rtol, atol=self._atol, max_step=self._hmax, nsteps=500)
+        solver.set_initial_value(x_0, t[0])
+
+        sol = np.full((len(t), len(x_0)), np.nan)
+        sol[0] = x_0
+
+        stats   = []                            # hu, tcur, nst and nfe after every output sample, as odeint gives them
+        message = SUCCESS
+        i_event = None
+        for i in range(1, len(t)):             # the solver carries on from where it stopped, nothing is restarted
+            sol[i] = solver.integrate(t[i])
+            if not solver.successful():
+                message = LSODA_MESSAGES.get(solver.get_return_code(), 'Integration failed.')
+                sol[i]  = np.nan
+                break
+            (rwork, iwork) = (solver._integrator.rwork, solver._integrator.iwork)
+            stats.append((rwork[10], rwork[12], iwork[10], iwork[11]))
+
+            if event(sol[i][np.newaxis])[0]:
+                i_event = i
+                sol     = sol[0:i + 1]
+                break
+
+        stats = np.array(stats).reshape(-1, 4)
+        info  = {'message': message,
+                 'hu':      stats[:, 0],
+                 'tcur':    stats[:, 1],
+                 'nst':     stats[:, 2].astype(np.int64),
+                 'nfe':     stats[:, 3].astype(np.int64),
+                 'n_steps': int(stats[-1, 2]) if len(stats) > 0 else 0,
+                 'n_rhs':   int(stats[-1, 3]) if len(stats) > 0 else 0,
+                 'i_event': i_event}
+        return sol, info
+
+
+def valid_rows(nst, mxstep=500):                # O/P: rows of an odeint info array written before a failure
+    n = 1
+    while (n < len(nst)) and (nst[n - 1] <= nst[n] <= nst[n - 1] + mxstep):
+        n = n + 1
+    return n
+# -------------------------------------------------LSODA----------------------------------------------------------------
+
+
+# -----------------------------------------------SolveIVP---------------------------------------------------------------
+class SolveIVP:
+    __slots__ = '_method', '_rtol', '_atol', '_max_step'
+
+    def __init__(self, method='RK45', rtol=1.0e-6, atol=1.0e-8, max_step=np.inf):
+        self._method   = method
+        self._rtol     = rtol
+        self._atol     = atol
+        self._max_step = max_step
+
+    def name(self):
+        return 'solve_ivp-' + str(self._method)
+
+    def reentrant(self):
+        return True
+
+    def integrate(self, f, x_0, t, args=(), event=None, f_out=None):
+        fun    = lambda τ, x: f(x, τ, *args)
+        events = None
+        if event is not None:                   # +1 while event(x) is off, -1 once it is on, the sign change stops
+            events = lambda τ, x: 1.0 - 2.0*event(x[np.newaxis])[0]
+            events.terminal = True
+
+        res = integrate.solve_ivp(fun, (t[0], t[-1]), x_0, method=self._method, dense_output=True, events=events,
+                                  rtol=self._rtol, atol=self._atol, max_step=self._max_step)
+
+        sol = np.full((len(t), len(x_0)), np.nan)
+        if res.sol is not None:
+            reached = t <= res.t[-1]
+            sol[reached] = res.sol(t[reached]).T
+
+        i_event = None
+        if res.status == 1:                     # stopped at the event, the first output sample after it ends sol
+            i_event = min(int(np.searchsorted(t, res.t[-1])), len(t) - 1)
+            if t[i_event] > res.t[-1]:
+                tail = integrate.solve_ivp(fun, (res.t[-1], t[i_event]), res.y[:, -1], method=self._method,
+                                           rtol=self._rtol, atol=self._atol, max_step=self._max_step)
+                sol[i_event] = tail.y[:, -1]
+            sol = sol[0:i_event + 1]
+
+        info = {'message': SUCCESS if res.success else res.message,
+                'hu':      np.diff(res.t),
+                'n_steps': len(res.t) - 1,
+                'n_rhs':   res.nfev,
+                'njev':    res.njev,
+                'nlu':     res.nlu,
+                'i_event': i_event}
+        return sol, info
+# -----------------------------------------------SolveIVP---------------------------------------------------------------
+
+
+# --------------------------------------------------RK4-----------------------------------------------------------------
+class RK4:
+    __slots__ = '_dt', '_compiled', '_chunk'
+
+    def __init__(self, dt=0.01, compiled=False, event_chunk=10):
+        self._dt       = dt
+        self._compiled = compiled       # numba f_out and a single state: the whole loop runs in rk4_compiled
+        self._chunk    = event_chunk
+
+    def name(self):
+        return 'RK4-compiled' if self._compiled else 'RK4'
+
+    def reentrant(self):
+        return True
+
+    def integrate(self, f, x_0, t, args=(), event=None, f_out=None):     # x_0 may hold a batch of states, one per row
+        x   = np.array(x_0, dtype=float)
+        if self._compiled and (x.ndim == 1) and hasattr(f_out, 'py_func'):     # f_out is a numba dispatcher
+            if event is not None:
+                return integrate_chunks(lambda x_i, τ: self.integrate(f, x_i, τ, args, f_out=f_out),
+                                        x, t, event, self._chunk)
+
+            (sol, n_steps, i_fail) = rk4_compiled(f_out, x, np.asarray(t, dtype=float), self._dt, *args)
+            message = SUCCESS if i_fail < 0 else 'Integration failed: non-finite state at t = ' + str(t[i_fail]) + '.'
+            info    = {'message': message,
+                       'n_steps': n_steps,
+                       'n_rhs':   4*n_steps,
+                       'success': np.array(i_fail < 0),
+                       'i_event': None}
+            return sol, info
+
+        sol = np.full((len(t),) + x.shape, np.nan)
+        sol[0] = x
+
+        step = self.step if f_out is None else self.step_out
+        work = None if f_out is None else np.empty((6,) + x.shape)      # k_1 .. k_4 and two scratch states
+
+        message = SUCCESS
+        n_steps = 0
+        finite  = np.ones(x.shape[0:-1], dtype=bool)
+        i_event = None
+        for i in range(1, len(t)):
+            n_sub = max(1, int(np.ceil((t[i] - t[i-1])/self._dt - 1.0e-9)))
+            h     = (t[i] - t[i-1])/n_sub
+            τ     = t[i-1]
+            for j in range(0, n_sub):
+                x = step(f if f_out is None else f_out, x, τ, h, args, work)
+                τ = τ + h
+            n_steps = n_steps + n_sub
+
+            sol[i] = x
+
+            finite = finite & np.all(np.isfinite(x), axis=-1)
+            if not np.all(finite):                      # failed rows of a batch keep running as NaN
+                message = 'Integration failed: non-finite state at t = ' + str(t[i]) + '.'
+                if not np.any(finite):
+                    break
+
+            if (event is not None) and event(x[np.newaxis])[0]:    # single states only
+                i_event = i
+                sol     = sol[0:i + 1]
+                break
+
+        info = {'message': message,
+                'n_steps': n_steps,
+                'n_rhs':   4*n_steps,
+                'success': finite,
+                'i_event': i_event}
+        return sol, info
+
+    @staticmethod
+    def step(f, x, τ, h, args, work):            # O/P: x after one RK4 step of f(x, t, *args)
+        k_1 = f(x, τ, *args)
+        k_2 = f(x + (h/2)*k_1, τ + h/2, *args)
+        k_3 = f(x + (h/2)*k_2, τ + h/2, *args)
+        k_4 = f(x + h*k_3, τ + h, *args)
+        return x + (h/6)*(k_1 + 2*k_2 + 2*k_3 + k_4)
+
+    @staticmethod
+    def step_out(f_out, x, τ, h, args, work):    # same step in place, f_out(x, t, *args, xDot) fills work rows
+        (k_1, k_2, k_3, k_4, x_s, Σ) = work
+        f_out(x, τ, *args, k_1)
+        np.multiply(k_1, h/2, out=x_s)
+        np.add(x, x_s, out=x_s)
+        f_out(x_s, τ + h/2, *args, k_2)
+        np.multiply(k_2, h/2, out=x_s)
+        np.add(x, x_s, out=x_s)
+        f_out(x_s, τ + h/2, *args, k_3)
+        np.multiply(k_3, h, out=x_s)
+        np.add(x, x_s, out=x_s)
+        f_out(x_s, τ + h, *args, k_4)
+
+        np.multiply(k_2, 2, out=Σ)              # same order of operations as step, so the results match bit for bit
+        np.add(k_1, Σ, out=Σ)
+        np.multiply(k_3, 2, out=x_s)
+        np.add(Σ, x_s, out=Σ)
+        np.add(Σ, k_4, out=Σ)
+        np.multiply(Σ, h/6, out=Σ)
+        np.add(x, Σ, out=x)
+        return x
+
+
+@numba.njit(cache=True, nogil=True)
+def rk4_compiled(f_out, x_0, t, dt, p):         # RK4.integrate for one state of f_out(x, t, p, xDot), without the GIL
+    n   = len(x_0)
+    sol = np.full((len(t), n), np.nan)
+    x   = x_0.copy()
+    sol[0] = x
+
+    k_1 = np.empty(n)                           # every buffer is made once, the steps allocate nothing
+    k_2 = np.empty(n)
+    k_3 = np.empty(n)
+    k_4 = np.empty(n)
+    x_s = np.empty(n)
+
+    n_steps = 0
+    for i in range(1, len(t)):
+        n_sub = max(1, int(np.ceil((t[i] - t[i-1])/dt - 1.0e-9)))
+        h     = (t[i] - t[i-1])/n_sub
+        τ     = t[i-1]
+        for j in range(0, n_sub):
+            f_out(x, τ, p, k_1)
+            for m in range(n):
+                x_s[m] = x[m] + (h/2)*k_1[m]
+            f_out(x_s, τ + h/2, p, k_2)
+            for m in range(n):
+                x_s[m] = x[m] + (h/2)*k_2[m]
+            f_out(x_s, τ + h/2, p, k_3)
+            for m in range(n):
+                x_s[m] = x[m] + h*k_3[m]
+            f_out(x_s, τ + h, p, k_4)
+            for m in range(n):
+                x[m] = x[m] + (h/6)*(k_1[m] + 2*k_2[m] + 2*k_3[m] + k_4[m])
+            τ = τ + h
+        n_steps = n_steps + n_sub
+
+        sol[i] = x
+        if not np.all(np.isfinite(x)):
+            return sol, n_steps, i
+    return sol, n_steps, -1
+# --------------------------------------------------RK4-----------------------------------------------------------------
@@ -8,7 +8,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 
-class Obstacle(SpatialGraph.Graph):
+class Obstacle(SpatialGraph.CompactGraph):
     __slots__ = '_convex', '_delO', '_boundaryVertices', '_centroid'
 
     def __init__(self, point_list, convex=True):
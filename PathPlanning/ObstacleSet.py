@@ -0,0 +1,241 @@
+"""
+October 17, 2026
+Obstacle Set Class
+"""
+import numpy as np
+
+
+class ObstacleSet:
+    __slots__ = '_obstacleList', '_N', '_b', '_P', '_Q', '_edgeMask', '_rMin', '_rMax', '_chunk',\
+                '_centers', '_radii', '_mitre', '_boxMin', '_boxMax',\
+                '_broadphase', '_margin', '_cellSize', '_gridShape', '_cellStart', '_cellItems'
+
+    def __init__(self, obstacle_list, X, Y, chunk_size=1 << 18, broadphase=True, margin=0.0, cell_size=None):
+        self._obstacleList = [obstacle for obstacle in obstacle_list if obstacle.is_convex()]
+
+        self._rMin  = np.array([X[0], Y[0]], dtype=float)
+        self._rMax  = np.array([X[1], Y[1]], dtype=float)
+        self._chunk = chunk_size
+
+        # half-plane systems N p + b <= 0, padded with facets that never reject a point
+        n_O = len(self._obstacleList)
+        n_F = max([len(obstacle.boundary()['b']) for obstacle in self._obstacleList], default=1)
+        self._N = np.zeros((n_O, n_F, 2))
+        self._b = np.full((n_O, n_F), -np.inf)
+        for i_1, obstacle in enumerate(self._obstacleList):
+            k = len(obstacle.boundary()['b'])
+            self._N[i_1, 0:k, :] = obstacle.boundary()['N']
+            self._b[i_1, 0:k]    = obstacle.boundary()['b']
+
+        # boundary edges P -> Q of every polygon, padded edges are masked out
+        n_E = max([len(obstacle.boundary_vertices()) for obstacle in self._obstacleList], default=1)
+        self._P        = np.zeros((n_O, n_E, 2))
+        self._Q        = np.zeros((n_O, n_E, 2))
+        self._edgeMask = np.zeros((n_O, n_E), dtype=bool)
+        for i_1, obstacle in enumerate(self._obstacleList):
+            corners = np.array([[v.x_value(), v.y_value()] for v in obstacle.boundary_vertices()])
+            k = len(corners)
+            self._P[i_1, 0:k, :]     = corners
+            self._Q[i_1, 0:k, :]     = np.roll(corners, -1, axis=0)
+            self._edgeMask[i_1, 0:k] = True
+
+        # bounding circles around the centroids and bounding boxes
+        self._centers = np.array([obstacle.centroid() for obstacle in self._obstacleList]).reshape(n_O, 2)
+        Δ = np.where(self._edgeMask[:, :, None], self._P - self._centers[:, None, :], 0.0)
+        self._radii  = np.sqrt(np.max(np.sum(Δ*Δ, axis=2), axis=1, initial=0.0))
+        self._boxMin = np.min(np.where(self._edgeMask[:, :, None], self._P, np.inf), axis=1)
+        self._boxMax = np.max(np.where(self._edgeMask[:, :, None], self._P, -np.inf), axis=1)
+
+        # N p + b <= ε moves a corner by ε/cos(α/2), α the turn between the normals of its two facets
+        self._mitre = np.ones(n_O)
+        for i_1, obstacle in enumerate(self._obstacleList):
+            k    = len(obstacle.boundary_vertices())
+            e    = self._Q[i_1, 0:k] - self._P[i_1, 0:k]
+            n    = np.column_stack([e[:, 1], -e[:, 0]])/np.linalg.norm(e, axis=1)[:, None]
+            cosα = np.sum(n*np.roll(n, -1, axis=0), axis=1)
+            self._mitre[i_1] = 1/np.sqrt(np.min((1 + cosα)/2))
+
+        self._broadphase = broadphase & (n_O > 0)
+        self._margin     = margin
+        if self._broadphase:
+            self.build_grid(cell_size)
+
+    def obstacles(self):
+        return self._obstacleList
+
+    def num_obstacles(self):
+        return len(self._obstacleList)
+
+    def half_planes(self):
+        return self._N, self._b
+
+    def bounds(self):
+        return self._rMin, self._rMax
+
+    def bounding_circles(self):
+        return self._centers, self._radii
+
+    # _______________________________________________Broadphase_________________________________________________________
+    def build_grid(self, cell_size=None):
+        extent = self._rMax - self._rMin
+        if cell_size is None:                        # about one obstacle per cell
+            box_size  = np.mean(self._boxMax - self._boxMin) + 2*self._margin
+            cell_size = max(box_size, np.sqrt(extent[0]*extent[1]/len(self._obstacleList)))
+        self._cellSize  = cell_size
+        self._gridShape = np.clip(np.ceil(extent/cell_size), 1, 4096).astype(np.int64)
+
+        margin = (self._margin*self._mitre)[:, None]
+        (i_min, i_max) = (self.cell_index(self._boxMin - margin),
+                          self.cell_index(self._boxMax + margin))
+        (pair_O, pair_cell) = self.expand_cell_ranges(i_min, i_max)
+
+        order = np.argsort(pair_cell, kind='stable')
+        n_cells = self._gridShape[0]*self._gridShape[1]
+        self._cellItems = pair_O[order]
+        self._cellStart = np.concatenate([[0], np.cumsum(np.bincount(pair_cell, minlength=n_cells))])
+
+    def cell_index(self, points):                # O/P: (i_x, i_y) clipped to the grid
+        i_cell = np.floor((points - self._rMin)/self._cellSize).astype(np.int64)
+        return np.clip(i_cell, 0, self._gridShape - 1)
+
+    def expand_cell_ranges(self, i_min, i_max):  # every (row, cell) pair of the boxes [i_min, i_max]
+        n_x   = i_max[:, 0] - i_min[:, 0] + 1
+        count = n_x*(i_max[:, 1] - i_min[:, 1] + 1)
+
+        row   = np.repeat(np.arange(len(count)), count)
+        local = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        c_x   = i_min[row, 0] + local % n_x[row]
+        c_y   = i_min[row, 1] + local // n_x[row]
+        return row, c_x*self._gridShape[1] + c_y
+
+    def candidates(self, i_min, i_max, ε=0.0):      # O/P: (query, obstacle) pairs
+        n_query = len(i_min)
+        n_O     = len(self._obstacleList)
+        if (not self._broadphase) | (ε > self._margin):
+            return np.repeat(np.arange(n_query), n_O), np.tile(np.arange(n_O), n_query)
+
+        (row, cell) = self.expand_cell_ranges(i_min, i_max)
+        count = self._cellStart[cell + 1] - self._cellStart[cell]
+
+        pair_query = np.repeat(row, count)
+        local      = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        pair_O     = self._cellItems[np.repeat(self._cellStart[cell], count) + local]
+
+        if np.any(i_min != i_max):                   # queries spanning several cells meet an obstacle more than once
+            key = np.unique(pair_query*n_O + pair_O)
+            (pair_query, pair_O) = (key // n_O, key % n_O)
+        return pair_query, pair_O
+    # _______________________________________________Broadphase_________________________________________________________
+
+    def collision_bounds(self, points, ε=0.0):
+        P = np.atleast_2d(np.asarray(points, dtype=float))
+
+        col_mat = (P <= self._rMin + ε) | (P >= self._rMax - ε)
+        return col_mat[:, 0] | col_mat[:, 1]
+
+    def collision_obstacles(self, points, ε=0.0):
+        P = np.atleast_2d(np.asarray(points, dtype=float))
+
+        collision = np.zeros(len(P), dtype=bool)
+        if len(self._obstacleList) == 0:
+            return collision
+
+        i_cell = self.cell_index(P) if self._broadphase else np.zeros((len(P), 2), dtype=np.int64)
+        (pair_P, pair_O) = self.candidates(i_cell, i_cell, ε)
+
+        Δ   = P[pair_P] - self._centers[pair_O]
+        r   = self._radii[pair_O] + ε*self._mitre[pair_O]
+        hit = np.sum(Δ*Δ, axis=1) <= r*r
+        (pair_P, pair_O) = (pair_P[hit], pair_O[hit])
+
+        rows = max(1, self._chunk // self._b.shape[1])
+        for i_1 in range(0, len(pair_P), rows):
+            (P_i, O_i) = (pair_P[i_1:i_1 + rows], pair_O[i_1:i_1 + rows])
+
+            col_mat = np.einsum('kfd,kd->kf', self._N[O_i], P[P_i]) + self._b[O_i]
+            inside  = np.all(col_mat <= ε, axis=1)
+            collision[P_i[inside]] = True
+        return collision
+
+    def collision_batch(self, points, ε=0.0):
+        collision = self.collision_bounds(points, ε)
+        if np.all(collision):
+            return collision
+
+        i_free = np.flatnonzero(~collision)
+        P      = np.atleast_2d(np.asarray(points, dtype=float))
+
+        collision[i_free] = self.collision_obstacles(P[i_free], ε)
+        return collision
+
+    # _____________________________________________Continuous Collision_________________________________________________
+    def collision_segments(self, A, B, ε=0.0):      # swept disc of radius ε along each segment A -> B
+        A = np.atleast_2d(np.asarray(A, dtype=float))
+        B = np.atleast_2d(np.asarray(B, dtype=float))
+
+        collision = self.collision_bounds(A, ε) | self.collision_bounds(B, ε)
+        i_free    = np.flatnonzero(~collision)
+        if (len(i_free) == 0) | (len(self._obstacleList) == 0):
+            return collision
+
+        collision[i_free] = self.collision_segments_obstacles(A[i_free], B[i_free], ε)
+        return collision
+
+    def collision_segments_obstacles(self, A, B, ε=0.0):
+        collision = np.zeros(len(A), dtype=bool)
+
+        if self._broadphase:
+            (i_min, i_max) = (self.cell_index(np.minimum(A, B) - ε), self.cell_index(np.maximum(A, B) + ε))
+        else:
+            i_min = i_max = np.zeros((len(A), 2), dtype=np.int64)
+        (pair_S, pair_O) = self.candidates(i_min, i_max, ε)
+
+        # bounding circle against the segment
+        Δ_sq = self.point_segment_distance_sq(self._centers[pair_O], A[pair_S], B[pair_S])
+        r    = self._radii[pair_O] + ε
+        hit  = Δ_sq <= r*r
+        (pair_S, pair_O) = (pair_S[hit], pair_O[hit])
+
+        rows = max(1, self._chunk // (4*self._P.shape[1]))
+        for i_1 in range(0, len(pair_S), rows):
+            (S_i, O_i) = (pair_S[i_1:i_1 + rows], pair_O[i_1:i_1 + rows])
+            (A_i, B_i) = (A[S_i], B[S_i])
+
+            hit = self.segments_intersect_polygons(A_i, B_i, O_i)
+
+            # otherwise the distance is attained at an end point of the segment or of a polygon edge
+            (A_b, B_b) = (A_i[:, None, :], B_i[:, None, :])
+            (P_b, Q_b) = (self._P[O_i], self._Q[O_i])
+            d_sq = np.minimum(np.minimum(self.point_segment_distance_sq(A_b, P_b, Q_b),
+                                         self.point_segment_distance_sq(B_b, P_b, Q_b)),
+                              np.minimum(self.point_segment_distance_sq(P_b, A_b, B_b),
+                                         self.point_segment_distance_sq(Q_b, A_b, B_b)))
+            d_sq = np.where(self._edgeMask[O_i], d_sq, np.inf)
+
+            hit = hit | np.any(d_sq <= ε*ε, axis=1)
+            collision[S_i[hit]] = True
+        return collision
+
+    def segments_intersect_polygons(self, A, B, i_O):    # Cyrus-Beck clipping of segment k against polygon i_O[k]
+        d = B - A
+
+        g_0 = np.einsum('kfd,kd->kf', self._N[i_O], A) + self._b[i_O]
+        g_d = np.einsum('kfd,kd->kf', self._N[i_O], d)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_f = -g_0/g_d
+
+        t_enter = np.max(np.where(g_d < 0, t_f, -np.inf), axis=1)
+        t_exit  = np.min(np.where(g_d > 0, t_f, np.inf), axis=1)
+        outside = np.any((g_d == 0) & (g_0 > 0), axis=1)
+
+        return (np.maximum(t_enter, 0.0) <= np.minimum(t_exit, 1.0)) & ~outside
+
+    def point_segment_distance_sq(self, X, P, Q):
+        d = Q - P
+        L = np.sum(d*d, axis=-1)
+        t = np.sum((X - P)*d, axis=-1)/np.where(L > 0, L, 1.0)
+        t = np.clip(t, 0.0, 1.0)
+
+        Δ = X - (P + t[..., None]*d)
+        return np.sum(Δ*Δ, axis=-1)
+    # _____________________________________________Continuous Collision_________________________________________________
@@ -0,0 +1,47 @@
+"""
+October 17, 2026
+Parallel Tree Extension
+"""
+import Robot
+
+import numpy as np
+
+
+# ________________________________________________Workers_______________________________________________________________
+_environment = None                             # steering copy of the Environment, one per worker process
+_generation  = None                             # speculative retries: a task whose generation is old is cancelled
+
+
+def init_worker(environment, generation=None):
+    global _environment, _generation
+    _environment = environment
+    _generation  = generation
+
+
+def steer(task):                                # O/P: (good, xTilda, t_head_control, collision record, trajectory record)
+    (x_near, q_rand, seed) = task
+    env = _environment
+
+    env.set_seed(seed)                          # a child SeedSequence of the main environment
+    env.clear_records()
+    good = env.new_state(q_rand, x_near)
+
+    return good, env.get_xTilda(), env.time_control(), env.collision_record(), env.trajectory_record()
+
+
+def integrate_window(task):                     # O/P: (xTilda, message, cancelled) of one heading window
+    (generation, goal_events, x_0, q_ref, t_head_min, t_head_max) = task
+    env     = _environment
+    rollout = Robot.Rollout(x_0, q_ref, t_head_min, t_head_max)
+    env.set_goal_events(goal_events)            # off while the main process grows its goal tree
+
+    terminate = env.termination_event if env.get_early_termination()[0] else None
+
+    def event(xTilda):                          # checked every event chunk, stops the rollout once cancelled
+        if _generation.value != generation:
+            return np.ones(len(xTilda), dtype=bool)
+        return np.zeros(len(xTilda), dtype=bool) if terminate is None else terminate(xTilda)
+
+    (xTilda, info) = env.get_robot().integrate(rollout, event=event)
+    return xTilda, info['message'], _generation.value != generation
+# ________________________________________________Workers_______________________________________________________________
@@ -0,0 +1,134 @@
+"""
+October 17, 2026
+Planning Report Class
+"""
+import numpy as np
+import json
+import csv
+import io
+
+
+PHASES = ('sampling', 'nearest_neighbor', 'draw_robot_trajectory', 'collision_trajectory', 'insert')
+
+
+class PlanningReport:                           # wall time and call count per phase, integration counters
+    __slots__ = '_calls', '_seconds', '_counters', '_hu_min', '_hu_max', '_hu_sum', '_hu_count', '_latencies'
+
+    def __init__(self):
+        self._calls   = {name: 0 for name in PHASES}
+        self._seconds = {name: 0.0 for name in PHASES}
+        self._counters = {'iterations':           0,
+                          'extensions':           0,        # draw_robot_trajectory calls
+                          'failed_extensions':    0,        # every heading time control failed
+                          'integrations':         0,        # solver calls, retries included
+                          'failed_integrations':  0,
+                          'retries':              0,        # integrations beyond the first of an extension
+                          'nfe':                  0,        # right hand side evaluations
+                          'nst':                  0}        # solver steps
+        self._hu_min   = np.inf                 # step sizes of the last successful steps, LSODA only
+        self._hu_max   = 0.0
+        self._hu_sum   = 0.0
+        self._hu_count = 0
+        self._latencies = []                    # wall time of every extend_tree call, for the percentiles
+
+    def add_phase(self, name, seconds):
+        self._calls[name]   = self._calls.get(name, 0) + 1
+        self._seconds[name] = self._seconds.get(name, 0.0) + seconds
+
+    def add_iteration(self):
+        self._counters['iterations'] += 1
+
+    def add_integration(self, info):            # info: the dict returned by an Integrator
+        self._counters['integrations'] += 1
+        if info['message'] != 'Integration successful.':
+            self._counters['failed_integrations'] += 1
+        self._counters['nfe'] += int(info.get('n_rhs', 0))
+        self._counters['nst'] += int(info.get('n_steps', 0))
+
+        hu = np.asarray(info.get('hu', []), dtype=float)
+        hu = hu[hu > 0]
+        if len(hu) > 0:
+            self._hu_min   = min(self._hu_min, float(np.min(hu)))
+            self._hu_max   = max(self._hu_max, float(np.max(hu)))
+            self._hu_sum   = self._hu_sum + float(np.sum(hu))
+            self._hu_count = self._hu_count + len(hu)
+
+    def add_extension(self, attempts, success):
+        self._counters['extensions'] += 1
+        self._counters['retries']    += attempts - 1
+        if not success:
+            self._counters['failed_extensions'] += 1
+
+    def add_latency(self, seconds):
+        self._latencies.append(seconds)
+
+    def latencies(self):                        # O/P: extend_tree wall times in seconds, in call order
+        return np.array(self._latencies)
+
+    def calls(self, name):
+        return self._calls[name]
+
+    def seconds(self, name):
+        return self._seconds[name]
+
+    def counter(self, name):
+        return self._counters[name]
+
+    def total_seconds(self):
+        return sum(self._seconds.values())
+
+    def as_dict(self):
+        phases = {}
+        for name in self._calls:
+            calls = self._calls[name]
+            phases[name] = {'calls':   calls,
+                            'seconds': self._seconds[name],
+                            'mean_ms': 1000*self._seconds[name]/calls if calls > 0 else 0.0}
+
+        solver = {'hu_min':  self._hu_min if self._hu_count > 0 else None,
+                  'hu_max':  self._hu_max if self._hu_count > 0 else None,
+                  'hu_mean': self._hu_sum/self._hu_count if self._hu_count > 0 else None}
+        latency = {'extensions': len(self._latencies)}
+        for (name, q) in (('p50_ms', 50), ('p95_ms', 95), ('max_ms', 100)):
+            latency[name] = 1000*float(np.percentile(self._latencies, q)) if len(self._latencies) > 0 else None
+        return {'phases': phases, 'counters': dict(self._counters), 'solver': solver, 'latency': latency}
+
+    def rows(self):                             # O/P: flat (metric, value) rows, e.g. 'phases.insert.calls'
+        rows = []
+        for (section, values) in self.as_dict().items():
+            for (name, value) in values.items():
+                if isinstance(value, dict):
+                    rows.extend([(section + '.' + name + '.' + field, v) for (field, v) in value.items()])
+                else:
+                    rows.append((section + '.' + name, value))
+        return rows
+
+    def to_json(self, path=None):               # O/P: the JSON text, also written to path if given
+        text = json.dumps(self.as_dict(), indent=2)
+        if path is not None:
+            with open(path, 'w') as file:
+                file.write(text)
+        return text
+
+    def to_csv(self, path=None):                # O/P: the CSV text with a metric,value header
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['metric', 'value'])
+        writer.writerows(self.rows())
+        text = buffer.getvalue()
+        if path is not None:
+            with open(path, 'w', newline='') as file:
+                file.write(text)
+        return text
+
+    def print_report(self):
+        print(f'\n{"phase":>22} {"calls":>7} {"time [s]":>9} {"mean [ms]":>10} {"share":>6}')
+        total = self.total_seconds()
+        for (name, phase) in self.as_dict()['phases'].items():
+            share = phase['seconds']/total if total > 0 else 0.0
+            print(f'{name:>22} {phase["calls"]:>7} {phase["seconds"]:>9.3f} {phase["mean_ms"]:>10.2f} {share:>6.1%}')
+        for (name, value) in self._counters.items():
+            print(f'{name:>22} {value:>7}')
+        if len(self._latencies) > 0:
+            latency = self.as_dict()['latency']
+            print(f'{"extend_tree p50/p95":>22} {latency["p50_ms"]:>7.2f} {latency["p95_ms"]:>9.2f} ms')
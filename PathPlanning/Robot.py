@@ -6,18 +6,22 @@ import numpy as np
 from scipy import integrate
 import matplotlib.pyplot as plt
 from scipy.misc import derivative
+import numba
+import Integrator
+from concurrent.futures import ThreadPoolExecutor
 
 
 class Robot:
     __slots__ = '_x_0', '_q_ref', '_q_refDot', '_q_refDotDot',\
-                '_K_matrix', '_Q_matrix', '_P_matrix',\
+                '_K_matrix', '_Q_matrix', '_P_matrix', '_k_3_head', '_k_3_pos',\
                 '_k_0', '_f',\
                 '_N', '_t_1', '_t_2', '_t',\
                 '_q_ε',\
                 '_γ_1', '_γ_2',\
                 '_heading_control_EN', '_errorTol_pos_pph', '_errorTol_head_pph', \
                 '_base_radius', '_wheel_radius', '_wheel_center_distance', \
-                '_t_θ_min', '_t_θ_max'
+                '_t_θ_min', '_t_θ_max', \
+                '_dynamics', '_integrator', '_batchIntegrator', '_params'
 
     def __init__(self, x_initial, q_ref, t_1, t_2, step_number):
         self._x_0         = x_initial
@@ -34,6 +38,8 @@ class Robot:
         F = np.diag(self._f)
         η = np.diag([0.5, 0.5])
         self._P_matrix = η + F
+        self._k_3_head = 2              # K[2, 2] while the heading controller is on
+        self._k_3_pos  = 0.002          # K[2, 2] while the pseudo position controller is on
         self._k_0 = 1.1
         self._t_1 = t_1
         self._t_2 = t_2
@@ -58,6 +64,11 @@ class Robot:
         self._t_θ_min = 0.0
         self._t_θ_max = 0.25
 
+        self._dynamics   = 'python'        # 'numba': f_kernel, same closed loop, differs in the last bits
+        self._integrator = Integrator.LSODA(hmax=0.001, rtol=1.0e-8, atol=1.0e-8)
+        self._batchIntegrator = Integrator.RK4(dt=0.001)
+        self._params          = None    # ControllerParams, built on first use
+
     def get_t_head_min(self):
         return self._t_θ_min
 
@@ -70,6 +81,39 @@ class Robot:
     def set_t_head_max(self, time):
         self._t_θ_max = time
 
+    def set_dynamics(self, backend='python'):
+        if backend not in ('python', 'numba'):
+            print('\nERROR: no such dynamics backend.\n')
+            return
+        self._dynamics = backend
+
+    def get_dynamics(self):
+        return self._dynamics
+
+    def set_integrator(self, integrator):
+        self._integrator = integrator
+
+    def get_integrator(self):
+        return self._integrator
+
+    def set_batch_integrator(self, integrator):
+        self._batchIntegrator = integrator
+
+    def get_batch_integrator(self):
+        return self._batchIntegrator
+
+    def controller_params(self):                # O/P: the gains of the closed loop, shared by every rollout
+        if self._params is None:
+            self._params = ControllerParams(self._K_matrix, self._Q_matrix, self._P_matrix, self._f,
+                                            self._k_3_head, self._k_3_pos, self._k_0, self._q_ε, self._q_refDot)
+        return self._params
+
+    def current_rollout(self):                  # O/P: the rollout set up by set_x_0, set_q_ref and set_t_head_*
+        return Rollout(self._x_0, self._q_ref, self._t_θ_min, self._t_θ_max)
+
+    def kernel_parameters(self):
+        return self.controller_params().kernel_parameters(self.current_rollout())
+
     def get_base_radius(self):
         return self._base_radius
 
@@ -124,17 +168,31 @@ class Robot:
     def get_number_time_steps(self):
         return self._N
 
-    def get_trajectory(self, degrees=False, plot=False):
-        (sol, sol_info) = integrate.odeint(self.f_function, self._x_0, self._t,
-                                           hmax=0.001, rtol=1.0e-8, atol=1.0e-8,
-                                           full_output=True)
+    def integrate(self, rollout, event=None):  # reads nothing that changes between rollouts, safe from many threads
+        x_0 = np.array(rollout.x_0(), dtype=float)
+        if self._dynamics == 'numba':
+            p = self.controller_params().kernel_parameters(rollout)
+            return self._integrator.integrate(f_kernel, x_0, self._t, (p,), event=event, f_out=f_kernel_out)
+        return self._integrator.integrate(self.f_function, x_0, self._t, (rollout,), event=event)
+
+    def integrate_many(self, rollouts, workers=None, event=None):   # O/P: [(sol, info)] in the order of rollouts
+        if not self._integrator.reentrant():    # the default LSODA: one rollout at a time, RK4 or SolveIVP use the pool
+            return [self.integrate(rollout, event) for rollout in rollouts]
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda rollout: self.integrate(rollout, event), rollouts))
+
+    def get_trajectory(self, degrees=False, plot=False, event=None, rollout=None):  # event(sol) ends the rollout early
+        rollout = self.current_rollout() if rollout is None else rollout
+        (sol, sol_info) = self.integrate(rollout, event=event)
 
         if plot:
+            t = self._t[0:len(sol)]
             fig, axes = plt.subplots(nrows=2, ncols=3, sharex=False)
 
-            ρ_ref = np.ones_like(self._t)*self._q_ref[0]
-            φ_ref = np.ones_like(self._t)*np.degrees(self._q_ref[1])
-            θ_ref = np.ones_like(self._t)*np.degrees(self._q_ref[2])
+            ρ_ref = np.ones_like(t)*rollout.q_ref()[0]
+            φ_ref = np.ones_like(t)*np.degrees(rollout.q_ref()[1])
+            θ_ref = np.ones_like(t)*np.degrees(rollout.q_ref()[2])
 
             font = {'family': 'serif',
                     'color': 'darkred',
@@ -142,39 +200,39 @@ class Robot:
                     'size': 10,
                     }
 
-            axes[0, 0].plot(self._t, sol[:, 0], 'b')
-            axes[0, 0].plot(self._t, ρ_ref, 'g--')
+            axes[0, 0].plot(t, sol[:, 0], 'b')
+            axes[0, 0].plot(t, ρ_ref, 'g--')
             axes[0, 0].set_title('ρ$_c$(t): Radial Distance', font)
             axes[0, 0].set_xlabel('t [s]')
             axes[0, 0].set_ylabel('[m]')
             axes[0, 0].grid(True)
-            axes[0, 1].plot(self._t, np.degrees(sol[:, 1]), 'b')
-            axes[0, 1].plot(self._t, φ_ref, 'g--')
+            axes[0, 1].plot(t, np.degrees(sol[:, 1]), 'b')
+            axes[0, 1].plot(t, φ_ref, 'g--')
             axes[0, 1].set_title('φ$_c$(t): Angular Coordinate', font)
             axes[0, 1].set_xlabel('t [s]')
             axes[0, 1].set_ylabel('[°]')
             axes[0, 1].grid(True)
-            axes[0, 2].plot(self._t, np.degrees(sol[:, 2]), 'b')
-            axes[0, 2].plot(self._t, θ_ref, 'g--')
+            axes[0, 2].plot(t, np.degrees(sol[:, 2]), 'b')
+            axes[0, 2].plot(t, θ_ref, 'g--')
             axes[0, 2].set_title('θ$_c$(t): Orientation', font)
             axes[0, 2].set_xlabel('t [s]')
             axes[0, 2].set_ylabel('[°]')
             axes[0, 2].grid(True)
 
-            axes[1, 0].plot(self._t, sol[:, 0] - ρ_ref, 'r')
-            axes[1, 0].plot(self._t, np.zeros_like(self._t), 'g--')
+            axes[1, 0].plot(t, sol[:, 0] - ρ_ref, 'r')
+            axes[1, 0].plot(t, np.zeros_like(t), 'g--')
             axes[1, 0].set_title('ρ$_e$(t): Error', font)
             axes[1, 0].set_xlabel('t [s]')
             axes[1, 0].set_ylabel('[m]')
             axes[1, 0].grid(True)
-            axes[1, 1].plot(self._t, np.degrees(sol[:, 1]) - φ_ref, 'r')
-            axes[1, 1].plot(self._t, np.zeros_like(self._t), 'g--')
+            axes[1, 1].plot(t, np.degrees(sol[:, 1]) - φ_ref, 'r')
+            axes[1, 1].plot(t, np.zeros_like(t), 'g--')
             axes[1, 1].set_title('φ$_e$(t): Error', font)
             axes[1, 1].set_xlabel('t [s]')
             axes[1, 1].set_ylabel('[°]')
             axes[1, 1].grid(True)
-            axes[1, 2].plot(self._t, np.degrees(sol[:, 2]) - θ_ref, 'r')
-            axes[1, 2].plot(self._t, np.zeros_like(self._t), 'g--')
+            axes[1, 2].plot(t, np.degrees(sol[:, 2]) - θ_ref, 'r')
+            axes[1, 2].plot(t, np.zeros_like(t), 'g--')
             axes[1, 2].set_title('θ$_e$(t): Error', font)
             axes[1, 2].set_xlabel('t [s]')
             axes[1, 2].grid(True)
@@ -191,8 +249,8 @@ class Robot:
             axes_xy.set_xlabel('[m]')
             axes_xy.set_ylabel('[m]')
 
-            x_ref = self._q_ref[0]*np.cos(self._q_ref[1])
-            y_ref = self._q_ref[0] * np.sin(self._q_ref[1])
+            x_ref = rollout.q_ref()[0]*np.cos(rollout.q_ref()[1])
+            y_ref = rollout.q_ref()[0] * np.sin(rollout.q_ref()[1])
             axes_xy.scatter(x_ref, y_ref,
                                s=900.0, color=(0.5, 0.25, 0.15, 0.1), marker='*')
             axes_xy.scatter(x_c[0], y_c[0],
@@ -205,34 +263,52 @@ class Robot:
             sol[:, 4]   = np.degrees(sol[:, 4])
         return sol, sol_info
 
-    def controller_alternator(self, q_e, t):
+    def get_trajectories(self, x_0_batch, q_ref_batch, t_head_min_batch, t_head_max_batch):
+        X_0 = np.array(x_0_batch, dtype=float)
+        B   = len(X_0)
+
+        P = self.controller_params().kernel_parameters_batch(q_ref_batch, t_head_min_batch, t_head_max_batch)
+
+        integrator = self._batchIntegrator
+        if isinstance(integrator, Integrator.RK4):      # integrates the (B, 5) states as they are
+            (sol, info) = integrator.integrate(f_kernel_batch, X_0, self._t, (P,), f_out=f_kernel_batch_out)
+            success     = info['success']
+        else:                                           # one flat system of 5 B states
+            (sol, info) = integrator.integrate(f_kernel_flat, X_0.ravel(), self._t, (P,))
+            sol         = sol.reshape(len(self._t), B, -1)
+            success     = np.all(np.isfinite(sol), axis=(0, 2)) & (info['message'] == Integrator.SUCCESS)
+
+        xTilda = np.ascontiguousarray(np.transpose(sol, (1, 0, 2)))   # (B, N, 5)
+        return xTilda, success, info
+
+    def controller_alternator(self, q_e, t, rollout):   # O/P: True while the heading controller is on
         ρ_e = q_e[0]
         θ_e = q_e[2]
 
-        ρ_e_0 = self._x_0[0] - self._q_ref[0]
-        θ_e_0 = self._x_0[2] - self._q_ref[2]
+        ρ_e_0 = rollout.x_0()[0] - rollout.q_ref()[0]
+        θ_e_0 = rollout.x_0()[2] - rollout.q_ref()[2]
 
-        ρ_0 = self._x_0[0]
-        θ_0 = self._x_0[2]
+        ρ_0 = rollout.x_0()[0]
+        θ_0 = rollout.x_0()[2]
 
         tol_ρ = ρ_0*(self._errorTol_pos_pph/100)
         tol_θ = θ_0*(self._errorTol_head_pph/100)
 
-        t_θ_min = self._t_θ_min
-        t_θ_max = self._t_θ_max
+        t_θ_min = rollout.t_head_min()
+        t_θ_max = rollout.t_head_max()
 
         EN = (t > t_θ_min) & (t < t_θ_max)
-        self.set_heading_controller(enable=EN)
+        return EN
 
     # _______________________________________xDot = f(x,t,u______)______________________________________________________
-    def f_function(self, x, t):
+    def f_function(self, x, t, rollout):
         q_c = x[0:3]
         z_c = x[3:5]
 
         if q_c[0] == 0:
             q_c[0] = self._q_ε
 
-        q_ref    = self._q_ref          # reference
+        q_ref    = rollout.q_ref()      # reference
         q_refDot = self._q_refDot       # reference derivative
         q_e      = q_c - q_ref          # error in q_c
 
@@ -246,8 +322,7 @@ class Robot:
 
         q_eDot = q_cDot - q_refDot      # error in q_cDot
 
-        self.controller_alternator(q_e, t)
-        if self._heading_control_EN:
+        if self.controller_alternator(q_e, t, rollout):
             u_head = self.heading_controller_chwa(q_c, q_cDot, q_e, q_eDot)
             z_cDot = u_head - f         # x[0:3]Dot = f(x)
         else:
@@ -334,12 +409,11 @@ class Robot:
         return u
 
     def heading_controller_chwa(self, q_c, q_cDot, q_e, q_eDot):
-        self._K_matrix[2, 2] = 2
-        s_inner = self.sliding_surface_inner_chwa(q_e, q_eDot)
+        K       = self.gain_matrix(self._k_3_head)
+        s_inner = self.sliding_surface_inner_chwa(q_e, q_eDot, K)
         s_θ = s_inner[2]
 
         # _____________________________Control Parameters_______________________________________________________________
-        K   = self._K_matrix
         Q   = self._Q_matrix
         P   = self._P_matrix
         # _____________________________Control Parameters_______________________________________________________________
@@ -353,7 +427,7 @@ class Robot:
         return u
 
     def pseudo_position_controller_chwa(self, q_c, q_cDot, q_e, q_eDot):
-        self._K_matrix[2, 2] = 0.002
+        K = self.gain_matrix(self._k_3_pos)
 
         ρ_c = q_c[0]
         φ_c = q_c[1]
@@ -371,7 +445,6 @@ class Robot:
         Θ_eDot = q_eDot[2]
 
         # _____________________________Control Parameters_______________________________________________________________
-        K = self._K_matrix
         Q = self._Q_matrix
         P = self._P_matrix
         k_0 = self._k_0
@@ -386,10 +459,10 @@ class Robot:
         M_c_2x2Dot = self.MDot_matrix(np.array([1, φ_c, θ_c]), np.array([0, φ_cDot, θ_cDot]))
         M_c_2x2Dot = M_c_2x2Dot[:, 0:2]
 
-        s_inner = self.sliding_surface_inner_chwa(q_e, q_eDot)
+        s_inner = self.sliding_surface_inner_chwa(q_e, q_eDot, K)
         s_θ     = s_inner[2]
         k_3     = K[2, 2]
-        s       = self.sliding_surface_chwa(q_c, q_e, q_eDot)         # sliding surface
+        s       = self.sliding_surface_chwa(q_c, q_e, q_eDot, K)      # sliding surface
         # _______________________________________________________________________Miscellaneous__________________________
 
         u_11 = np.matmul(K, q_e)
@@ -469,11 +542,16 @@ class Robot:
         satDot = np.array(satDot)
         return satDot
 
-    def sliding_surface_inner_chwa(self, q_e, q_eDot):
-        return q_eDot + np.matmul(self._K_matrix, q_e)
+    def gain_matrix(self, k_3):                 # O/P: a copy of K with K[2, 2] = k_3, K itself is never written
+        K = self._K_matrix.copy()
+        K[2, 2] = k_3
+        return K
 
-    def sliding_surface_chwa(self, q_c, q_e, q_eDot):
-        s_tilda_1 = self.sliding_surface_inner_chwa(q_e, q_eDot)
+    def sliding_surface_inner_chwa(self, q_e, q_eDot, K):
+        return q_eDot + np.matmul(K, q_e)
+
+    def sliding_surface_chwa(self, q_c, q_e, q_eDot, K):
+        s_tilda_1 = self.sliding_surface_inner_chwa(q_e, q_eDot, K)
         s_theta   = s_tilda_1[2]
 
         ρ_c   = q_c[0]
@@ -545,3 +623,214 @@ class Robot:
         r = np.array([x, y])
         return r
 
+
+# ------------------------------------------------Rollout---------------------------------------------------------------
+class Rollout:                                  # what changes from one extension to the next, never written after __init__
+    __slots__ = '_x_0', '_q_ref', '_t_head_min', '_t_head_max'
+
+    def __init__(self, x_0, q_ref, t_head_min, t_head_max):
+        self._x_0        = read_only(x_0)
+        self._q_ref      = read_only(q_ref)
+        self._t_head_min = float(t_head_min)
+        self._t_head_max = float(t_head_max)
+
+    def x_0(self):
+        return self._x_0
+
+    def q_ref(self):
+        return self._q_ref
+
+    def t_head_min(self):
+        return self._t_head_min
+
+    def t_head_max(self):
+        return self._t_head_max
+# ------------------------------------------------Rollout---------------------------------------------------------------
+
+
+# -------------------------------------------ControllerParams-----------------------------------------------------------
+class ControllerParams:                         # gains of the closed loop, never written after __init__
+    __slots__ = '_K_matrix', '_Q_matrix', '_P_matrix', '_f', '_k_3_head', '_k_3_pos', '_k_0', '_q_ε', '_q_refDot', '_p'
+
+    def __init__(self, K_matrix, Q_matrix, P_matrix, f, k_3_head, k_3_pos, k_0, q_ε, q_refDot):
+        self._K_matrix = read_only(K_matrix)
+        self._Q_matrix = read_only(Q_matrix)
+        self._P_matrix = read_only(P_matrix)
+        self._f        = read_only(f)
+        self._k_3_head = k_3_head
+        self._k_3_pos  = k_3_pos
+        self._k_0      = k_0
+        self._q_ε      = q_ε
+        self._q_refDot = read_only(q_refDot)
+
+        p = np.zeros(N_PARAMETERS)              # everything but the rollout entries
+        p[Q_REF_DOT:Q_REF_DOT + 3]     = self._q_refDot
+        p[DISTURBANCE:DISTURBANCE + 2] = self._f
+        p[GAIN_K:GAIN_K + 9]           = np.ravel(self._K_matrix)
+        p[GAIN_Q:GAIN_Q + 4]           = np.ravel(self._Q_matrix)
+        p[GAIN_P:GAIN_P + 4]           = np.ravel(self._P_matrix)
+        p[K_3_HEAD]                    = k_3_head
+        p[K_3_POS]                     = k_3_pos
+        p[K_0]                         = k_0
+        p[Q_EPSILON]                   = q_ε
+        self._p = read_only(p)
+
+    def K_matrix(self):
+        return self._K_matrix
+
+    def Q_matrix(self):
+        return self._Q_matrix
+
+    def P_matrix(self):
+        return self._P_matrix
+
+    def kernel_parameters(self, rollout):       # O/P: parameter vector of f_kernel for one rollout, a fresh array
+        p = self._p.copy()
+        p[Q_REF:Q_REF + 3] = rollout.q_ref()
+        p[T_HEAD_MIN]      = rollout.t_head_min()
+        p[T_HEAD_MAX]      = rollout.t_head_max()
+        return p
+
+    def kernel_parameters_batch(self, q_ref_batch, t_head_min_batch, t_head_max_batch):    # O/P: one row per rollout
+        P = np.tile(self._p, (len(q_ref_batch), 1))
+        P[:, Q_REF:Q_REF + 3] = q_ref_batch
+        P[:, T_HEAD_MIN]      = t_head_min_batch
+        P[:, T_HEAD_MAX]      = t_head_max_batch
+        return P
+
+
+def read_only(array):
+    array = np.array(array, dtype=float)
+    array.flags.writeable = False
+    return array
+# -------------------------------------------ControllerParams-----------------------------------------------------------
+
+
+# ___________________________________________Compiled xDot = f(x,t,u)___________________________________________________
+# layout of the parameter vector of f_kernel, see Robot.kernel_parameters
+Q_REF, Q_REF_DOT, DISTURBANCE, GAIN_K, GAIN_Q, GAIN_P = 0, 3, 6, 8, 17, 21
+K_3_HEAD, K_3_POS, K_0, Q_EPSILON, T_HEAD_MIN, T_HEAD_MAX = 25, 26, 27, 28, 29, 30
+N_PARAMETERS = 31
+
+
+@numba.njit(cache=True, nogil=True, error_model='numpy')
+def f_kernel(x, t, p):                  # same closed loop as Robot.f_function, 1/0 = inf as in NumPy
+    xDot = np.empty(5)                  # for callers that need a fresh array back, e.g. odeint
+    f_kernel_out(x, t, p, xDot)
+    return xDot
+
+
+@numba.njit(cache=True, nogil=True, error_model='numpy')
+def f_kernel_out(x, t, p, xDot):        # writes f(x, t) into xDot, allocates nothing
+    ρ = x[0]
+    φ = x[1]
+    θ = x[2]
+    v = x[3]
+    ω = x[4]
+
+    if ρ == 0:
+        ρ = p[Q_EPSILON]
+
+    ρ_e = ρ - p[Q_REF]
+    φ_e = φ - p[Q_REF + 1]
+    θ_e = θ - p[Q_REF + 2]
+
+    c = np.cos(φ - θ)
+    s = np.sin(φ - θ)
+
+    ρ_cDot = c*v
+    φ_cDot = -(1/ρ)*s*v
+    θ_cDot = ω
+
+    ρ_eDot = ρ_cDot - p[Q_REF_DOT]
+    φ_eDot = φ_cDot - p[Q_REF_DOT + 1]
+    θ_eDot = θ_cDot - p[Q_REF_DOT + 2]
+
+    heading_EN = (t > p[T_HEAD_MIN]) & (t < p[T_HEAD_MAX])
+    k_3 = p[K_3_HEAD] if heading_EN else p[K_3_POS]
+
+    # K q_e and K q_eDot with K[2, 2] = k_3
+    Kq_e_0 = p[GAIN_K]*ρ_e + p[GAIN_K + 1]*φ_e + p[GAIN_K + 2]*θ_e
+    Kq_e_1 = p[GAIN_K + 3]*ρ_e + p[GAIN_K + 4]*φ_e + p[GAIN_K + 5]*θ_e
+    Kq_e_2 = p[GAIN_K + 6]*ρ_e + p[GAIN_K + 7]*φ_e + k_3*θ_e
+
+    Kq_eDot_0 = p[GAIN_K]*ρ_eDot + p[GAIN_K + 1]*φ_eDot + p[GAIN_K + 2]*θ_eDot
+    Kq_eDot_1 = p[GAIN_K + 3]*ρ_eDot + p[GAIN_K + 4]*φ_eDot + p[GAIN_K + 5]*θ_eDot
+    Kq_eDot_2 = p[GAIN_K + 6]*ρ_eDot + p[GAIN_K + 7]*φ_eDot + k_3*θ_eDot
+
+    s_θ   = θ_eDot + Kq_e_2
+    tan_s = np.tanh(s_θ)
+
+    xDot[0] = ρ_cDot
+    xDot[1] = φ_cDot
+    xDot[2] = θ_cDot
+
+    if heading_EN:
+        u_2 = -k_3*θ_eDot - p[GAIN_Q + 3]*s_θ - p[GAIN_P + 3]*tan_s
+        xDot[3] = 0 - p[DISTURBANCE]
+        xDot[4] = u_2 - p[DISTURBANCE + 1]
+        return
+
+    k_0   = p[K_0]
+    abs_s = np.abs(s_θ)
+    tan_ρ = np.tanh(ρ_e)
+    tan_φ = np.tanh(φ_e)
+    d     = φ_cDot - θ_cDot
+
+    # sliding surface s = M_c (s_inner + s_tilda_2)
+    s_1 = ρ_eDot + Kq_e_0 + k_0*abs_s*tan_ρ
+    s_2 = φ_eDot + Kq_e_1 + k_0*abs_s*tan_φ/ρ
+    s_3 = s_θ
+    σ_1 = c*s_1 - ρ*s*s_2
+    σ_2 = s*s_1 + ρ*c*s_2 + s_3
+
+    u_1_1 = -((-d*s)*Kq_e_0 + (-ρ_cDot*s - ρ*d*c)*Kq_e_1)
+    u_1_2 = -((d*c)*Kq_e_0 + (ρ_cDot*c - ρ*d*s)*Kq_e_1)
+
+    u_2_1 = -(c*Kq_eDot_0 - ρ*s*Kq_eDot_1)
+    u_2_2 = -(s*Kq_eDot_0 + ρ*c*Kq_eDot_1 + Kq_eDot_2)
+
+    u_31_1 = (-d*s*tan_ρ - d*c*tan_φ)*abs_s
+    u_31_2 = (d*c*tan_ρ - d*s*tan_φ)*abs_s
+    w_1    = (1 - tan_ρ*tan_ρ)*ρ_eDot*abs_s + tan_ρ*tan_s*(k_3*θ_eDot)
+    w_2    = (1 - tan_φ*tan_φ)*φ_eDot*abs_s + tan_φ*tan_s*(k_3*θ_eDot)
+    u_3_1  = -k_0*(u_31_1 + c*w_1 - s*w_2)
+    u_3_2  = -k_0*(u_31_2 + s*w_1 + c*w_2)
+
+    u_4_1 = -(p[GAIN_Q]*σ_1 + p[GAIN_Q + 1]*σ_2)
+    u_4_2 = -(p[GAIN_Q + 2]*σ_1 + p[GAIN_Q + 3]*σ_2)
+
+    tan_σ_1 = np.tanh(σ_1)
+    tan_σ_2 = np.tanh(σ_2)
+    u_5_1 = -(p[GAIN_P]*tan_σ_1 + p[GAIN_P + 1]*tan_σ_2)
+    u_5_2 = -(p[GAIN_P + 2]*tan_σ_1 + p[GAIN_P + 3]*tan_σ_2)
+
+    RHS_1 = u_1_1 + u_2_1 + u_3_1 + u_4_1 + u_5_1 - p[DISTURBANCE]
+    RHS_2 = u_1_2 + u_2_2 + u_3_2 + u_4_2 + u_5_2 - p[DISTURBANCE + 1]
+
+    ω_1 = s*tan_ρ + c*tan_φ
+    ω_2 = k_0*ω_1*tan_s
+    xDot[4] = RHS_2/(1 + ω_2)
+
+    v_1 = c*tan_ρ - s*tan_φ
+    v_2 = k_0*v_1*tan_s
+    xDot[3] = RHS_1 - v_2*xDot[4]
+
+
+@numba.njit(cache=True, nogil=True, error_model='numpy')
+def f_kernel_batch(X, t, P):            # one closed loop per row of X, with parameters P[i]
+    XDot = np.empty_like(X)
+    f_kernel_batch_out(X, t, P, XDot)
+    return XDot
+
+
+@numba.njit(cache=True, nogil=True, error_model='numpy')
+def f_kernel_batch_out(X, t, P, XDot):
+    for i in range(X.shape[0]):
+        f_kernel_out(X[i], t, P[i], XDot[i])
+
+
+@numba.njit(cache=True, nogil=True, error_model='numpy')
+def f_kernel_flat(x, t, P):
+    return f_kernel_batch(x.reshape(P.shape[0], -1), t, P).ravel()
+# ___________________________________________Compiled xDot = f(x,t,u)___________________________________________________
@@ -0,0 +1,180 @@
+"""
+October 17, 2026
+Scenario Generator Class
+"""
+import Environment
+import Obstacle
+import ObstacleSet
+import Utility as util
+
+import numpy as np
+from scipy.spatial import ConvexHull
+
+
+class ScenarioGenerator:                        # seeded random workspaces of convex obstacles, with narrow passages
+    __slots__ = '_xMin', '_xMax', '_yMin', '_yMax', '_sizeMin', '_sizeMax', '_verticesMin', '_verticesMax', \
+                '_clearance', '_wallThickness', '_seedSequence', '_rng'
+
+    def __init__(self, X=(0, 10), Y=(0, 10), size=(0.5, 1.5), vertices=(3, 8), clearance=1.0, seed=None):
+        self._xMin = X[0]
+        self._xMax = X[1]
+
+        self._yMin = Y[0]
+        self._yMax = Y[1]
+
+        self._sizeMin     = size[0]             # diameter of the circle the polygon corners are drawn in
+        self._sizeMax     = size[1]
+        self._verticesMin = vertices[0]         # corners drawn per polygon, the hull may keep fewer
+        self._verticesMax = vertices[1]
+
+        self._clearance     = clearance         # obstacle free half width of the box around start and goal
+        self._wallThickness = 0.8
+
+        self._seedSequence = None
+        self._rng          = None
+        self.set_seed(seed)
+
+    def set_seed(self, seed):                   # restarts the random stream, an int or a SeedSequence
+        self._seedSequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self._rng          = np.random.default_rng(self._seedSequence)
+
+    def get_seed(self):
+        return self._seedSequence.entropy
+
+    def rng(self):
+        return self._rng
+
+    def set_size(self, size_min, size_max):
+        self._sizeMin = size_min
+        self._sizeMax = size_max
+
+    def get_size(self):
+        return self._sizeMin, self._sizeMax
+
+    def set_clearance(self, clearance):
+        self._clearance = clearance
+
+    def get_clearance(self):
+        return self._clearance
+
+    def set_wall_thickness(self, thickness):
+        self._wallThickness = thickness
+
+    def get_wall_thickness(self):
+        return self._wallThickness
+
+    def area(self):
+        return (self._xMax - self._xMin)*(self._yMax - self._yMin)
+
+    # ________________________________________________Obstacles_________________________________________________________
+    def random_polygons(self, n):               # O/P: n corner arrays, convex hulls of points around random centers
+        centers  = self._rng.uniform([self._xMin, self._yMin], [self._xMax, self._yMax], (n, 2))
+        radii    = self._rng.uniform(self._sizeMin, self._sizeMax, n)/2
+        corners  = self._rng.integers(self._verticesMin, self._verticesMax + 1, n)
+
+        polygons = []
+        for i_1 in range(0, n):
+            α = np.sort(self._rng.uniform(0, 2*np.pi, corners[i_1]))
+            r = radii[i_1]*self._rng.uniform(0.5, 1.0, corners[i_1])
+            points = centers[i_1] + np.column_stack([r*np.cos(α), r*np.sin(α)])
+            hull   = ConvexHull(points)
+            polygons.append(points[hull.vertices])
+        return polygons
+
+    def random_obstacles(self, n=None, density=None, keep_out=(), max_tries=20):
+        """
+        n obstacles, or as many as cover the density fraction of the workspace, overlaps counted twice. A polygon
+        whose bounding box meets a keep-out box (x_min, y_min, x_max, y_max) is drawn again.
+        """
+        if (n is None) == (density is None):
+            print('\nERROR: give either the number of obstacles or the density.\n')
+            return []
+
+        keep_out = np.reshape(np.array(keep_out, dtype=float), (-1, 4))
+        target   = density*self.area() if n is None else None
+
+        obstacle_list = []
+        covered       = 0.0
+        for i_1 in range(0, max_tries):
+            if n is not None:
+                batch = n - len(obstacle_list)
+            else:
+                mean_area = np.pi*((self._sizeMin + self._sizeMax)/4)**2/2
+                batch     = max(int((target - covered)/mean_area), 1)
+
+            for points in self.random_polygons(batch):
+                box_min = np.min(points, axis=0)
+                box_max = np.max(points, axis=0)
+                if np.any((box_min[0] < keep_out[:, 2]) & (box_max[0] > keep_out[:, 0]) &
+                          (box_min[1] < keep_out[:, 3]) & (box_max[1] > keep_out[:, 1])):
+                    continue
+                obstacle_list.append(Obstacle.Obstacle(points, convex=True))
+                covered = covered + ConvexHull(points).volume      # area in 2D
+                if (n is None) and (covered >= target):
+                    return obstacle_list
+
+            if (n is not None) and (len(obstacle_list) == n):
+                return obstacle_list
+
+        print('\nERROR: the keep-out boxes leave too little room, generated', len(obstacle_list), 'obstacles.\n')
+        return obstacle_list
+
+    def narrow_passages(self, n, width):        # O/P: (walls, gap boxes) of n walls across X, one gap in each
+        walls = []
+        gaps  = []
+        half  = self._wallThickness/2
+        for x in np.linspace(self._xMin, self._xMax, n + 2)[1:-1]:
+            y_gap = self._rng.uniform(self._yMin + width, self._yMax - width)
+            (y_low, y_high) = (y_gap - width/2, y_gap + width/2)
+            walls.append(Obstacle.Obstacle([(x - half, self._yMin), (x + half, self._yMin),
+                                            (x + half, y_low), (x - half, y_low)], convex=True))
+            walls.append(Obstacle.Obstacle([(x - half, y_high), (x + half, y_high),
+                                            (x + half, self._yMax), (x - half, self._yMax)], convex=True))
+            gaps.append((x - half - width, y_low, x + half + width, y_high))  # keeps the mouth of the gap open
+        return walls, gaps
+
+    def free_point(self, x_range, obstacle_list, margin, max_tries=1000):   # O/P: margin away from obstacles and bounds
+        obstacle_set = ObstacleSet.ObstacleSet(obstacle_list, (self._xMin, self._xMax), (self._yMin, self._yMax),
+                                               margin=margin)
+        for i_1 in range(0, max_tries):
+            point = self._rng.uniform([x_range[0], self._yMin + margin], [x_range[1], self._yMax - margin])
+            if not obstacle_set.collision_batch(point, margin)[0]:
+                return point
+        print('\nERROR: no free point found in x', x_range, '\n')
+        return None
+    # ________________________________________________Obstacles_________________________________________________________
+
+    def generate(self, n=None, density=None, passages=0, passage_width=1.6, start=None, goal=None):
+        """
+        O/P: (obstacle_list, start, goal). Unless given, start and goal are drawn in a band a tenth of the workspace wide
+        along its left and right edges, so every passage wall lies between them. Random obstacles are drawn around them,
+        never on them.
+        """
+        (walls, gaps) = self.narrow_passages(passages, passage_width) if passages > 0 else ([], [])
+
+        c    = self._clearance
+        band = (self._xMax - self._xMin)/10
+        if start is None:
+            start = self.free_point((self._xMin + c, self._xMin + c + band), walls, c)
+        if goal is None:
+            goal  = self.free_point((self._xMax - c - band, self._xMax - c), walls, c)
+        if (start is None) or (goal is None):
+            return walls, start, goal
+
+        keep_out = gaps + [(start[0] - c, start[1] - c, start[0] + c, start[1] + c),
+                           (goal[0] - c, goal[1] - c, goal[0] + c, goal[1] + c)]
+        obstacle_list = walls
+        if (n is not None) or (density is not None):
+            obstacle_list = walls + self.random_obstacles(n, density, keep_out)
+        return obstacle_list, (float(start[0]), float(start[1])), (float(goal[0]), float(goal[1]))
+
+    def environment(self, n=None, density=None, passages=0, passage_width=1.6, start=None, goal=None,
+                    headless=True, seed=None):     # O/P: Environment with the robot at rest, heading for the goal
+        (obstacle_list, start, goal) = self.generate(n, density, passages, passage_width, start, goal)
+        if (start is None) or (goal is None):
+            return None
+
+        θ_0 = np.arctan2(goal[1] - start[1], goal[0] - start[0])
+        x_0 = np.concatenate((util.xy2polar(start[0], start[1]), [θ_0, 0, 0]))
+        return Environment.Environment([self._xMin, self._xMax], [self._yMin, self._yMax], obstacle_list, x_0, goal,
+                                       headless=headless, seed=seed)
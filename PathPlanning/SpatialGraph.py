@@ -174,7 +174,7 @@ class Graph:
         axis.scatter(points[:, 0], points[:, 1], s=50.0, color=(1, 0, 0, 0.5))
 
         points = []
-        for e in self._edges:
+        for e in self.edges():
             (v_1, v_2) = e.end_vertices()
             points.append([(v_1.x_value(), v_1.y_value()), (v_2.x_value(), v_2.y_value())])
 
@@ -186,3 +186,235 @@ class Graph:
 
         return fig, axis
 # ------------------------------------------------Graph-----------------------------------------------------------------
+
+
+# -----------------------------------------------EdgeView---------------------------------------------------------------
+class EdgeView:                                 # edge k of a CompactGraph, made on demand
+    __slots__ = '_graph', '_k'
+
+    def __init__(self, graph, k):
+        self._graph = graph
+        self._k     = k
+
+    def id(self):
+        return self._k
+
+    def end_vertices(self):
+        return self._graph.get_vertex(self._graph.origins()[self._k]), \
+               self._graph.get_vertex(self._graph.destinations()[self._k])
+
+    def adjacent(self, v):
+        (v_1, v_2) = self.end_vertices()
+        return v_2 if v is v_1 else v_1
+
+    def element(self):
+        return self._graph.edge_elements()[self._k]
+
+    def set_element(self, element):
+        self._graph.edge_elements()[self._k] = element
+
+    def __eq__(self, other):
+        return isinstance(other, EdgeView) and (other._graph is self._graph) & (other._k == self._k)
+
+    def __hash__(self):
+        return hash((id(self._graph), self._k))
+# -----------------------------------------------EdgeView---------------------------------------------------------------
+
+
+# ---------------------------------------------CompactGraph-------------------------------------------------------------
+class CompactGraph:                             # Graph with parallel edge arrays and a lazily rebuilt CSR index
+    __slots__ = '_vertices', '_directed',\
+                '_numEdges', '_origins', '_destinations', '_edgeElements',\
+                '_indexed', '_I_plus', '_I_minus', '_minTail'
+
+    def __init__(self, directed=False, capacity=1024, min_tail=256):
+        self._directed = directed
+
+        self._vertices = []
+
+        self._numEdges     = 0
+        self._origins      = np.empty(capacity, dtype=np.int32)
+        self._destinations = np.empty(capacity, dtype=np.int32)
+        self._edgeElements = []
+
+        self._indexed = 0                       # edges [0, _indexed) are in the CSR index, the rest is the tail
+        self._I_plus  = None                    # (indptr, neighbors, edge ids) of the out edges
+        self._I_minus = None                    # same for the in edges, the out index if undirected
+        self._minTail = min_tail
+
+    def set_I_minus_list(self, I_list):        # replaces the edges by those of a Graph style incidence list
+        self.set_incidence(I_list)
+
+    def set_I_plus_list(self, I_list):
+        self.set_incidence(I_list)
+
+    def I_minus_list(self):                     # O/P: Graph style list of {adjacent vertex: edge}, built on demand
+        return self.incidence('-')
+
+    def I_plus_list(self):
+        return self.incidence('+')
+
+    def incidence(self, direction='+'):         # a later parallel edge shadows an earlier one, as in Graph
+        I_list = []
+        for v in self._vertices:
+            I_list.append({e.adjacent(v): e for e in self.incident_edges(v, direction)})
+        return I_list
+
+    def set_incidence(self, I_list):
+        edges = {}
+        for incident_map in I_list:
+            for e in incident_map.values():
+                (v_1, v_2) = e.end_vertices()
+                edges[(v_1.id(), v_2.id())] = e.element()
+
+        self._numEdges     = 0
+        self._edgeElements = []
+        self._indexed      = 0
+        self._I_plus       = None
+        self._I_minus      = None
+        for ((i_1, i_2), x) in edges.items():
+            self.insert_edge(self._vertices[i_1], self._vertices[i_2], x)
+
+    def is_directed(self):
+        return self._directed
+
+    def num_vertices(self):
+        return len(self._vertices)
+
+    def vertices(self):
+        return self._vertices
+
+    def num_edges(self):
+        return self._numEdges
+
+    def edges(self):
+        return [EdgeView(self, k) for k in range(0, self._numEdges)]
+
+    def origins(self):
+        return self._origins[0:self._numEdges]
+
+    def destinations(self):
+        return self._destinations[0:self._numEdges]
+
+    def edge_elements(self):
+        return self._edgeElements
+
+    def get_vertex(self, n):
+        return self._vertices[n]
+
+    def get_edge(self, v_1, v_2):
+        i_1 = v_1.id()
+        i_2 = v_2.id()
+
+        (o, d) = self.tail()
+        if len(o) > 0:
+            hit = (o == i_1) & (d == i_2)
+            if not self._directed:
+                hit = hit | ((o == i_2) & (d == i_1))
+            k = np.flatnonzero(hit)
+            if len(k) > 0:
+                return EdgeView(self, self._indexed + int(k[-1]))
+
+        (neighbors, ks) = self.csr_row(i_1, '+')
+        for k in range(len(neighbors) - 1, -1, -1):     # rows are short, a Python scan beats NumPy here
+            if neighbors[k] == i_2:
+                return EdgeView(self, int(ks[k]))
+        raise KeyError((i_1, i_2))
+
+    def degree(self, v, direction='+'):
+        return len(self.incident_edge_ids(v, direction))
+
+    def incident_edges(self, v, direction='+'):
+        return [EdgeView(self, k) for k in self.incident_edge_ids(v, direction).tolist()]
+
+    def incident_edge_ids(self, v, direction='+'):     # parallel edges are all listed
+        i_1 = v.id()
+        (o, d) = self.tail()
+        (neighbors, ks) = self.csr_row(i_1, direction)
+        if len(o) == 0:
+            return ks
+
+        if self._directed:
+            hit = (o == i_1) if direction == '+' else (d == i_1)
+        else:
+            hit = (o == i_1) | (d == i_1)
+        return np.concatenate([ks, self._indexed + np.flatnonzero(hit)])
+
+    def insert_vertex(self, x, y, element=None):
+        next_id = len(self._vertices)
+
+        v = Vertex(x, y, element, next_id)
+        self._vertices.append(v)
+        return v
+
+    def insert_edge(self, v_1, v_2, x=None):
+        k = self._numEdges
+        if k == len(self._origins):
+            for name in ('_origins', '_destinations'):
+                old = getattr(self, name)
+                new = np.empty(2*len(old), dtype=old.dtype)
+                new[0:k] = old
+                setattr(self, name, new)
+
+        self._origins[k]      = v_1.id()
+        self._destinations[k] = v_2.id()
+        self._edgeElements.append(x)
+        self._numEdges = k + 1
+        return EdgeView(self, k)
+
+    def move_edge(self, e, v_1, v_2):          # re-attaches edge e to v_1 -> v_2, keeping its id and element
+        k = e.id()
+        self._origins[k]      = v_1.id()
+        self._destinations[k] = v_2.id()
+        if k < self._indexed:
+            self._indexed = 0
+            self._I_plus  = None
+            self._I_minus = None
+        return e
+
+    # _______________________________________________CSR Index__________________________________________________________
+    def tail(self):                             # edges not in the index yet, re-indexes once the tail gets long
+        if self._numEdges - self._indexed > max(self._minTail, self._indexed >> 4):
+            self.build_index()
+        return self._origins[self._indexed:self._numEdges], self._destinations[self._indexed:self._numEdges]
+
+    def build_index(self):
+        E  = self._numEdges
+        o  = self._origins[0:E]
+        d  = self._destinations[0:E]
+        ks = np.arange(E, dtype=np.int64)
+
+        if self._directed:
+            self._I_plus  = self.csr(o, d, ks)
+            self._I_minus = self.csr(d, o, ks)
+        else:
+            self._I_plus  = self.csr(np.concatenate([o, d]), np.concatenate([d, o]), np.concatenate([ks, ks]))
+            self._I_minus = self._I_plus
+        self._indexed = E
+
+    def csr(self, rows, cols, ks):              # rows sorted by vertex, in insertion order within a row
+        order  = np.lexsort((ks, rows))
+        indptr = np.zeros(len(self._vertices) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(self._vertices)), out=indptr[1:])
+        return indptr, cols[order], ks[order]
+
+    def csr_row(self, i_1, direction='+'):     # call tail() first so the index is current
+        index = self._I_plus if (direction == '+') else self._I_minus
+        if (index is None) or (i_1 >= len(index[0]) - 1):
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int64)
+
+        (indptr, neighbors, ks) = index
+        (j_1, j_2) = (indptr[i_1], indptr[i_1 + 1])
+        return neighbors[j_1:j_2], ks[j_1:j_2]
+    # _______________________________________________CSR Index__________________________________________________________
+
+    def distance(self, v_1, v_2, norm_order=2):
+        p_1 = [v_1.x_value(), v_1.y_value()]
+        p_2 = [v_2.x_value(), v_2.y_value()]
+
+        diff = np.subtract(p_1, p_2)
+        return np.linalg.norm(diff, ord=norm_order)
+
+    def print_graph(self, show=False):
+        return Graph.print_graph(self, show)
+# ---------------------------------------------CompactGraph-------------------------------------------------------------
@@ -0,0 +1,152 @@
+"""
+October 17, 2026
+Trajectory Store Class
+"""
+import numpy as np
+import os
+import tempfile
+
+
+class TrajectoryStore:                          # append-only, chunked, memory-mapped (N, n_x) segments indexed by id
+    __slots__ = '_path', '_n_x', '_dtype', '_chunkRows', '_chunks', '_files', '_fill',\
+                '_chunkOf', '_startOf', '_lengthOf', '_slotOf', '_deadRows'
+
+    def __init__(self, path=None, n_x=5, dtype=np.float32, chunk_rows=1 << 16):
+        self._path      = path              # None: anonymous temporary files, gone once the store is closed
+        self._n_x       = n_x
+        self._dtype     = np.dtype(dtype)
+        self._chunkRows = chunk_rows
+        self._chunks    = []
+        self._files     = []
+        self._fill      = 0                 # rows used in the last chunk
+
+        self._chunkOf  = np.full(1024, -1, dtype=np.int64)
+        self._startOf  = np.zeros(1024, dtype=np.int64)
+        self._lengthOf = np.zeros(1024, dtype=np.int64)
+        self._slotOf   = np.zeros(1024, dtype=np.int64)     # rows reserved for id_num, a replacement may use fewer
+        self._deadRows = 0                  # rows of replaced segments, reclaimed by compact
+
+    @classmethod
+    def open(cls, path):                        # reopens a store written with a path and flushed
+        index = np.load(path + '.index.npz')
+        store = cls(path, n_x=int(index['n_x']), dtype=str(index['dtype']), chunk_rows=int(index['chunk_rows']))
+        store._chunkOf  = index['chunk'].copy()
+        store._startOf  = index['start'].copy()
+        store._lengthOf = index['length'].copy()
+        store._slotOf   = index['slot'].copy() if 'slot' in index else index['length'].copy()
+        store._deadRows = int(index['dead']) if 'dead' in index else 0
+        store._fill     = int(index['fill'])
+        for k in range(0, int(index['n_chunks'])):
+            chunk = np.memmap(store.chunk_file(k), dtype=store._dtype, mode='r+')
+            store._chunks.append(chunk.reshape(-1, store._n_x))
+        return store
+
+    def chunk_file(self, k):
+        return self._path + '.' + str(k) + '.bin'
+
+    def new_chunk(self, rows):
+        rows = max(rows, self._chunkRows)
+        if self._path is None:
+            file = tempfile.TemporaryFile()
+            file.truncate(rows*self._n_x*self._dtype.itemsize)
+            self._files.append(file)
+        else:
+            file = self.chunk_file(len(self._chunks))
+        self._chunks.append(np.memmap(file, dtype=self._dtype, mode='w+', shape=(rows, self._n_x)))
+        self._fill = 0
+
+    def grow_index(self, capacity):
+        for name in ('_chunkOf', '_startOf', '_lengthOf', '_slotOf'):
+            old = getattr(self, name)
+            new = np.full(capacity, -1 if name == '_chunkOf' else 0, dtype=np.int64)
+            new[0:len(old)] = old
+            setattr(self, name, new)
+
+    def append(self, id_num, xTilda):          # a second append for id_num replaces the first one
+        xTilda = np.asarray(xTilda)
+        N      = len(xTilda)
+        if id_num >= len(self._chunkOf):
+            self.grow_index(max(2*len(self._chunkOf), id_num + 1))
+
+        if self.contains(id_num):
+            if N <= self._slotOf[id_num]:       # fits the old slot, rewritten in place
+                start = self._startOf[id_num]
+                self._chunks[self._chunkOf[id_num]][start:start + N] = xTilda
+                self._deadRows = self._deadRows + self._lengthOf[id_num] - N
+                self._lengthOf[id_num] = N
+                return
+            self._deadRows = self._deadRows + self._lengthOf[id_num]
+            self._chunkOf[id_num]  = -1
+            self._lengthOf[id_num] = 0
+            if self._deadRows > max(self.rows(), self._chunkRows):    # amortised, most rows are dead
+                self.compact()
+
+        if (len(self._chunks) == 0) or (self._fill + N > len(self._chunks[-1])):
+            self.new_chunk(N)
+
+        chunk = self._chunks[-1]
+        chunk[self._fill:self._fill + N] = xTilda
+
+        self._chunkOf[id_num]  = len(self._chunks) - 1
+        self._startOf[id_num]  = self._fill
+        self._lengthOf[id_num] = N
+        self._slotOf[id_num]   = N
+        self._fill = self._fill + N
+
+    def contains(self, id_num):
+        return (id_num < len(self._chunkOf)) and (self._chunkOf[id_num] >= 0)
+
+    def get(self, id_num):                      # O/P: view into the memory map, no copy
+        if not self.contains(id_num):
+            return None
+        start = self._startOf[id_num]
+        return self._chunks[self._chunkOf[id_num]][start:start + self._lengthOf[id_num]]
+
+    def rows(self):                             # O/P: rows of the live segments
+        return int(np.sum(self._lengthOf))
+
+    def dead_rows(self):                        # O/P: rows still held by replaced segments
+        return int(self._deadRows)
+
+    def nbytes(self):                           # O/P: bytes mapped, live, dead and not yet used rows
+        return sum([chunk.nbytes for chunk in self._chunks])
+
+    def compact(self):                          # rewrites the live segments into fresh chunks, O/P: rows reclaimed
+        if self._deadRows == 0:
+            return 0
+        ids      = np.flatnonzero(self._chunkOf >= 0)
+        segments = [np.array(self.get(id_num)) for id_num in ids]      # copies, the old maps go away below
+        reclaimed = self._deadRows
+
+        if self._path is not None:              # unlinked first, so views handed out by get stay valid
+            for k in range(0, len(self._chunks)):
+                os.remove(self.chunk_file(k))
+        self._chunks = []
+        for file in self._files:
+            file.close()
+        self._files = []
+
+        self._chunkOf[:] = -1
+        self._lengthOf[:] = 0
+        self._slotOf[:]   = 0
+        self._deadRows    = 0
+        for (id_num, xTilda) in zip(ids, segments):
+            self.append(id_num, xTilda)
+        return reclaimed
+
+    def flush(self):
+        for chunk in self._chunks:
+            chunk.flush()
+        if self._path is not None:
+            np.savez(self._path + '.index.npz',
+                     chunk=self._chunkOf, start=self._startOf, length=self._lengthOf, slot=self._slotOf,
+                     dead=self._deadRows, fill=self._fill, n_chunks=len(self._chunks),
+                     n_x=self._n_x, dtype=self._dtype.str, chunk_rows=self._chunkRows)
+
+    def close(self):
+        if self._path is not None:
+            self.flush()
+        self._chunks = []
+        for file in self._files:
+            file.close()
+        self._files = []
@@ -3,65 +3,195 @@ November 14, 2020
 Tree Class
 """
 import SpatialGraph
+import TrajectoryStore
 import Utility as util
+import numpy as np
 
 
 # ------------------------------------------------Vertex----------------------------------------------------------------
 class Tvertex(SpatialGraph.Vertex):
-    __slots__ = '_parent', '_children', '_reference_config'
+    __slots__ = '_tree'
 
-    def __init__(self, x, id_num, parent=None):
-        r = util.polar2xy(x)
-        super().__init__(x=r[0], y=r[1], element=x, n=id_num)
+    def __init__(self, tree, id_num):       # thin view over the arrays of tree
+        self._tree = tree
+        self._id   = id_num
 
-        self._parent = parent
-        self._children = []
-        self._reference_config = x[0:3]
+    def element(self):
+        return self._tree.states()[self._id]
+
+    def x_value(self):
+        return self._tree.positions()[self._id, 0]
+
+    def y_value(self):
+        return self._tree.positions()[self._id, 1]
 
     def get_reference_config(self):
-        return self._reference_config
+        return self._tree.reference_configs()[self._id]
 
     def set_reference_config(self, q_ref):
-        self._reference_config = q_ref
+        self._tree.reference_configs()[self._id] = q_ref
 
     def get_parent(self):
-        return self._parent
+        i_parent = self._tree.parents()[self._id]
+        return None if i_parent < 0 else self._tree.get_vertex(i_parent)
 
     def get_children(self):
-        return self._children
-
-    def insert_kid(self, v):
-        self._children.append(v)
+        return [self._tree.get_vertex(i) for i in self._tree.children(self._id)]
 # ------------------------------------------------Vertex----------------------------------------------------------------
 
 
 # -------------------------------------------------Tree-----------------------------------------------------------------
-class Tree(SpatialGraph.Graph):
-    __slots__ = '_root'
+class Tree(SpatialGraph.CompactGraph):
+    __slots__ = '_root', '_size',\
+                '_states', '_positions', '_parents', '_refConfigs', '_costs', '_trajectories', '_children', \
+                '_ownsStore'
 
-    def __init__(self, x_initial):
+    def __init__(self, x_initial, capacity=1024, trajectory_store=None):
         super().__init__(directed=False)
 
+        n_x = len(x_initial)
+        self._size       = 0
+        self._states     = np.empty((capacity, n_x))
+        self._positions  = np.empty((capacity, 2))
+        self._parents    = np.empty(capacity, dtype=np.int64)
+        self._refConfigs = np.empty((capacity, 3))
+        self._costs      = np.empty(capacity)   # cost-to-come, xy length of the path from the root
+        self._children   = []                   # child ids of every vertex, kept in step with _parents
+        self._trajectories = trajectory_store   # trajectory of the edge into every vertex, by vertex id
+        self._ownsStore    = trajectory_store is None   # a store handed in is closed by whoever made it
+        if trajectory_store is None:
+            self._trajectories = TrajectoryStore.TrajectoryStore(n_x=n_x)
+
         self._root = self.insert_vertex(x_initial, padre=None)
 
     def get_root(self):
         return self._root
 
-    def insert_vertex(self, x, padre):
+    def states(self):
+        return self._states[0:self._size]
+
+    def positions(self):
+        return self._positions[0:self._size]
+
+    def parents(self):
+        return self._parents[0:self._size]
+
+    def reference_configs(self):
+        return self._refConfigs[0:self._size]
+
+    def costs(self):
+        return self._costs[0:self._size]
+
+    def children(self, id_num):             # O/P: ids of the children of vertex id_num
+        return self._children[id_num]
+
+    def get_cost(self, id_num):
+        return self._costs[id_num]
+
+    def get_trajectory(self, id_num):       # trajectory of the edge from the parent of vertex id_num, None if unknown
+        return self._trajectories.get(id_num)
+
+    def set_trajectory(self, id_num, xTilda):
+        self._trajectories.append(id_num, xTilda)
+
+    def trajectory_store(self):
+        return self._trajectories
+
+    def close(self):                        # releases the temporary files of the store the tree made itself
+        if self._ownsStore:
+            self._trajectories.close()
+
+    def capacity(self):
+        return len(self._parents)
+
+    def grow(self, capacity):
+        size = self._size
+        for name in ('_states', '_positions', '_parents', '_refConfigs', '_costs'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[0:size] = old[0:size]
+            setattr(self, name, new)
+
+    def edge_cost(self, padre, x, trajectory=None):     # xy length of the trajectory, or of the straight line
+        if trajectory is not None:
+            return util.path_length(trajectory)
+        return np.linalg.norm(util.polar2xy(x) - self._positions[padre.id()])
+
+    def insert_vertex(self, x, padre, trajectory=None):
         next_id = len(super()._vertices)
 
-        v = Tvertex(x, next_id, parent=padre)
+        if next_id == self.capacity():
+            self.grow(2*self.capacity())
+
+        self._states[next_id]     = x
+        self._positions[next_id]  = util.polar2xy(x)
+        self._parents[next_id]    = -1 if padre is None else padre.id()
+        self._refConfigs[next_id] = x[0:3]
+        self._costs[next_id]      = 0.0 if padre is None else self._costs[padre.id()] + self.edge_cost(padre, x, trajectory)
+        if trajectory is not None:
+            self._trajectories.append(next_id, trajectory)
+        self._size = next_id + 1
+        self._children.append([])
+        if padre is not None:
+            self._children[padre.id()].append(next_id)
+
+        v = Tvertex(self, next_id)
         super().vertices().append(v)
 
-        super().I_minus_list().append({})
-        if super().is_directed():
-            super().I_plus_list().append({})
-        else:
-            super().set_I_plus_list(super().I_minus_list())
-
         if padre != None:
-            padre.insert_kid(v)
             super().insert_edge(padre, v)
 
         return v
+
+    def subtree(self, v):                   # O/P: ids of v and all of its descendants, v first
+        ids = [v.id()]
+        i_1 = 0
+        while i_1 < len(ids):
+            ids.extend(self._children[ids[i_1]])
+            i_1 = i_1 + 1
+        return np.array(ids, dtype=np.int64)
+
+    def set_parent(self, v, padre, trajectory=None, x=None):   # rewires v below padre, costs of the subtree follow
+        e = self.get_edge(v.get_parent(), v)
+        super().move_edge(e, padre, v)
+        self._children[self._parents[v.id()]].remove(v.id())
+        self._children[padre.id()].append(v.id())
+        self._parents[v.id()] = padre.id()
+        if x is not None:                       # v moves to the end of its new edge
+            self._states[v.id()]    = x
+            self._positions[v.id()] = util.polar2xy(x)
+
+        cost = self._costs[padre.id()] + self.edge_cost(padre, self._states[v.id()], trajectory)
+        self._costs[self.subtree(v)] += cost - self._costs[v.id()]
+        if trajectory is not None:
+            self._trajectories.append(v.id(), trajectory)
+        return e
+
+    def set_state(self, id_num, x, trajectory):     # moves vertex id_num to the end of a new edge, its subtree stays
+        padre = self.get_vertex(self._parents[id_num])
+        self._states[id_num]    = x
+        self._positions[id_num] = util.polar2xy(x)
+        self._costs[id_num]     = self._costs[padre.id()] + self.edge_cost(padre, x, trajectory)
+        self._trajectories.append(id_num, trajectory)
+
+    def nearest_neighbors(self, q_batch, metric_weight=(1.0, 1.0, 2.0), chunk_size=1 << 20):
+        Q = np.atleast_2d(np.asarray(q_batch, dtype=float))
+        m = len(Q)
+        n = self._size
+
+        Q_v = self._states[0:n, 0:3]
+        w   = np.asarray(metric_weight, dtype=float)
+
+        indices   = np.empty(m, dtype=np.int64)
+        distances = np.empty(m)
+        rows = max(1, chunk_size // n)
+        for i_1 in range(0, m, rows):
+            i_2 = min(i_1 + rows, m)
+
+            metric = util.metric_pairwise(Q[i_1:i_2, 0:3], Q_v, w)
+            i_min  = np.argmin(metric, axis=1)
+
+            indices[i_1:i_2]   = i_min
+            distances[i_1:i_2] = metric[np.arange(i_2 - i_1), i_min]
+        return indices, distances
 # -------------------------------------------------Tree-----------------------------------------------------------------
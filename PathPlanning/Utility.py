@@ -3,7 +3,6 @@ November 23, 2020
 Useful functions
 """
 import numpy as np
-import quaternion
 import numba
 
 
@@ -47,6 +46,22 @@ def polar2xy_large(q_mat):  # make sure angles are in radian
     return x_c, y_c
 
 
+def path_length(xTilda):     # xy arc length of a trajectory whose rows start with [ρ φ]
+    (x_c, y_c) = polar2xy_large(xTilda[:, 0:2])
+    return np.sum(np.hypot(np.diff(x_c), np.diff(y_c)))
+
+
+def reverse_trajectory(xTilda):  # the same path driven forwards in reverse time: θ + π, ω negated
+    xTilda = np.array(xTilda[::-1], dtype=float)
+    xTilda[:, 2] = wrap_angle(xTilda[:, 2] + np.pi)
+    xTilda[:, 4] = -xTilda[:, 4]
+    return xTilda
+
+
+def flip_heading(q):         # [ρ φ θ] -> [ρ φ θ+π]
+    return np.array([q[0], q[1], wrap_angle(q[2] + np.pi)])
+
+
 def SC_vect(θ):
     return np.array([np.sin(θ),
                      np.cos(θ)])
@@ -57,6 +72,10 @@ def CS_vect(θ):
                      np.sin(θ)])
 
 
+def wrap_angle(θ):           # wrap angles to [-π, π)
+    return np.mod(np.add(θ, np.pi), 2*np.pi) - np.pi
+
+
 def heading_direction(q_1, q_2, degrees=False):
     (x_1, y_1) = polar2xy(q_1)
     (x_2, y_2) = polar2xy(q_2)
@@ -95,25 +114,86 @@ def metric(q_a, q_b, metric_weight):         # make sure angles are in radian
     r_b = polar2xy(q_b)
     Δr  = r_b - r_a
 
-    metric_x = np.abs(Δr[0])
-    metric_x = metric_x*metric_x
-
-    metric_y = np.abs(Δr[1])
-    metric_y = metric_y*metric_y
+    metric_x = Δr[0]*Δr[0]
+    metric_y = Δr[1]*Δr[1]
 
-    θ_a_half = q_a[2]/2
-    θ_b_half = q_b[2]/2
-
-    h_a      = np.quaternion(np.cos(θ_a_half), 0, 0, np.sin(θ_a_half))
-    h_b      = np.quaternion(np.cos(θ_b_half), 0, 0, np.sin(θ_b_half))
-    dot_prod = np.dot(quaternion.as_float_array(h_a), quaternion.as_float_array(h_b))
-    metric_θ = np.arccos(np.abs(dot_prod))
+    metric_θ = orientation_distance(q_a[2], q_b[2])
     metric_θ = metric_θ * metric_θ
 
-    metric = np.dot(metric_weight, np.array([metric_x, metric_y, metric_θ]))
+    metric = metric_weight[0]*metric_x + metric_weight[1]*metric_y + metric_weight[2]*metric_θ
     metric = np.sqrt(metric)
     return metric
 
 
+@numba.njit(cache=True)
+def orientation_distance(θ_a, θ_b):         # arccos(|<h_a, h_b>|) of the unit quaternions, in [0, π/2]
+    Δθ_half = np.abs(θ_b - θ_a)/2
+    Δθ_half = Δθ_half % np.pi
+    return min(Δθ_half, np.pi - Δθ_half)
+
 
+@numba.njit(cache=True)
+def metric_many(q_a, Q_b, metric_weight):    # metric from q_a to every row of Q_b
+    n = Q_b.shape[0]
+    x_a = q_a[0]*np.cos(q_a[1])
+    y_a = q_a[0]*np.sin(q_a[1])
+
+    metric = np.empty(n)
+    for i in range(n):
+        Δx = Q_b[i, 0]*np.cos(Q_b[i, 1]) - x_a
+        Δy = Q_b[i, 0]*np.sin(Q_b[i, 1]) - y_a
+        Δθ = orientation_distance(q_a[2], Q_b[i, 2])
+
+        metric[i] = np.sqrt(metric_weight[0]*Δx*Δx + metric_weight[1]*Δy*Δy + metric_weight[2]*Δθ*Δθ)
+    return metric
 
+
+@numba.njit(cache=True)
+def metric_pairwise(Q_a, Q_b, metric_weight):   # metric between every row of Q_a and every row of Q_b
+    m = Q_a.shape[0]
+    n = Q_b.shape[0]
+
+    x_b = np.empty(n)
+    y_b = np.empty(n)
+    for j in range(n):
+        x_b[j] = Q_b[j, 0]*np.cos(Q_b[j, 1])
+        y_b[j] = Q_b[j, 0]*np.sin(Q_b[j, 1])
+
+    metric = np.empty((m, n))
+    for i in range(m):
+        x_a = Q_a[i, 0]*np.cos(Q_a[i, 1])
+        y_a = Q_a[i, 0]*np.sin(Q_a[i, 1])
+        for j in range(n):
+            Δx = x_b[j] - x_a
+            Δy = y_b[j] - y_a
+            Δθ = orientation_distance(Q_a[i, 2], Q_b[j, 2])
+
+            metric[i, j] = np.sqrt(metric_weight[0]*Δx*Δx + metric_weight[1]*Δy*Δy + metric_weight[2]*Δθ*Δθ)
+    return metric
+
+
+@numba.njit(cache=True)
+def heading_direction_many(Q_1, Q_2):       # heading_direction row by row, in radians
+    n = Q_1.shape[0]
+
+    θ_r = np.empty(n)
+    for i in range(n):
+        Δx = Q_2[i, 0]*np.cos(Q_2[i, 1]) - Q_1[i, 0]*np.cos(Q_1[i, 1])
+        Δy = Q_2[i, 0]*np.sin(Q_2[i, 1]) - Q_1[i, 0]*np.sin(Q_1[i, 1])
+
+        θ_r[i] = np.arccos(Δx/np.sqrt(Δx*Δx + Δy*Δy))
+        if Δy < 0:
+            θ_r[i] = -θ_r[i]
+    return θ_r
+
+
+@numba.njit(cache=True)
+def spherical2xyz_many(Q):
+    n = Q.shape[0]
+
+    p = np.empty((n, 3))
+    for i in range(n):
+        p[i, 0] = Q[i, 0]*np.cos(Q[i, 1])
+        p[i, 1] = Q[i, 0]*np.sin(Q[i, 1])
+        p[i, 2] = Q[i, 0]*np.tan(Q[i, 2])
+    return p
@@ -0,0 +1,33 @@
+"""
+October 17, 2026
+Shared Test Setup
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # the modules import each other flat
+
+import Environment
+import Obstacle
+import Utility as util
+
+import numpy as np
+import pytest
+
+
+def obstacles():                                # the obstacles of main.py
+    return [Obstacle.Obstacle([(0.0, 1.0), (1.5, 2.0), (0.5, 2.0), (0.3, 1.3)], convex=True),
+            Obstacle.Obstacle([(4.0, 6.0), (0.6, 8.2), (1.7, 5.5)], convex=True),
+            Obstacle.Obstacle([(2.0, 3.0), (3.0, 3.5), (4.0, 3.0), (3.0, 5.5)], convex=True),
+            Obstacle.Obstacle([(6.0, 2.0), (9.0, 4.5), (8.0, 0.0), (7.0, 0.2)], convex=True),
+            Obstacle.Obstacle([(6.0, 5.0), (7.0, 6.5), (4.0, 9.0), (5.5, 10.0)], convex=True)]
+
+
+@pytest.fixture
+def scenario():                                 # O/P: seed -> headless Environment of main.py, numba dynamics
+    def make(seed):
+        x_0 = np.concatenate((util.xy2polar(4.5, 4.5), [np.radians(80.0), 0, 0]))
+        env = Environment.Environment([0, 10], [0, 10], obstacles(), x_0, (8, 8), headless=True, seed=seed)
+        env.get_robot().set_dynamics('numba')
+        return env
+    return make
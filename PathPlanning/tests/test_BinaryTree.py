@@ -0,0 +1,57 @@
+"""
+October 17, 2026
+KdTree Tests
+"""
+import BinaryTree
+import Utility as util
+
+import numpy as np
+
+
+W = np.array([1.0, 1.0, 2.0])
+
+
+def random_configs(n, rng):                     # O/P: (n, 3) [ρ φ θ] inside the 10 x 10 workspace
+    xy = rng.uniform(0, 10, (n, 2))
+    return np.column_stack([np.hypot(xy[:, 0], xy[:, 1]), np.arctan2(xy[:, 1], xy[:, 0]), rng.uniform(-np.pi, np.pi, n)])
+
+
+def linear_scan(Q, q):                          # O/P: metric from q to every row of Q
+    return util.metric_many(np.asarray(q, dtype=float), Q, W)
+
+
+def check_queries(kd_tree, Q, queries, k=5, r=1.0):
+    for q in queries:
+        metric = linear_scan(Q, q)
+
+        (items, distances) = kd_tree.nearest(q, k=k)
+        assert np.allclose(distances, np.sort(metric)[0:k])
+        assert np.allclose(metric[items], distances)
+
+        (items, distances) = kd_tree.radius(q, r)
+        assert set(items) == set(np.flatnonzero(metric < r)) - set(np.flatnonzero(np.isclose(metric, r)))
+
+
+def test_kdtree_matches_linear_scan():
+    rng = np.random.default_rng(0)
+    Q   = random_configs(500, rng)
+
+    kd_tree = BinaryTree.KdTree(W)
+    for (i_1, q) in enumerate(Q):
+        kd_tree.insert(q, i_1)
+    check_queries(kd_tree, Q, random_configs(200, rng))
+
+
+def test_kdtree_move_matches_linear_scan():
+    rng = np.random.default_rng(1)
+    Q   = random_configs(300, rng)
+
+    kd_tree = BinaryTree.KdTree(W)
+    for (i_1, q) in enumerate(Q):
+        kd_tree.insert(q, i_1)
+
+    moved = rng.choice(len(Q), 100, replace=False)
+    Q[moved] = random_configs(100, rng)         # moved items are only found at their new configs
+    for i_1 in moved:
+        kd_tree.move(Q[i_1], i_1)
+    check_queries(kd_tree, Q, random_configs(200, rng))
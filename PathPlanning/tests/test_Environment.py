@@ -0,0 +1,136 @@
+"""
+October 17, 2026
+Environment Tests
+"""
+import Environment
+import Obstacle
+import Parallel
+import Utility as util
+
+import multiprocessing
+import numpy as np
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+
+def fingerprint(env, build):                    # O/P: (results, tree states) of one planner run
+    results = build(env)
+    states  = env.get_tree().states().copy()
+    env.close()
+    return results, states
+
+
+def test_same_seed_same_tree(scenario):
+    (results_a, states_a) = fingerprint(scenario(0), lambda env: env.build_RRT(100))
+    (results_b, states_b) = fingerprint(scenario(0), lambda env: env.build_RRT(100))
+    assert results_a == results_b
+    assert np.array_equal(states_a, states_b)
+
+    (results_c, states_c) = fingerprint(scenario(1), lambda env: env.build_RRT(100))
+    assert not np.array_equal(states_a[0:len(states_c)], states_c[0:len(states_a)])
+
+
+def test_same_seed_same_connect_tree(scenario):
+    (results_a, states_a) = fingerprint(scenario(2), lambda env: env.build_RRT_connect(100))
+    (results_b, states_b) = fingerprint(scenario(2), lambda env: env.build_RRT_connect(100))
+    assert results_a == results_b
+    assert np.array_equal(states_a, states_b)
+
+
+def test_parallel_tree_independent_of_workers(scenario):
+    (results_a, states_a) = fingerprint(scenario(0), lambda env: env.build_RRT_parallel(40, batch_size=4, workers=1))
+    (results_b, states_b) = fingerprint(scenario(0), lambda env: env.build_RRT_parallel(40, batch_size=4, workers=2))
+    assert results_a == results_b
+    assert np.array_equal(states_a, states_b)
+
+
+def test_goal_then_collision_is_kept(monkeypatch):
+    box = Obstacle.Obstacle([(8.8, 8.8), (9.6, 8.8), (9.6, 9.6), (8.8, 9.6)], convex=True)
+    x_0 = np.concatenate((util.xy2polar(4.5, 4.5), [np.radians(45.0), 0, 0]))
+    env = Environment.Environment([0, 10], [0, 10], [box], x_0, (8, 8), headless=True, seed=0)
+
+    def straight_line(self, x_0, q_ref, *args, **kwargs):   # through the goal disc and on into the box
+        s = np.linspace(4.5, 9.2, 200)
+        self._xTilda = np.column_stack([np.hypot(s, s), np.arctan2(s, s), np.full(200, np.radians(45.0)),
+                                        np.ones(200), np.zeros(200)])
+        return 'Integration successful.'
+    monkeypatch.setattr(Environment.Environment, 'draw_robot_trajectory', straight_line)
+
+    q_rand = np.concatenate((util.xy2polar(9.2, 9.2), [0.0]))
+    assert env.new_state(q_rand, x_0)
+    assert env.check_goal(env.get_xTilda()[-1])
+    assert env.check_goal_trajectory(env.get_xTilda()) == len(env.get_xTilda()) - 1
+    env.close()
+
+
+def test_plan_tree_is_continuous(scenario):
+    env = scenario(3)
+    env.plan(3.0)
+    tree = env.get_tree()
+    for i_1 in range(1, tree.num_vertices()):   # every edge, rewired or not, starts where its parent ends
+        xTilda = tree.get_trajectory(i_1)       # stored in float32
+        assert np.allclose(xTilda[0], tree.states()[tree.parents()[i_1]], rtol=1.0e-6, atol=1.0e-6)
+        assert np.allclose(xTilda[-1], tree.states()[i_1], rtol=1.0e-6, atol=1.0e-6)
+    env.close()
+
+
+def test_plan_best_cost_never_rises(scenario):
+    env   = scenario(0)
+    costs = []
+    path  = env.plan(3.0, on_improvement=lambda cost, path: costs.append(cost))
+    assert len(costs) > 0
+    assert np.all(np.diff(costs) < 0)
+    assert env.best_cost() == costs[-1]
+    assert np.isclose(util.path_length(path), env.best_cost(), rtol=1.0e-5)
+    assert env.check_goal(path[-1])
+
+    i_best = env.best_goal_vertex()             # rewiring kept the best goal vertex in the goal disc
+    assert env.check_goal(env.get_tree().states()[i_best])
+    assert env.get_tree().get_cost(i_best) == env.best_cost()
+    env.close()
+
+
+def test_goal_tree_grows_with_early_termination(scenario):
+    env = scenario(4)
+    env.set_early_termination(True)
+    env.init_goal_tree(8)
+    for i_1 in range(0, 20):                    # its rollouts start in the goal disc, the goal must not stop them
+        env.extend_goal_tree(env.random_config(1, distribution='U'))
+
+    tree = env.get_goal_tree()
+    assert tree.num_vertices() > 8
+    for i_1 in range(8, tree.num_vertices()):
+        assert len(tree.get_trajectory(i_1)) > 2
+    assert not np.all([env.check_goal(x) for x in tree.states()])     # the tree leaves the goal disc
+    env.close()
+
+
+def test_steering_copy_in_spawned_worker(scenario):
+    env = scenario(2)
+    env.build_RRT_connect(100)
+    x_0    = env.get_tree().states()[0].copy()
+    q_rand = env.random_config(1, distribution='N')
+    seed   = env.spawn_seeds(1)[0]
+
+    context = multiprocessing.get_context('spawn')     # the copy crosses a pickle, as it does on macOS and Windows
+    with ProcessPoolExecutor(max_workers=1, mp_context=context,
+                             initializer=Parallel.init_worker, initargs=(env.steering_copy(),)) as pool:
+        (good, xTilda) = pool.submit(Parallel.steer, (x_0, q_rand, seed)).result()[0:2]
+    assert np.array_equal(xTilda[0], x_0)
+    env.close()
+
+
+def test_steering_copy_pickles_after_connect(scenario):
+    env = scenario(2)
+    env.build_RRT_connect(100)
+    x_0   = env.get_tree().states()[0].copy()
+    q_ref = np.concatenate((util.xy2polar(6.0, 6.0), [np.radians(45.0)]))
+
+    copy    = pickle.loads(pickle.dumps(env.steering_copy()))
+    message = copy.draw_robot_trajectory(x_0, q_ref)
+    assert message == 'Integration successful.'
+    assert np.array_equal(copy.get_xTilda()[0], x_0)
+
+    env.set_speculative_retries(True, workers=2)
+    assert env.draw_robot_trajectory(x_0, q_ref) == message
+    env.close()
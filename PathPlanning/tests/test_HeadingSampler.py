@@ -0,0 +1,28 @@
+"""
+October 17, 2026
+Heading Sampler Tests
+"""
+import HeadingSampler
+
+import numpy as np
+
+
+def test_sampler_is_opt_in(scenario):
+    env = scenario(0)
+    assert env.get_heading_sampler() is None    # build_RRT keeps its uniform first attempt
+    env.close()
+
+    env     = scenario(0)
+    sampler = HeadingSampler.HeadingSampler.for_workspace([env.x_min(), env.x_max()], [env.y_min(), env.y_max()])
+    env.set_heading_sampler(sampler)
+    env.build_RRT(60)
+    assert np.sum(sampler.attempts()) >= len(env.retry_record()) > 0
+    env.close()
+
+
+def test_distance_bins_follow_the_workspace():
+    sampler = HeadingSampler.HeadingSampler.for_workspace([0, 30], [0, 40])
+    x_0     = np.array([1.0, 0.0, 0.0, 0.0, 0.0])
+    bins    = [sampler.bin(x_0, np.array([ρ, 0.0, 0.0])) // 8 for ρ in (2.0, 12.0, 26.0, 49.0)]
+    assert bins == sorted(bins)
+    assert bins[0] < bins[2] < 5                # a 25 long extension is not in the open last bin
@@ -0,0 +1,45 @@
+"""
+October 17, 2026
+Integrator Tests
+"""
+import Integrator
+
+import numpy as np
+import pytest
+
+
+def pendulum(x, t):
+    return np.array([x[1], -np.sin(x[0])])
+
+
+def swung_back(sol):                            # flags the rows where the pendulum has swung past -0.9
+    return sol[:, 0] < -0.9
+
+
+@pytest.mark.parametrize('integrator', [Integrator.LSODA(), Integrator.SolveIVP(), Integrator.RK4(dt=0.001)],
+                         ids=lambda integrator: integrator.name())
+def test_event_stops_at_first_flagged_sample(integrator):
+    t   = np.linspace(0, 10, 201)
+    x_0 = np.array([1.0, 0.0])
+
+    (sol, info)             = integrator.integrate(pendulum, x_0, t)
+    (sol_event, info_event) = integrator.integrate(pendulum, x_0, t, event=swung_back)
+
+    i_event = info_event['i_event']
+    assert i_event == np.flatnonzero(swung_back(sol))[0]
+    assert len(sol_event) == i_event + 1
+    assert np.array_equal(sol_event[0:i_event], sol[0:i_event])    # the same steps, nothing restarted
+    assert np.allclose(sol_event[i_event], sol[i_event], atol=1.0e-6)
+
+
+def test_lsoda_event_reports_odeint_steps():
+    t   = np.linspace(0, 10, 201)
+    x_0 = np.array([1.0, 0.0])
+
+    (sol, info)             = Integrator.LSODA().integrate(pendulum, x_0, t)
+    (sol_event, info_event) = Integrator.LSODA().integrate(pendulum, x_0, t, event=swung_back)
+
+    n = info_event['i_event']
+    assert np.array_equal(sol_event, sol[0:n + 1])
+    for key in ('hu', 'nst', 'nfe'):
+        assert np.array_equal(info_event[key], info[key][0:n])
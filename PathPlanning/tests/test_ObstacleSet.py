@@ -0,0 +1,76 @@
+"""
+October 17, 2026
+ObstacleSet Tests
+"""
+import ObstacleSet
+import ScenarioGenerator
+
+import numpy as np
+import pytest
+
+
+def disc_collision(obstacle_list, points, ε):   # O/P: points inside a polygon or within ε of its boundary
+    collision = np.zeros(len(points), dtype=bool)
+    for obstacle in obstacle_list:
+        (N, b) = (np.asarray(obstacle.boundary()['N']), np.asarray(obstacle.boundary()['b']))
+        collision = collision | np.all(points @ N.T + b <= 0, axis=1)
+
+        corners = np.array([[v.x_value(), v.y_value()] for v in obstacle.boundary_vertices()])
+        for (P, Q) in zip(corners, np.roll(corners, -1, axis=0)):
+            t = np.clip((points - P) @ (Q - P)/np.dot(Q - P, Q - P), 0.0, 1.0)
+            Δ = points - (P + t[:, None]*(Q - P))
+            collision = collision | (np.sum(Δ*Δ, axis=1) <= ε*ε)
+    return collision
+
+
+def half_plane_collision(obstacle_list, points, ε):     # O/P: points within ε of a half-plane system, one at a time
+    collision = np.zeros(len(points), dtype=bool)
+    for obstacle in obstacle_list:
+        (N, b) = (np.asarray(obstacle.boundary()['N']), np.asarray(obstacle.boundary()['b']))
+        collision = collision | np.all(points @ N.T + b <= ε, axis=1)
+    return collision
+
+
+@pytest.mark.parametrize('ε', [0.0, 0.35])
+def test_grid_matches_brute_force(ε):
+    generator     = ScenarioGenerator.ScenarioGenerator(seed=0)
+    obstacle_list = generator.random_obstacles(n=60)
+    points        = generator.rng().uniform(0.5, 9.5, (20000, 2))
+
+    grid   = ObstacleSet.ObstacleSet(obstacle_list, (0, 10), (0, 10), margin=ε)
+    linear = ObstacleSet.ObstacleSet(obstacle_list, (0, 10), (0, 10), broadphase=False)
+
+    collision = grid.collision_obstacles(points, ε)
+    assert 0 < np.sum(collision) < len(points)
+    assert np.array_equal(collision, linear.collision_obstacles(points, ε))
+    assert np.array_equal(collision, half_plane_collision(obstacle_list, points, ε))
+
+
+def test_segments_grid_matches_linear():
+    generator     = ScenarioGenerator.ScenarioGenerator(seed=1)
+    obstacle_list = generator.random_obstacles(n=60)
+    A = generator.rng().uniform(0.5, 9.5, (5000, 2))
+    B = A + generator.rng().normal(0, 0.3, (5000, 2))
+
+    grid   = ObstacleSet.ObstacleSet(obstacle_list, (0, 10), (0, 10), margin=0.35)
+    linear = ObstacleSet.ObstacleSet(obstacle_list, (0, 10), (0, 10), broadphase=False)
+    assert np.array_equal(grid.collision_segments(A, B, 0.35), linear.collision_segments(A, B, 0.35))
+
+
+def test_segments_match_dense_samples():
+    generator     = ScenarioGenerator.ScenarioGenerator(seed=1)
+    obstacle_list = generator.random_obstacles(n=30)
+    A = generator.rng().uniform(0.5, 9.5, (300, 2))
+    B = A + generator.rng().normal(0, 0.3, (300, 2))
+    (ε, δ) = (0.35, 5.0e-3)
+
+    obstacle_set = ObstacleSet.ObstacleSet(obstacle_list, (-10, 20), (-10, 20), broadphase=False)
+    collision    = obstacle_set.collision_segments(A, B, ε)
+    assert 0 < np.sum(collision) < len(A)
+
+    s       = np.linspace(0, 1, 401)            # samples closer than 2 δ on segments up to 4 long
+    samples = (A[:, None, :] + s[None, :, None]*(B - A)[:, None, :]).reshape(-1, 2)
+    near    = np.any(disc_collision(obstacle_list, samples, ε).reshape(len(A), -1), axis=1)
+    far     = np.any(disc_collision(obstacle_list, samples, ε + δ).reshape(len(A), -1), axis=1)
+    assert np.all(collision[near])              # nothing the samples see is missed
+    assert np.all(far[collision])               # and nothing further away is flagged
@@ -0,0 +1,50 @@
+"""
+October 17, 2026
+Robot Tests
+"""
+import Integrator
+import Robot
+import Utility as util
+
+import numpy as np
+
+
+def rollouts(n, rng):                           # O/P: n random (x, rollout) pairs, the robot moving or at rest
+    pairs = []
+    for i_1 in range(0, n):
+        x     = np.concatenate((util.xy2polar(*rng.uniform(1, 9, 2)), rng.uniform(-np.pi, np.pi, 1),
+                                rng.normal(0, 0.5, 2)))
+        q_ref = np.concatenate((util.xy2polar(*rng.uniform(1, 9, 2)), rng.uniform(-np.pi, np.pi, 1)))
+        t_head_min = rng.uniform(0.0, 1.0)
+        pairs.append((x, Robot.Rollout(x, q_ref, t_head_min, t_head_min + rng.uniform(0.1, 1.0))))
+    return pairs
+
+
+def test_f_kernel_matches_f_function():
+    rng   = np.random.default_rng(0)
+    pairs = rollouts(200, rng)
+    robot = Robot.Robot(pairs[0][0], q_ref=pairs[0][1].q_ref(), t_1=0.0, t_2=2.0, step_number=100)
+
+    for (x, rollout) in pairs:
+        p = robot.controller_params().kernel_parameters(rollout)
+        for t in (0.0, 0.5, 1.5):
+            xDot_python = robot.f_function(x, t, rollout)
+            xDot_kernel = Robot.f_kernel(x, t, p)
+            assert np.allclose(xDot_kernel, xDot_python, rtol=1.0e-9, atol=1.0e-12)
+
+            xDot_out = np.empty(5)
+            Robot.f_kernel_out(x, t, p, xDot_out)
+            assert np.array_equal(xDot_out, xDot_kernel)
+
+
+def test_integrate_many_matches_integrate():
+    rng   = np.random.default_rng(1)
+    pairs = rollouts(8, rng)
+    robot = Robot.Robot(pairs[0][0], q_ref=pairs[0][1].q_ref(), t_1=0.0, t_2=2.0, step_number=100)
+    robot.set_dynamics('numba')
+    robot.set_integrator(Integrator.RK4(dt=0.001))     # reentrant, so the rollouts run on the thread pool
+
+    serial   = [robot.integrate(rollout) for (x, rollout) in pairs]
+    threaded = robot.integrate_many([rollout for (x, rollout) in pairs], workers=4)
+    for ((sol, info), (sol_serial, info_serial)) in zip(threaded, serial):
+        assert np.array_equal(sol, sol_serial, equal_nan=True)
@@ -0,0 +1,41 @@
+"""
+October 17, 2026
+Scenario Generator Tests
+"""
+import ObstacleSet
+import ScenarioGenerator
+
+import numpy as np
+import pytest
+
+
+def box_points(box, n=25):                      # O/P: (n*n, 2) grid over the inside of box (x_min, y_min, x_max, y_max)
+    (x, y) = np.meshgrid(np.linspace(box[0], box[2], n + 2)[1:-1], np.linspace(box[1], box[3], n + 2)[1:-1])
+    return np.column_stack([x.ravel(), y.ravel()])
+
+
+def test_same_seed_same_scenario():
+    scenarios = [ScenarioGenerator.ScenarioGenerator(seed=3).generate(n=20, passages=1) for i_1 in range(0, 2)]
+    ((obstacles_a, start_a, goal_a), (obstacles_b, start_b, goal_b)) = scenarios
+    assert (start_a, goal_a) == (start_b, goal_b)
+    assert len(obstacles_a) == len(obstacles_b)
+    for (O_a, O_b) in zip(obstacles_a, obstacles_b):
+        assert np.array_equal(O_a.boundary()['N'], O_b.boundary()['N'])
+        assert np.array_equal(O_a.boundary()['b'], O_b.boundary()['b'])
+
+
+@pytest.mark.parametrize('seed', range(0, 5))
+def test_keep_out_boxes_stay_free(seed):
+    generator = ScenarioGenerator.ScenarioGenerator(seed=seed)
+    (obstacle_list, start, goal) = generator.generate(density=0.25, passages=2)
+    assert len(obstacle_list) > 4               # two walls per passage, and random obstacles
+
+    generator.set_seed(seed)                    # the same draws again, to recover the gaps
+    (walls, gaps) = generator.narrow_passages(2, 1.6)
+    c     = generator.get_clearance()
+    boxes = gaps + [(start[0] - c, start[1] - c, start[0] + c, start[1] + c),
+                    (goal[0] - c, goal[1] - c, goal[0] + c, goal[1] + c)]
+
+    obstacle_set = ObstacleSet.ObstacleSet(obstacle_list, (0, 10), (0, 10))
+    for box in boxes:
+        assert not np.any(obstacle_set.collision_batch(box_points(box)))
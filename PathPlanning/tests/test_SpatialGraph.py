@@ -0,0 +1,72 @@
+"""
+October 17, 2026
+CompactGraph Tests
+"""
+import SpatialGraph
+
+import numpy as np
+import pytest
+
+
+def build(graph, n_vertices, pairs):
+    for i_1 in range(0, n_vertices):
+        graph.insert_vertex(float(i_1), 0.0, element=i_1)
+    vertices = graph.vertices()
+    for (k, (i_1, i_2)) in enumerate(pairs):
+        graph.insert_edge(vertices[i_1], vertices[i_2], x=k)
+    return graph
+
+
+def ends(graph, edges):                         # O/P: sorted (origin id, destination id, element) of the edges
+    return sorted([(e.end_vertices()[0].id(), e.end_vertices()[1].id(), e.element()) for e in edges])
+
+
+@pytest.mark.parametrize('directed', [False, True])
+def test_compact_graph_matches_graph(directed):
+    rng   = np.random.default_rng(0)
+    V     = 200
+    pairs = rng.integers(0, V, (1000, 2))
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]   # Graph keeps one edge per vertex pair, CompactGraph all of them
+    pairs = pairs[np.unique(np.sort(pairs, axis=1), axis=0, return_index=True)[1]]
+
+    graph   = build(SpatialGraph.Graph(directed=directed), V, pairs)
+    compact = build(SpatialGraph.CompactGraph(directed=directed), V, pairs)
+    assert compact.num_vertices() == graph.num_vertices()
+    assert compact.num_edges() == graph.num_edges()
+
+    for i_1 in range(0, V):
+        for direction in ('+', '-'):
+            (v, v_c) = (graph.vertices()[i_1], compact.vertices()[i_1])
+            assert compact.degree(v_c, direction) == graph.degree(v, direction)
+            assert ends(compact, compact.incident_edges(v_c, direction)) == ends(graph, graph.incident_edges(v, direction))
+
+    for (i_1, i_2) in rng.integers(0, V, (500, 2)):
+        if graph.vertices()[i_2] not in graph.I_plus_list()[i_1]:
+            with pytest.raises(KeyError):
+                compact.get_edge(compact.vertices()[i_1], compact.vertices()[i_2])
+            continue
+        e   = graph.get_edge(graph.vertices()[i_1], graph.vertices()[i_2])
+        e_c = compact.get_edge(compact.vertices()[i_1], compact.vertices()[i_2])
+        assert e_c.element() == e.element()
+
+
+def incidence(I_list):                          # O/P: per vertex, sorted (adjacent id, element) of an incidence list
+    return [sorted([(v.id(), e.element()) for (v, e) in incident_map.items()]) for incident_map in I_list]
+
+
+@pytest.mark.parametrize('directed', [False, True])
+def test_compact_graph_incidence_lists(directed):
+    rng   = np.random.default_rng(1)
+    V     = 50
+    pairs = rng.integers(0, V, (200, 2))
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+
+    graph   = build(SpatialGraph.Graph(directed=directed), V, pairs)
+    compact = build(SpatialGraph.CompactGraph(directed=directed), V, pairs)
+    assert incidence(compact.I_plus_list()) == incidence(graph.I_plus_list())
+    assert incidence(compact.I_minus_list()) == incidence(graph.I_minus_list())
+
+    compact.set_I_plus_list(graph.I_plus_list())        # only the edges Graph still reaches are kept
+    assert compact.num_edges() == len({e for incident_map in graph.I_plus_list() for e in incident_map.values()})
+    assert incidence(compact.I_plus_list()) == incidence(graph.I_plus_list())
+    assert incidence(compact.I_minus_list()) == incidence(graph.I_minus_list())
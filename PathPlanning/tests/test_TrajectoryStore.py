@@ -0,0 +1,69 @@
+"""
+October 17, 2026
+Trajectory Store Tests
+"""
+import TrajectoryStore
+
+import numpy as np
+
+
+def segments(n, rng):                           # O/P: n random (N, 5) segments of 1 to 40 rows
+    return [rng.normal(size=(rng.integers(1, 41), 5)).astype(np.float32) for i_1 in range(0, n)]
+
+
+def check_store(store, expected):
+    for (id_num, xTilda) in expected.items():
+        assert np.array_equal(store.get(id_num), xTilda)
+    assert store.rows() == sum([len(xTilda) for xTilda in expected.values()])
+
+
+def test_replace_and_compact():
+    rng      = np.random.default_rng(0)
+    store    = TrajectoryStore.TrajectoryStore(chunk_rows=256)
+    expected = {}
+    for (id_num, xTilda) in enumerate(segments(100, rng)):
+        store.append(id_num, xTilda)
+        expected[id_num] = xTilda
+    check_store(store, expected)
+
+    for id_num in rng.choice(100, 60, replace=False):      # shorter ones in place, longer ones moved
+        xTilda = segments(1, rng)[0]
+        store.append(id_num, xTilda)
+        expected[id_num] = xTilda
+    check_store(store, expected)
+    assert store.dead_rows() > 0
+
+    nbytes    = store.nbytes()
+    reclaimed = store.compact()
+    assert reclaimed > 0
+    assert store.dead_rows() == 0
+    assert store.nbytes() <= nbytes
+    check_store(store, expected)
+    assert not store.contains(100)
+    store.close()
+
+
+def test_reopen(tmp_path):
+    rng      = np.random.default_rng(1)
+    path     = str(tmp_path/'tree')
+    store    = TrajectoryStore.TrajectoryStore(path, chunk_rows=128)
+    expected = {}
+    for (id_num, xTilda) in enumerate(segments(50, rng)):
+        store.append(id_num, xTilda)
+        expected[id_num] = xTilda
+    for id_num in (3, 7, 11):
+        xTilda = segments(1, rng)[0]
+        store.append(id_num, xTilda)
+        expected[id_num] = xTilda
+    dead_rows = store.dead_rows()
+    store.close()
+
+    store = TrajectoryStore.TrajectoryStore.open(path)
+    check_store(store, expected)
+    assert store.dead_rows() == dead_rows
+
+    store.compact()
+    store.close()
+    store = TrajectoryStore.TrajectoryStore.open(path)
+    check_store(store, expected)
+    store.close()
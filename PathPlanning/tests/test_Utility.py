@@ -0,0 +1,51 @@
+"""
+October 17, 2026
+Metric Kernel Tests
+"""
+import Utility as util
+
+import numpy as np
+import pytest
+
+quaternion = pytest.importorskip('quaternion')
+
+
+W = np.array([1.0, 1.0, 2.0])
+
+
+def quaternion_metric(q_a, q_b, metric_weight):     # the metric as it was before the closed form, for reference
+    r_a = util.polar2xy(q_a)
+    r_b = util.polar2xy(q_b)
+    Δr  = r_b - r_a
+
+    h_a      = np.quaternion(np.cos(q_a[2]/2), 0, 0, np.sin(q_a[2]/2))
+    h_b      = np.quaternion(np.cos(q_b[2]/2), 0, 0, np.sin(q_b[2]/2))
+    dot_prod = np.dot(quaternion.as_float_array(h_a), quaternion.as_float_array(h_b))
+    metric_θ = np.arccos(min(np.abs(dot_prod), 1.0))
+    return np.sqrt(np.dot(metric_weight, [Δr[0]*Δr[0], Δr[1]*Δr[1], metric_θ*metric_θ]))
+
+
+def random_configs(n, rng):                     # headings well outside [-π, π) as well
+    return np.column_stack([rng.uniform(0, 15, n), rng.uniform(-np.pi, np.pi, n), rng.uniform(-4*np.pi, 4*np.pi, n)])
+
+
+def test_metric_matches_quaternion_metric():
+    rng = np.random.default_rng(0)
+    Q_a = random_configs(2000, rng)
+    Q_b = random_configs(2000, rng)
+    Q_b[0:100, 2] = Q_a[0:100, 2] + np.pi*rng.integers(-3, 4, 100)     # equal and opposite headings
+
+    for (q_a, q_b) in zip(Q_a, Q_b):
+        assert abs(util.metric(q_a, q_b, W) - quaternion_metric(q_a, q_b, W)) < 1.0e-7
+
+
+def test_batch_kernels_match_metric():
+    rng = np.random.default_rng(1)
+    Q_a = random_configs(40, rng)
+    Q_b = random_configs(300, rng)
+
+    pairwise = util.metric_pairwise(Q_a, Q_b, W)
+    for (i_1, q_a) in enumerate(Q_a):
+        reference = np.array([util.metric(q_a, q_b, W) for q_b in Q_b])
+        assert np.allclose(util.metric_many(q_a, Q_b, W), reference, rtol=1.0e-12, atol=1.0e-12)
+        assert np.allclose(pairwise[i_1], reference, rtol=1.0e-12, atol=1.0e-12)